@@ -0,0 +1,193 @@
+import atexit
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+from api.storage import store
+from api.metrics import metrics
+
+MAX_BUFFERED = 10000 # Beyond this the oldest entries spill to the spool file
+FLUSH_SIZE = 400     # Buffered entries that trigger a flush before the interval
+FLUSH_INTERVAL = 2.0 # Seconds an entry may wait before being written
+SHUTDOWN_TIMEOUT = 5.0
+SPOOL_PATH = os.getenv(
+    "PA_AUDIT_SPOOL",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "audit_spool.jsonl")
+)
+
+
+class AuditLogger:
+    """
+    Write-behind sink for the `logs` collection.
+
+    log() only appends to an in-memory buffer and returns the new log id
+    (ids are generated here, so callers can reference a log before it is
+    written). A background flusher commits the buffer in batches when it
+    reaches FLUSH_SIZE or every FLUSH_INTERVAL, and once more on shutdown.
+    Batches that cannot be written are appended to a local spool file and
+    replayed once the store accepts writes again.
+    """
+
+    def __init__(self, spool_path: str = SPOOL_PATH):
+        self._spool_path = spool_path
+        self._cond = threading.Condition()
+        self._buffer: "OrderedDict[str, dict]" = OrderedDict()
+        self._in_flight: Dict[str, dict] = {}
+        self._amendments: Dict[str, dict] = {}
+        self._closed = False
+        metrics.gauge("audit.buffered", lambda: len(self._buffer))
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --- PRODUCER SIDE (request handlers; never blocks on I/O) ---
+    def log(self, user: str, action: str, type: str, details: str, **extra) -> str:
+        """Queues one audit entry and returns its log id."""
+        log_id = uuid.uuid4().hex[:20]
+        entry = dict(extra, user=user, action=action, type=type, details=details,
+                     timestamp=datetime.now(timezone.utc))
+        spill = None
+        with self._cond:
+            self._buffer[log_id] = entry
+            if len(self._buffer) > MAX_BUFFERED:
+                spill = [self._buffer.popitem(last=False)]
+            if len(self._buffer) >= FLUSH_SIZE:
+                self._cond.notify()
+        if spill:
+            self._spool(spill)
+        return log_id
+
+    def amend(self, log_id: str, fields: dict) -> bool:
+        """
+        Updates a log that has not been written yet.
+        Returns False if it is already in the store (update it there instead).
+        """
+        with self._cond:
+            if log_id in self._buffer:
+                self._buffer[log_id].update(fields)
+                return True
+            if log_id in self._in_flight:
+                # Applied by the flusher once the batch holding it commits
+                self._amendments.setdefault(log_id, {}).update(fields)
+                return True
+        return False
+
+    def discard(self, log_id: str):
+        """Drops a log before it is written (waits out a batch already in flight)."""
+        with self._cond:
+            if self._buffer.pop(log_id, None) is None:
+                self._cond.wait_for(lambda: log_id not in self._in_flight, SHUTDOWN_TIMEOUT)
+
+    def flush(self, timeout: float = SHUTDOWN_TIMEOUT):
+        """Asks the flusher to write everything buffered and waits for it."""
+        with self._cond:
+            self._cond.notify()
+            self._cond.wait_for(lambda: not self._buffer and not self._in_flight, timeout)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(SHUTDOWN_TIMEOUT)
+
+    # --- CONSUMER SIDE ---
+    def _run(self):
+        failed = False
+        while True:
+            with self._cond:
+                if not self._closed and (failed or len(self._buffer) < FLUSH_SIZE):
+                    self._cond.wait(FLUSH_INTERVAL)
+                closed = self._closed
+                chunk = list(self._buffer.items())
+                self._buffer.clear()
+                self._in_flight = dict(chunk)
+
+            if not chunk:
+                if closed:
+                    return
+                if self._has_spool():
+                    failed = not self._replay_spool()
+                continue
+
+            written = self._write(chunk)
+            failed = not written
+
+            with self._cond:
+                self._in_flight = {}
+                amendments = {i: self._amendments.pop(i) for i, _ in chunk if i in self._amendments}
+                self._cond.notify_all()
+            if written:
+                self._apply_amendments(amendments)
+            else:
+                self._spool([(i, dict(e, **amendments.get(i, {}))) for i, e in chunk])
+
+    def _write(self, chunk: List[Tuple[str, dict]]) -> bool:
+        try:
+            store.add_logs(chunk)
+            metrics.inc("audit.written", len(chunk))
+            return True
+        except Exception as e:
+            print(f"[Audit] Write failed, spooling {len(chunk)} entries: {e}")
+            return False
+
+    def _apply_amendments(self, amendments: Dict[str, dict]):
+        for log_id, fields in amendments.items():
+            try:
+                store.update_log(log_id, fields)
+            except Exception as e:
+                print(f"[Audit] Amending {log_id} failed: {e}")
+
+    # --- LOCAL SPOOL ---
+    def _spool(self, entries: List[Tuple[str, dict]]):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self._spool_path)), exist_ok=True)
+            with open(self._spool_path, "a") as f:
+                for log_id, entry in entries:
+                    f.write(json.dumps({"id": log_id, "entry": entry}, default=_encode) + "\n")
+            metrics.inc("audit.spooled", len(entries))
+        except OSError as e:
+            print(f"[Audit] Spool write failed, {len(entries)} entries lost: {e}")
+
+    def _has_spool(self) -> bool:
+        return os.path.exists(self._spool_path) or os.path.exists(self._spool_path + ".replay")
+
+    def _replay_spool(self) -> bool:
+        """Writes spooled entries back to the store. Returns False if the store is still failing."""
+        replaying = self._spool_path + ".replay"
+        try:
+            # A leftover .replay file is from a replay interrupted by a crash
+            if not os.path.exists(replaying):
+                os.replace(self._spool_path, replaying)
+            with open(replaying) as f:
+                entries = [_decode(json.loads(line)) for line in f if line.strip()]
+        except (OSError, ValueError) as e:
+            print(f"[Audit] Spool read failed: {e}")
+            return False
+        ok = self._write(entries)
+        if ok:
+            print(f"[Audit] Replayed {len(entries)} spooled entries")
+        else:
+            self._spool(entries)
+        os.remove(replaying)
+        return ok
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    return str(value)
+
+
+def _decode(record: dict) -> Tuple[str, dict]:
+    entry = {
+        k: datetime.fromisoformat(v["$datetime"]) if isinstance(v, dict) and "$datetime" in v else v
+        for k, v in record["entry"].items()
+    }
+    return record["id"], entry
+
+
+# Global Instance
+audit = AuditLogger()
@@ -0,0 +1,140 @@
+import base64
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "blobs")
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+# Memory for blobs warmed ahead of playback (LRU by bytes)
+HOT_CACHE_BYTES = int(os.getenv("PA_AUDIO_CACHE_MB", "64")) * 1024 * 1024
+
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+_DATA_URL_RE = re.compile(r"^data:(?P<type>[^;,]+)?(?:;[^,]*)?;base64,(?P<payload>.*)$", re.DOTALL)
+
+
+class BlobStore:
+    """
+    Content-addressed blob store on local disk (audio recordings).
+
+    Blobs are keyed by the sha256 of their bytes, so identical uploads are
+    stored once and a hash never changes meaning (safe to cache forever).
+    Files are sharded by the first two hex digits: <root>/ab/abcdef...
+    Blobs about to be played can be warmed into a bounded memory cache.
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT, hot_bytes: int = HOT_CACHE_BYTES):
+        self.root = root
+        self.hot_bytes = hot_bytes
+        self._hot: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._hot_size = 0
+        self._hot_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def is_hash(value: str) -> bool:
+        return bool(value) and bool(_HASH_RE.match(value))
+
+    def path(self, blob_hash: str) -> str:
+        if not self.is_hash(blob_hash):
+            raise ValueError(f"Invalid blob hash: {blob_hash!r}")
+        return os.path.join(self.root, blob_hash[:2], blob_hash)
+
+    def exists(self, blob_hash: str) -> bool:
+        return self.is_hash(blob_hash) and os.path.exists(self.path(blob_hash))
+
+    def put(self, data: bytes, content_type: str = DEFAULT_CONTENT_TYPE) -> str:
+        """Stores `data` (if not already present) and returns its hash."""
+        blob_hash = hashlib.sha256(data).hexdigest()
+        target = self.path(blob_hash)
+        if os.path.exists(target):
+            return blob_hash # Deduplicated
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Write-then-rename so readers never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            with open(target + ".meta", "w") as f:
+                json.dump({"content_type": content_type, "size": len(data)}, f)
+            os.replace(tmp, target)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return blob_hash
+
+    def put_data_url(self, data_url: str) -> str:
+        """Stores a base64 data URL (legacy inline audio) and returns its hash."""
+        match = _DATA_URL_RE.match(data_url)
+        if match:
+            content_type = match.group("type") or DEFAULT_CONTENT_TYPE
+            payload = match.group("payload")
+        else:
+            # Bare base64 was historically treated as webm by the player
+            content_type, payload = "audio/webm", data_url
+        return self.put(base64.b64decode(payload, validate=False), content_type)
+
+    def stat(self, blob_hash: str) -> Optional[Tuple[int, str]]:
+        """(size, content_type) of a stored blob, or None if missing."""
+        try:
+            size = os.path.getsize(self.path(blob_hash))
+        except (OSError, ValueError):
+            return None
+        try:
+            with open(self.path(blob_hash) + ".meta") as f:
+                content_type = json.load(f).get("content_type", DEFAULT_CONTENT_TYPE)
+        except (OSError, ValueError):
+            content_type = DEFAULT_CONTENT_TYPE
+        return size, content_type
+
+    def read(self, blob_hash: str, start: int = 0, length: Optional[int] = None) -> bytes:
+        with open(self.path(blob_hash), "rb") as f:
+            f.seek(start)
+            return f.read() if length is None else f.read(length)
+
+    def warm(self, blob_hash: str) -> bool:
+        """Loads a blob into the memory cache (if it fits). True once it is cached."""
+        if self.hot(blob_hash) is not None:
+            return True
+        info = self.stat(blob_hash)
+        if info is None or info[0] > self.hot_bytes // 4:
+            return False # Missing, or too large to be worth pinning
+        data = self.read(blob_hash)
+        with self._hot_lock:
+            if blob_hash not in self._hot:
+                self._hot[blob_hash] = (data, info[1])
+                self._hot_size += len(data)
+            while self._hot_size > self.hot_bytes:
+                _, (evicted, _) = self._hot.popitem(last=False)
+                self._hot_size -= len(evicted)
+        return True
+
+    def delete(self, blob_hash: str):
+        """Removes a blob and its memory copy (missing blobs are ignored)."""
+        with self._hot_lock:
+            entry = self._hot.pop(blob_hash, None)
+            if entry is not None:
+                self._hot_size -= len(entry[0])
+        for path in (self.path(blob_hash), self.path(blob_hash) + ".meta"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def hot(self, blob_hash: str) -> Optional[Tuple[bytes, str]]:
+        """(data, content_type) of a warmed blob, or None."""
+        with self._hot_lock:
+            entry = self._hot.get(blob_hash)
+            if entry is not None:
+                self._hot.move_to_end(blob_hash)
+            return entry
+
+
+# Global Instance
+blobs = BlobStore(os.getenv("PA_BLOB_DIR", DEFAULT_ROOT))
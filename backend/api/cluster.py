@@ -0,0 +1,364 @@
+import atexit
+import http.client
+import ipaddress
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+from api.storage import store
+from api.events import broadcaster
+from api.metrics import metrics
+
+LEASE_TTL = float(os.getenv("PA_LEASE_TTL", "10"))  # Seconds a silent leader keeps the lease
+RENEW_INTERVAL = LEASE_TTL / 3
+CONTROL_BIND = os.getenv("PA_CONTROL_BIND", "127.0.0.1")
+CONTROL_PORT = int(os.getenv("PA_CONTROL_PORT", "0"))  # 0 = any free port (advertised in the lease)
+ADVERTISE_HOST = os.getenv("PA_ADVERTISE_HOST") or (
+    CONTROL_BIND if CONTROL_BIND not in ("0.0.0.0", "") else socket.gethostname()
+)
+CONTROL_TOKEN = os.getenv("PA_CONTROL_TOKEN", "")  # Shared secret between nodes (required off loopback)
+RPC_TIMEOUT = float(os.getenv("PA_CONTROL_TIMEOUT", "2"))
+HEARTBEAT_INTERVAL = 5   # Seconds between keep-alives on the relayed event stream
+RELAY_BUFFER = 1000      # Events held per follower before new ones are dropped
+RELAY_RETRY = 1.0        # Seconds between relay reconnect attempts
+
+
+class ControllerUnavailable(RuntimeError):
+    """No reachable controller leader (election in progress or leader down)."""
+
+
+class LeaderElection:
+    """
+    Lease-based leader election through the store.
+
+    The holder of the lease row renews it every RENEW_INTERVAL and steps down
+    if it cannot renew before the lease would lapse. Everyone else retries on
+    the same cadence and takes over once the lease has expired. The first
+    round runs synchronously in start(), so a lone process leads at once.
+    """
+
+    def __init__(self, name: str, holder: str, info: dict,
+                 on_elected: Callable[[], None], on_deposed: Callable[[], None],
+                 ttl: float = LEASE_TTL):
+        self.name = name
+        self.holder = holder
+        self.info = info
+        self.ttl = ttl
+        self.is_leader = False
+        self.leader: Optional[dict] = None  # Last lease seen (holder + info)
+        self._on_elected = on_elected
+        self._on_deposed = on_deposed
+        self._expires_at = 0.0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._campaign()
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Gives up leadership (if held) so a successor need not wait out the lease."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        if self.is_leader:
+            self._step_down()
+            try:
+                store.release_lease(self.name, self.holder)
+            except Exception as e:
+                print(f"[Cluster] Lease release failed: {e}")
+
+    def _run(self):
+        while not self._stopped.wait(RENEW_INTERVAL):
+            self._campaign()
+
+    def _campaign(self):
+        started = time.time()
+        try:
+            won = store.acquire_lease(self.name, self.holder, self.ttl, self.info)
+            if won:
+                self._expires_at = started + self.ttl
+        except Exception as e:
+            print(f"[Cluster] Lease renewal failed: {e}")
+            metrics.inc("cluster.lease_errors")
+            # Keep leading only if the lease we hold outlives the next attempt
+            won = self.is_leader and started + RENEW_INTERVAL < self._expires_at
+
+        if won:
+            self.leader = dict(self.info, holder=self.holder)
+            if not self.is_leader:
+                self._take_over()
+            return
+
+        if self.is_leader:
+            self._step_down()
+        try:
+            self.leader = store.get_lease(self.name)
+        except Exception:
+            self.leader = None
+
+    def _take_over(self):
+        print(f"[Cluster] {self.holder} elected controller leader")
+        try:
+            self._on_elected()
+        except Exception as e:
+            # Could not start the engine: let someone else lead
+            print(f"[Cluster] Failed to take over, releasing lease: {e}")
+            try:
+                store.release_lease(self.name, self.holder)
+            except Exception:
+                pass
+            return
+        self.is_leader = True
+        metrics.inc("cluster.elections")
+
+    def _step_down(self):
+        print(f"[Cluster] {self.holder} stepping down as controller leader")
+        self.is_leader = False
+        self._on_deposed()
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Followers dropping their connection (leader change, shutdown) is routine
+        if not isinstance(sys.exc_info()[1], OSError):
+            super().handle_error(request, client_address)
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False # Hostname or wildcard ("", 0.0.0.0): reachable from the network
+
+
+class ControlServer:
+    """
+    Internal HTTP endpoint through which followers reach the leader's engine.
+
+      POST /rpc/<method>   JSON kwargs -> {"result": ...}; 409 unless leading
+      GET  /events         newline-delimited JSON of every broadcast event
+
+    Every worker runs one (on an ephemeral port by default) and advertises
+    its address in the lease; only the leader's answers.
+    """
+
+    def __init__(self, methods: Dict[str, Callable], is_leader: Callable[[], bool],
+                 bind: str = CONTROL_BIND, port: int = CONTROL_PORT):
+        if not CONTROL_TOKEN and not _is_loopback(bind):
+            # Any host could otherwise stop tasks, start playback or publish events
+            raise RuntimeError(f"PA_CONTROL_TOKEN must be set to serve the controller on {bind!r} "
+                               "(or bind PA_CONTROL_BIND to loopback)")
+        self._methods = methods
+        self._is_leader = is_leader
+        self._httpd = _HTTPServer((bind, port), self._handler())
+        self.address = f"{ADVERTISE_HOST}:{self._httpd.server_address[1]}"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass # Per-request access logs would drown the controller logs
+
+            def _reply(self, status: int, body: dict):
+                payload = json.dumps(body, default=str).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _authorized(self) -> bool:
+                if CONTROL_TOKEN and self.headers.get("X-Control-Token") != CONTROL_TOKEN:
+                    self._reply(403, {"error": "Forbidden"})
+                    return False
+                if not server._is_leader():
+                    self._reply(409, {"error": "Not the controller leader"})
+                    return False
+                return True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if not self.path.startswith("/rpc/"):
+                    self._reply(404, {"error": "Not found"})
+                    return
+                method = server._methods.get(self.path[len("/rpc/"):])
+                if method is None:
+                    self._reply(404, {"error": "Unknown method"})
+                    return
+                if not self._authorized():
+                    return
+                try:
+                    result = method(**json.loads(body or b"{}"))
+                except Exception as e:
+                    self._reply(500, {"error": str(e)})
+                else:
+                    self._reply(200, {"result": result})
+
+            def do_GET(self):
+                if self.path != "/events":
+                    self._reply(404, {"error": "Not found"})
+                    return
+                if not self._authorized():
+                    return
+                server._stream_events(self)
+
+        return Handler
+
+    def _stream_events(self, handler: BaseHTTPRequestHandler):
+        events = queue.Queue(maxsize=RELAY_BUFFER)
+
+        def listener(event, data):
+            try:
+                events.put_nowait((event, data))
+            except queue.Full:
+                metrics.inc("cluster.relay_dropped") # Follower too slow; next 'state' catches it up
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/x-ndjson")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+        broadcaster.add_listener(listener)
+        try:
+            while self._is_leader():
+                try:
+                    item = events.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    line = b"\n" # Keep-alive; also notices a dead follower
+                else:
+                    line = json.dumps({"event": item[0], "data": item[1]}, default=str).encode() + b"\n"
+                handler.wfile.write(line)
+                handler.wfile.flush()
+        except OSError:
+            pass # Follower went away
+        finally:
+            broadcaster.remove_listener(listener)
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class ControlClient:
+    """Follower side of ControlServer: calls the current leader's engine."""
+
+    def __init__(self, leader_address: Callable[[], Optional[str]]):
+        self._leader_address = leader_address
+        self._local = threading.local() # One keep-alive connection per thread
+
+    def call(self, method: str, **kwargs):
+        address = self._leader_address()
+        if not address:
+            raise ControllerUnavailable("No controller leader elected")
+        body = json.dumps(kwargs, default=str)
+        headers = {"Content-Type": "application/json", "X-Control-Token": CONTROL_TOKEN}
+        # A kept-alive connection may have been closed by the leader: retry once
+        for attempt in range(2):
+            conn = self._connection(address)
+            try:
+                conn.request("POST", f"/rpc/{method}", body, headers)
+                response = conn.getresponse()
+                payload = json.loads(response.read() or b"{}")
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                self._local.conn = None
+                conn.close()
+                if attempt:
+                    metrics.inc("cluster.rpc_errors")
+                    raise ControllerUnavailable(f"Controller leader {address} unreachable: {e}") from e
+                continue
+            break
+        if response.status == 409:
+            raise ControllerUnavailable("Controller leadership is changing")
+        if response.status != 200:
+            raise RuntimeError(payload.get("error", f"Controller error {response.status}"))
+        return payload.get("result")
+
+    def _connection(self, address: str) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "address", None) != address:
+            if conn is not None:
+                conn.close()
+            host, port = address.rsplit(":", 1)
+            conn = http.client.HTTPConnection(host, int(port), timeout=RPC_TIMEOUT)
+            self._local.conn, self._local.address = conn, address
+        return conn
+
+
+class EventRelay:
+    """
+    Follower side of GET /events: re-delivers the leader's broadcast events
+    to this worker's SSE clients, and forwards events published here (e.g.
+    by a route) to the leader so every worker sees them in one order.
+    """
+
+    def __init__(self, leader_address: Callable[[], Optional[str]], client: ControlClient):
+        self._leader_address = leader_address
+        self._client = client
+        self._active = threading.Event()
+        self._outbox = queue.Queue()
+        self.state: Optional[dict] = None # Latest relayed 'state' event
+        threading.Thread(target=self._receive_loop, daemon=True).start()
+        threading.Thread(target=self._send_loop, daemon=True).start()
+
+    def start(self):
+        self.state = None
+        broadcaster.set_forwarder(self._forward)
+        self._active.set()
+
+    def stop(self):
+        self._active.clear()
+        broadcaster.set_forwarder(None)
+
+    def _forward(self, event: str, data: dict):
+        # Never block the publisher (it may hold the controller lock)
+        self._outbox.put((event, data))
+
+    def _send_loop(self):
+        while True:
+            event, data = self._outbox.get()
+            try:
+                self._client.call("publish", event=event, data=data)
+            except Exception as e:
+                print(f"[Cluster] Forwarding '{event}' event failed: {e}")
+
+    def _receive_loop(self):
+        while True:
+            self._active.wait()
+            address = self._leader_address()
+            if not address:
+                time.sleep(RELAY_RETRY)
+                continue
+            host, port = address.rsplit(":", 1)
+            conn = http.client.HTTPConnection(host, int(port), timeout=HEARTBEAT_INTERVAL * 3)
+            try:
+                conn.request("GET", "/events", headers={"X-Control-Token": CONTROL_TOKEN})
+                response = conn.getresponse()
+                if response.status != 200:
+                    raise ControllerUnavailable(f"Relay refused ({response.status})")
+                for line in response:
+                    if not self._active.is_set() or self._leader_address() != address:
+                        break
+                    if not line.strip():
+                        continue
+                    message = json.loads(line)
+                    if message["event"] == "state":
+                        self.state = message["data"]
+                    broadcaster.deliver(message["event"], message["data"])
+            except (OSError, http.client.HTTPException, ValueError, ControllerUnavailable):
+                time.sleep(RELAY_RETRY)
+            finally:
+                conn.close()
@@ -1,11 +1,66 @@
+import itertools
+import math
+import os
+import socket
 import threading
 import time
 import uuid
 from enum import IntEnum
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
-from firebase_admin import firestore
-from api.firebaseConfig import db
+from typing import Callable, Optional, List, Dict, NamedTuple, Tuple
+from api.storage import store, NotFoundError
+from api.schedule_queue import ScheduleQueue, QueueView
+from api.publisher import publisher
+from api.events import broadcaster
+from api.recurrence import next_occurrence
+from api.metrics import InstrumentedLock
+from api.tts import speech
+from api.cluster import LeaderElection, ControlServer, ControlClient, EventRelay, ControllerUnavailable
+
+# Time-shifted schedules are only written back once they fall within this window
+SHIFT_PERSIST_HORIZON = timedelta(hours=int(os.getenv("PA_SHIFT_HORIZON_HOURS", "24")))
+# How often the shift writer re-checks for shifted schedules entering the window
+SHIFT_SYNC_INTERVAL = 300
+
+# Pending schedules are loaded from the store one look-ahead window at a time
+BOOTSTRAP_WINDOW = timedelta(days=int(os.getenv("PA_BOOTSTRAP_WINDOW_DAYS", "7")))
+# Schedules missed by more than this (e.g. while the server was down) are not replayed
+BOOTSTRAP_GRACE = timedelta(minutes=5)
+BOOTSTRAP_RETRY = 30 # Seconds
+
+# Written back when a recurring rule moves on to its next occurrence
+RULE_FIELDS = ('date', 'time', 'anchor_date', 'anchor_time')
+
+# Queued schedules hold no payload until they are this close to starting;
+# the scheduler reloads it by id from the store (off the lock) in time.
+PAYLOAD_LOOKAHEAD = float(os.getenv("PA_PAYLOAD_LOOKAHEAD_SECONDS", "30"))
+PAYLOAD_RETRY = 5 # Seconds
+
+# Schedules starting within this window are announced to endpoints ('prefetch'
+# event) so their audio is loaded, cached and decoded before they play.
+PREFETCH_WINDOW = float(os.getenv("PA_PREFETCH_SECONDS", "300"))
+PREFETCH_INTERVAL = 15 # Seconds between re-announcements (queue changes announce at once)
+PREFETCH_MAX = 20      # Schedules per announcement
+
+# With several workers/nodes, one elected leader runs the engine (see ControllerNode).
+# Off = every process runs its own engine (single-process deployments only).
+LEADER_ELECTION = os.getenv("PA_LEADER_ELECTION", "1") != "0"
+LEADER_LEASE = "controller"
+
+# Each zone is an independent arbitration channel. Tasks naming other zones
+# get a channel on demand; no zones or "All Zones" means every zone.
+ZONES = [z.strip() for z in os.getenv("PA_ZONES", "Admin Office,Main Hall,Library,Classrooms").split(",") if z.strip()]
+ALL_ZONES = ("All Zones", "All")
+# Partition key (and Task.zones) of schedules for every zone: stable while
+# channels are added on demand, resolved to the current zones when needed
+EVERY_ZONE = frozenset()
+
+# Conflict detection needs how long a schedule plays; a schedule may state
+# its `duration` (seconds), otherwise it is estimated from the message.
+SPEECH_WORDS_PER_SECOND = 2.5 # ~150 words per minute text-to-speech
+ANNOUNCEMENT_PADDING = 3.0    # Chime and pauses around a message (seconds)
+VOICE_DURATION = float(os.getenv("PA_VOICE_DURATION_SECONDS", "30")) # Recordings of unknown length
+MAX_DURATION = float(os.getenv("PA_MAX_DURATION_SECONDS", "900")) # Longest announcement (bounds overlap queries)
 
 # --- 1. Constants & Enums ---
 class Priority(IntEnum):
@@ -29,7 +84,45 @@ class TaskType:
     BACKGROUND = 'background'
 
 # --- 2. Data Structures ---
+_ZONE_SETS: Dict[frozenset, frozenset] = {}
+
+def _target_zones(data: Optional[dict]) -> frozenset:
+    """
+    Parsed `zones` of a payload; empty means every zone.
+    Interned: a 100k calendar shares a handful of sets.
+    """
+    zones = data.get('zones') if data else None
+    if isinstance(zones, str):
+        zones = zones.split(',')
+    names = frozenset(z.strip() for z in zones or [] if z and z.strip())
+    if any(z in names for z in ALL_ZONES):
+        names = EVERY_ZONE
+    return _ZONE_SETS.setdefault(names, names)
+
+def estimate_duration(data: Optional[dict]) -> float:
+    """Expected play time of a schedule payload, in seconds (at most MAX_DURATION)."""
+    if not data:
+        return VOICE_DURATION
+    try:
+        duration = float(data.get('duration') or 0)
+    except (TypeError, ValueError):
+        duration = 0
+    if duration > 0:
+        return min(duration, MAX_DURATION)
+    if data.get('type') == 'voice' or data.get('audioHash'):
+        return VOICE_DURATION
+    return min(MAX_DURATION,
+               ANNOUNCEMENT_PADDING + len(str(data.get('message') or '').split()) / SPEECH_WORDS_PER_SECOND)
+
 class Task:
+    """
+    One unit of playback. Slotted, with epoch-second times, because a full
+    calendar keeps one per queued schedule. `data` is the payload (message,
+    audioHash, repeat...): queued schedules drop it until they are about to
+    start (see PAYLOAD_LOOKAHEAD) and the scheduler reloads it by id.
+    """
+    __slots__ = ('id', 'type', 'priority', 'data', 'status', 'zones', 'created_ts', 'scheduled_ts')
+
     def __init__(self, 
                  type: str, 
                  priority: int, 
@@ -43,61 +136,135 @@ class Task:
         self.priority = priority
         self.data = data
         self.status = status
-        self.created_at = created_at if created_at else datetime.now()
-        self.scheduled_time = scheduled_time if scheduled_time else datetime.now()
+        self.zones = _target_zones(data)
+        now = time.time()
+        self.created_ts = created_at.timestamp() if created_at else now
+        self.scheduled_ts = scheduled_time.timestamp() if scheduled_time else now
+
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self.created_ts)
+
+    @property
+    def scheduled_time(self) -> datetime:
+        return datetime.fromtimestamp(self.scheduled_ts)
+
+    @scheduled_time.setter
+    def scheduled_time(self, value: datetime):
+        self.scheduled_ts = value.timestamp()
 
     def to_dict(self):
         return {
             'id': self.id,
             'type': self.type,
             'priority': int(self.priority),
-            'data': self.data,
+            'data': self.data or {},
             'status': int(self.status),
             'created_at': self.created_at.isoformat(),
             'scheduled_time': self.scheduled_time.isoformat()
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "Task":
+        return cls(id=data['id'], type=data['type'], priority=Priority(data['priority']),
+                   data=data.get('data') or {}, status=State(data['status']),
+                   created_at=datetime.fromisoformat(data['created_at']),
+                   scheduled_time=datetime.fromisoformat(data['scheduled_time']))
+
+    def copy(self) -> "Task":
+        data = self.data # Read once: queued payloads are swapped in and out by the scheduler
+        task = Task(id=self.id, type=self.type, priority=self.priority,
+                    data=dict(data) if data is not None else None, status=self.status)
+        task.zones, task.created_ts, task.scheduled_ts = self.zones, self.created_ts, self.scheduled_ts
+        return task
+
+class ControllerSnapshot(NamedTuple):
+    """
+    Immutable view of the controller. A new one is swapped in (never
+    mutated) on every transition, so readers need no lock.
+    """
+    version: int
+    state: dict                    # Also what /events and system/state carry
+    emergency_user: Optional[str]
+
 # --- 3. The Controller ---
 class PAController:
-    _instance = None
+    """
+    The arbitration engine: zone channels, schedule queues, scheduler.
+    Only the elected leader runs one (start() on election, shutdown() when
+    deposed); use the `controller` node below rather than this directly.
+    """
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(PAController, cls).__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
-
-    def __init__(self):
-        if self._initialized:
-            return
-        
-        self._lock = threading.Lock()  # THE MUTEX
-        self.current_task: Optional[Task] = None
-        self.queue: List[Task] = []    # Priority Queue for Schedules
-        self.emergency_mode = False
+    def __init__(self, clock: Callable[[], datetime] = datetime.now):
+        # Injectable for simulated-time benchmarks (bench_controller.py)
+        self._clock = clock
+        self._lock = InstrumentedLock("controller.lock")  # THE MUTEX
+        # Scheduler sleeps on this until the next due time or a queue change
+        self._wakeup = threading.Condition(self._lock)
+        # Zone -> task currently playing there (one task may hold several zones)
+        self.channels: Dict[str, Optional[Task]] = {zone: None for zone in ZONES}
+        # Schedules partitioned by target zone set, so a schedule blocked in
+        # one zone never holds back a due schedule for another
+        self.queues: Dict[frozenset, ScheduleQueue] = {}
+        self._shift_pending = threading.Event()
+        self._prefetch_pending = threading.Event()
+        self.bootstrapped = threading.Event() # Set once the first window is loaded
         self._running = True
+        self._stopping = threading.Event()
         
-        # Track interruption duration to shift queue
-        self.pause_start_time: Optional[datetime] = None
-        
-        # Reset Logic on init to ensure clean state
+        # Track interruption duration to shift queue (per partition)
+        self._paused: Dict[frozenset, datetime] = {}
+
+        # Copy-on-write read path: state readers and status endpoints never
+        # take _lock. The queue listing is cached per _queue_version and
+        # rebuilt from copy-on-write queue views (the lock only takes them).
+        self._snapshot = ControllerSnapshot(0, {'active_task': None, 'priority': int(Priority.IDLE), 'mode': 'IDLE',
+                                                'zones': dict(self.channels), 'active_tasks': []}, None)
+        self._queue_version = 0
+        self._queue_view: Tuple[int, Tuple[Task, ...]] = (0, ())
+
+    def start(self):
+        # Reset Logic on start to ensure clean state
         self._reset_state()
         
         # Start Scheduler Thread
         self.scheduler_thread = threading.Thread(target=self._scheduler_loop, daemon=True)
         self.scheduler_thread.start()
+
+        # Start Shift Writer Thread (persists time shifts off the hot path)
+        self.shift_writer_thread = threading.Thread(target=self._shift_writer_loop, daemon=True)
+        self.shift_writer_thread.start()
+
+        # Start Bootstrap Thread (reloads persisted Pending schedules)
+        self.bootstrap_thread = threading.Thread(target=self._bootstrap_loop, daemon=True)
+        self.bootstrap_thread.start()
+
+        # Start Prefetch Thread (announces upcoming audio to endpoints)
+        self.prefetch_thread = threading.Thread(target=self._prefetch_loop, daemon=True)
+        self.prefetch_thread.start()
         
-        self._initialized = True
         print("PA Controller Initialized")
 
+    def shutdown(self):
+        """Stops the background threads (leadership lost). Queued state is dropped."""
+        with self._lock:
+            self._running = False
+            self._stopping.set()
+            self._wakeup.notify_all()
+        self._shift_pending.set()
+        self._prefetch_pending.set()
+        print("PA Controller Stopped")
+
     def _reset_state(self):
         """Resets Firestore state to Idle on startup"""
         try:
-            db.collection('system').document('state').set({
+            store.set_system_state({
                 'active_task': None,
                 'priority': 0,
                 'mode': 'IDLE',
-                'timestamp': firestore.SERVER_TIMESTAMP
+                'zones': {zone: None for zone in self.channels},
+                'active_tasks': [],
+                'timestamp': store.server_timestamp()
             })
         except Exception as e:
             print(f"Failed to reset state: {e}")
@@ -106,9 +273,10 @@ class PAController:
     def request_playback(self, new_task: Task) -> bool:
         with self._lock:  # Critical Section
             print(f"[Controller] Request: {new_task.type} (Pri: {new_task.priority})")
+            zones = self._zones_of(new_task)
 
             # 1. Emergency Check (Invincible)
-            if self.emergency_mode and new_task.priority < Priority.EMERGENCY:
+            if new_task.priority < Priority.EMERGENCY and any(self._holds(z, Priority.EMERGENCY) for z in zones):
                 print(f"[Controller] Denied: Emergency Active")
                 return False
 
@@ -119,190 +287,853 @@ class PAController:
                  self._add_to_queue(new_task)
                  return True 
 
-            # 3. Priority Check
-            current_pri = self.current_task.priority if self.current_task else Priority.IDLE
-            
-            # Allow replacing Background with Background (e.g. Track Switch)
-            is_background_swap = (new_task.priority == current_pri == Priority.BACKGROUND)
-
-            if new_task.priority > current_pri or is_background_swap:
-                # PREEMPTION (Higher Priority Wins or Background Swap)
-                self._preempt_current_task(new_task.priority)
-                self._start_task(new_task)
-                return True
-            
-            else:
-                # Lower/Equal priority -> Busy
-                print(f"[Controller] Denied: Busy (Current Pri: {current_pri})")
-                return False
+            # 3. Priority Check (per zone: every targeted zone must be won)
+            holders = self._holders(zones)
+            for current in holders:
+                # Allow replacing Background with Background (e.g. Track Switch)
+                is_background_swap = (new_task.priority == current.priority == Priority.BACKGROUND)
+                if not (new_task.priority > current.priority or is_background_swap):
+                    # Lower/Equal priority -> Busy
+                    print(f"[Controller] Denied: Busy (Current Pri: {current.priority})")
+                    return False
+
+            # PREEMPTION (Higher Priority Wins or Background Swap)
+            for current in holders:
+                self._preempt_task(current)
+            self._start_task(new_task)
+            return True
 
     def stop_task(self, task_id: str, task_type: str = None):
         """Called to manually stop a task (e.g., Stop Broadcast, Clear Emergency)"""
         with self._lock:
-            if not self.current_task:
+            active = self._active_tasks()
+            if not active:
                 return
 
             # If requesting to stop specific task, check ID
-            if task_id and self.current_task.id != task_id:
-                print(f"[Controller] Denied Stop: ID Mismatch ({task_id} vs {self.current_task.id})")
-                return
-
-            # Anti-Zombie: Require ID for Realtime Tasks to prevent race conditions
-            # (e.g. Frontend "Stop" from previous session killing new session)
-            if not task_id and (self.current_task.type == TaskType.VOICE or self.current_task.type == TaskType.TEXT):
-                print(f"[Controller] Denied Stop: Missing Task ID for Realtime Task")
-                return
+            if task_id:
+                targets = [t for t in active if t.id == task_id]
+                if not targets:
+                    print(f"[Controller] Denied Stop: ID Mismatch ({task_id} not active)")
+                    return
+            else:
+                targets = [t for t in active if task_type is None or t.type == task_type]
+                # Anti-Zombie: Require ID for Realtime Tasks to prevent race conditions
+                # (e.g. Frontend "Stop" from previous session killing new session)
+                if any(t.type == TaskType.VOICE or t.type == TaskType.TEXT for t in targets):
+                    print(f"[Controller] Denied Stop: Missing Task ID for Realtime Task")
+                    targets = [t for t in targets if t.type != TaskType.VOICE and t.type != TaskType.TEXT]
+                if not targets:
+                    return
 
-            print(f"[Controller] Stopping Task: {self.current_task.id}")
+            for finished in targets:
+                print(f"[Controller] Stopping Task: {finished.id}")
+                self._release(finished)
+            self._publish_state()
             
-            if self.current_task.priority == Priority.EMERGENCY:
-                self.emergency_mode = False
-            
-            self.current_task = None
-            self._update_firestore_state(None, Priority.IDLE, 'IDLE')
-            
-            # Application of Time Shift (System became IDLE)
+            # Application of Time Shift (freed zones resume their queues)
             self._apply_queue_shift()
 
-    def get_queue(self):
-        return self.queue
+            # Recurring schedules re-arm only after the shift, so it does not move them
+            for finished in targets:
+                if finished.type == TaskType.SCHEDULE:
+                    self._queue_next_occurrence(finished)
+            self._wake_scheduler()
+
+    def queue_schedules(self, tasks: List[Task]) -> int:
+        """Merges many schedules (e.g. an import) into the queue under one lock."""
+        with self._lock:
+            for task in tasks:
+                self._enqueue(task)
+            if tasks:
+                self._publish_queue_change('loaded', None)
+                self._wake_scheduler()
+        print(f"[Controller] Queued {len(tasks)} imported schedules")
+        return len(tasks)
+
+    @property
+    def snapshot(self) -> ControllerSnapshot:
+        return self._snapshot
+
+    def get_state(self) -> dict:
+        return dict(self._snapshot.state)
+
+    def get_queue(self) -> List[Task]:
+        """
+        Copies of the queued tasks in run order (rebuilt only after a queue
+        change). The lock is held only to take queue views; the copying and
+        sorting run off it.
+        """
+        version, tasks = self._queue_view
+        if version != self._queue_version:
+            with self._lock:
+                version = self._queue_version
+                views = [queue.view() for queue in self.queues.values()]
+            copies = []
+            for view in views:
+                for task, scheduled_ts in view.tasks():
+                    copy = task.copy()
+                    copy.scheduled_ts = scheduled_ts
+                    copies.append(copy)
+            tasks = tuple(sorted(copies, key=lambda t: t.scheduled_ts))
+            self._queue_view = (version, tasks)
+        return list(tasks)
         
     def remove_from_queue(self, schedule_id: str):
         with self._lock:
-             self.queue = [t for t in self.queue if t.id != schedule_id]
+             if self._dequeue(schedule_id):
+                 self._publish_queue_change('removed', schedule_id)
+             self._wake_scheduler()
 
     def get_active_emergency_user(self) -> Optional[str]:
+        return self._snapshot.emergency_user
+
+    # --- CONFLICTS ---
+    def find_conflicts(self, task: Task) -> dict:
+        """
+        Queued schedules that would overlap `task` (sharing a zone while it
+        plays), and the earliest start from its scheduled_time on that
+        overlaps none. Each step is a bisection per partition touching its
+        zones; only a chain of back-to-back conflicts adds steps. Runs on
+        queue views, so the controller lock is held only to take them.
+        """
         with self._lock:
-            if self.current_task and self.current_task.priority == Priority.EMERGENCY:
-                 return self.current_task.data.get('user')
-            return None
+            zones = self._zones_of(task)
+            views = self._views(zones)
+        duration = estimate_duration(task.data)
+        begin = task.scheduled_ts
+        conflicts = found = self._overlapping(views, begin, begin + duration, task.id)
+        slot = begin
+        while found:
+            slot = max(finish for _, finish, _, _ in found)
+            found = self._overlapping(views, slot, slot + duration, task.id)
+        return {
+            'conflicts': [self._conflict_entry(*entry) for entry in conflicts],
+            'next_free_slot': datetime.fromtimestamp(slot).isoformat()
+        }
+
+    def scan_conflicts(self, start: datetime, end: datetime, limit: int = 500) -> List[dict]:
+        """Pairs of queued schedules overlapping in a shared zone, starting in [start, end)."""
+        with self._lock:
+            views = self._views()
+        entries = [(begin, finish, task.id, zones)
+                   for zones, view in views
+                   for task, begin, finish in view.overlapping(start.timestamp(), end.timestamp())]
+
+        # Sweep in start order, keeping only the schedules still playing
+        entries.sort()
+        playing, pairs = [], []
+        for entry in entries:
+            playing = [other for other in playing if other[1] > entry[0]]
+            for other in playing if entry[0] >= start.timestamp() else ():
+                if other[3] & entry[3]:
+                    pairs.append({
+                        'first': self._conflict_entry(*other),
+                        'second': self._conflict_entry(*entry),
+                        'overlap_seconds': round(min(other[1], entry[1]) - entry[0], 1)
+                    })
+                    if len(pairs) >= limit:
+                        return pairs
+            playing.append(entry)
+        return pairs
+
+    def _views(self, zones: Optional[frozenset] = None) -> List[Tuple[frozenset, QueueView]]:
+        """(zones, view) of every partition sharing `zones` (all if None). Caller holds _lock."""
+        return [(self._zones_in(partition), queue.view())
+                for partition, queue in self.queues.items()
+                if zones is None or self._zones_in(partition) & zones]
+
+    @staticmethod
+    def _overlapping(views: List[Tuple[frozenset, QueueView]], begin: float, end: float,
+                     exclude: str) -> List[tuple]:
+        """(start, end, task id, zones) in `views` overlapping [begin, end)."""
+        return [(start, finish, task.id, zones)
+                for zones, view in views
+                for task, start, finish in view.overlapping(begin, end) if task.id != exclude]
+
+    @staticmethod
+    def _conflict_entry(begin: float, end: float, task_id: str, zones: frozenset) -> dict:
+        return {
+            'id': task_id,
+            'scheduled_time': datetime.fromtimestamp(begin).isoformat(),
+            'end_time': datetime.fromtimestamp(end).isoformat(),
+            'zones': sorted(zones)
+        }
+
+    # --- ZONES ---
+    def _zones_of(self, task: Task) -> frozenset:
+        """Zones a task targets. No zones, or "All Zones", means every zone."""
+        return self._zones_in(task.zones)
+
+    def _zones_in(self, partition: frozenset) -> frozenset:
+        """The zones of a partition key (EVERY_ZONE: every current channel)."""
+        return partition or frozenset(self.channels)
+
+    def _holds(self, zone: str, min_priority: int) -> bool:
+        task = self.channels.get(zone)
+        return task is not None and task.priority >= min_priority
+
+    def _holders(self, zones) -> List[Task]:
+        """Distinct tasks currently playing in any of `zones`."""
+        holders = {}
+        for zone in zones:
+            task = self.channels.get(zone)
+            if task is not None:
+                holders[task.id] = task
+        return list(holders.values())
+
+    def _active_tasks(self) -> List[Task]:
+        """Distinct playing tasks, highest priority first."""
+        return sorted(self._holders(self.channels), key=lambda t: t.priority, reverse=True)
+
+    def _zones_idle(self, zones) -> bool:
+        return all(self.channels.get(zone) is None for zone in zones)
+
+    def _release(self, task: Task):
+        """Frees every channel held by `task`. Caller holds _lock."""
+        for zone, holder in self.channels.items():
+            if holder is task:
+                self.channels[zone] = None
+
+    # --- QUEUE PARTITIONS ---
+    def _partition(self, key: frozenset) -> ScheduleQueue:
+        queue = self.queues.get(key)
+        if queue is None:
+            queue = self.queues[key] = ScheduleQueue()
+            # A new partition created during an interruption is paused too
+            if any(self._holds(z, Priority.REALTIME) for z in self._zones_in(key)):
+                self._paused[key] = self._clock()
+        return queue
+
+    def _enqueue(self, task: Task, front: bool = False):
+        # An edit may move a schedule to another partition (zones changed)
+        self._dequeue(task.id)
+        self._queue_version += 1
+        duration = math.ceil(estimate_duration(task.data)) # Before the payload is dropped
+        self._prerender_speech(task)
+        self._compact(task)
+        queue = self._partition(task.zones)
+        if front:
+            queue.push_front(task, duration)
+        else:
+            queue.push(task, duration)
+
+    def _compact(self, task: Task):
+        """Drops the payload of a schedule that is not about to start."""
+        if task.data is not None and task.scheduled_ts > self._clock().timestamp() + PAYLOAD_LOOKAHEAD:
+            task.data = None
+
+    @staticmethod
+    def _prerender_speech(task: Task):
+        """Starts synthesizing a text announcement ahead of playback (non-blocking)."""
+        data = task.data
+        if data and data.get('type', 'text') == 'text':
+            speech.prerender(data.get('message') or data.get('content'))
+
+    def _find(self, task_id: str) -> Optional[Task]:
+        for queue in self.queues.values():
+            task = queue.get(task_id)
+            if task is not None:
+                return task
+        return None
+
+    def _dequeue(self, task_id: str) -> Optional[Task]:
+        for queue in self.queues.values():
+            task = queue.remove(task_id)
+            if task:
+                self._queue_version += 1
+                return task
+        return None
+
+    def _queued(self, task_id: str) -> bool:
+        return any(task_id in queue for queue in self.queues.values())
+
+    def _queue_size(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
 
     # --- INTERNAL LOGIC ---
     def _add_to_queue(self, task: Task):
-        self.queue.append(task)
-        # Sort by scheduled_time
-        self.queue.sort(key=lambda x: x.scheduled_time)
+        self._enqueue(task)
+        self._publish_queue_change('queued', task.id, task.scheduled_time)
+        self._wake_scheduler()
 
-    def _preempt_current_task(self, new_priority):
-        if not self.current_task:
-            return
+    def _publish_queue_change(self, action: str, task_id: str, scheduled_time: datetime = None):
+        broadcaster.publish('queue', {
+            'action': action,
+            'id': task_id,
+            'scheduled_time': scheduled_time.isoformat() if scheduled_time else None,
+            'size': self._queue_size()
+        })
+        self._prefetch_pending.set()
+
+    def _wake_scheduler(self):
+        """Re-evaluates the scheduler's sleep deadline. Caller holds _lock."""
+        self._wakeup.notify()
 
-        print(f"[Controller] Preempting: {self.current_task.type}")
+    def _preempt_task(self, task: Task):
+        print(f"[Controller] Preempting: {task.type}")
+        self._release(task)
 
         # Specific Logic per Type
-        if self.current_task.type == TaskType.SCHEDULE:
-            # Soft Stop: Re-queue at HEAD
-            print(f"  -> Re-queueing Schedule {self.current_task.id}")
-            self.current_task.status = State.INTERRUPTED
-            # Push to front of queue
-            self.queue.insert(0, self.current_task) 
+        if task.type == TaskType.SCHEDULE:
+            # Soft Stop: Re-queue at HEAD (of its zone partition)
+            print(f"  -> Re-queueing Schedule {task.id}")
+            task.status = State.INTERRUPTED
+            self._enqueue(task, front=True)
+            self._publish_queue_change('requeued', task.id, task.scheduled_time)
         
-        elif self.current_task.type == TaskType.VOICE or self.current_task.type == TaskType.TEXT:
+        elif task.type == TaskType.VOICE or task.type == TaskType.TEXT:
             # Hard Stop: Kill completely
-            print(f"  -> Killing Realtime {self.current_task.id}")
-            self.current_task.status = State.COMPLETED
-        
-        self.current_task = None
+            print(f"  -> Killing Realtime {task.id}")
+            task.status = State.COMPLETED
 
     def _start_task(self, task: Task):
-        self.current_task = task
-        self.current_task.status = State.PLAYING
+        if task.type == TaskType.TEXT:
+            self._prerender_speech(task) # Players request it right after this state change
+        zones = self._zones_of(task)
+        for zone in zones:
+            self.channels[zone] = task
+        task.status = State.PLAYING
         
-        # Start Time Shift Tracking if High Priority
+        # Start Time Shift Tracking if High Priority (partitions touching these zones)
         if task.priority >= Priority.REALTIME:
-            if self.pause_start_time is None:
-                self.pause_start_time = datetime.now()
-                print(f"[Controller] Time Shift Started at {self.pause_start_time}")
+            now = self._clock()
+            for partition in self.queues:
+                if self._zones_in(partition) & zones and partition not in self._paused:
+                    self._paused[partition] = now
+                    print(f"[Controller] Time Shift Started at {now} ({', '.join(sorted(self._zones_in(partition)))})")
 
-        if task.priority == Priority.EMERGENCY:
-            self.emergency_mode = True
-        
-        mode = 'BROADCAST'
-        if task.type == TaskType.EMERGENCY: mode = 'EMERGENCY'
-        elif task.type == TaskType.SCHEDULE: mode = 'SCHEDULE'
-        elif task.type == TaskType.BACKGROUND: mode = 'BACKGROUND'
+        print(f"[Controller] Starting: {task.type} (Mode: {self._mode_of(task)}, Zones: {', '.join(sorted(zones))})")
+        self._publish_state()
 
-        print(f"[Controller] Starting: {task.type} (Mode: {mode})")
-        self._update_firestore_state(task, task.priority, mode)
+    @staticmethod
+    def _mode_of(task: Optional[Task]) -> str:
+        if task is None: return 'IDLE'
+        if task.type == TaskType.EMERGENCY: return 'EMERGENCY'
+        if task.type == TaskType.SCHEDULE: return 'SCHEDULE'
+        if task.type == TaskType.BACKGROUND: return 'BACKGROUND'
+        return 'BROADCAST'
 
     def _apply_queue_shift(self):
-        """Shifts all queued items by the duration of the High Priority Interruption"""
-        if self.pause_start_time:
-            now = datetime.now()
-            duration = now - self.pause_start_time
-            print(f"[Controller] Applying Time Shift: +{duration}")
-            
-            batch = db.batch()
-            updated_count = 0
+        """
+        Shifts queued items by the duration of the High Priority Interruption,
+        for every partition none of whose zones is still interrupted.
+        O(1) per partition: its global offset moves; Firestore catches up in
+        the background via _shift_writer_loop.
+        """
+        now = self._clock()
+        for partition, since in list(self._paused.items()):
+            zones = self._zones_in(partition)
+            if any(self._holds(z, Priority.REALTIME) for z in zones):
+                continue
+            duration = now - since
+            print(f"[Controller] Applying Time Shift: +{duration} ({', '.join(sorted(zones))})")
+            self.queues[partition].shift(duration)
+            self._queue_version += 1
+            del self._paused[partition]
+            self._shift_pending.set()
+            self._prefetch_pending.set()
+            self._wake_scheduler()
 
-            for task in self.queue:
-                task.scheduled_time += duration
-                
-                # Update Firestore so UI reflects new time
-                try:
-                     ref = db.collection('schedules').document(task.id)
-                     new_date = task.scheduled_time.strftime("%Y-%m-%d")
-                     new_time = task.scheduled_time.strftime("%H:%M")
-                     batch.update(ref, {'date': new_date, 'time': new_time})
-                     updated_count += 1
-                except ValueError:
-                    pass # Skip if invalid ID/Doc
-
-            # Sort again just in case (though relative order shouldn't change)
-            self.queue.sort(key=lambda x: x.scheduled_time)
-            
-            if updated_count > 0:
-                try:
-                    batch.commit()
-                    print(f"[Controller] Persisted shift for {updated_count} schedules")
-                except Exception as e:
-                    print(f"[Controller] Batch update failed: {e}")
+    def _persist_shifted_schedules(self):
+        """Writes shifted date/time for schedules due within the horizon."""
+        with self._lock:
+            horizon = self._clock() + SHIFT_PERSIST_HORIZON
+            partitions = [(queue, queue.offset, queue.stale_within(horizon)) for queue in self.queues.values()]
 
-            self.pause_start_time = None
+        total = 0
+        for queue, offset, stale in partitions:
+            if not stale:
+                continue
+            try:
+                self._write_shifts(stale)
+            except Exception as e:
+                print(f"[Controller] Batch update failed: {e}")
+                continue
+            with self._lock:
+                queue.mark_synced([task_id for task_id, _ in stale], offset)
+            total += len(stale)
+
+        if total:
+            print(f"[Controller] Persisted shift for {total} schedules")
 
-    def _update_firestore_state(self, task, priority, mode):
+    @staticmethod
+    def _write_shifts(shifts: List[Tuple[str, datetime]]):
+        updates = [(task_id, {
+            'date': scheduled_time.strftime("%Y-%m-%d"),
+            'time': scheduled_time.strftime("%H:%M")
+        }) for task_id, scheduled_time in shifts]
         try:
-            data = {
-                'active_task': task.to_dict() if task else None,
-                'priority': int(priority),
-                'mode': mode,
-                'timestamp': firestore.SERVER_TIMESTAMP
-            }
-            db.collection('system').document('state').set(data)
-        except Exception as e:
-            print(f"[Controller] DB Error: {e}")
+            store.update_schedules(updates)
+        except NotFoundError:
+            # A schedule was deleted meanwhile: write the others one by one
+            for task_id, fields in updates:
+                try:
+                    store.update_schedule(task_id, fields)
+                except NotFoundError:
+                    print(f"[Controller] Schedule {task_id} no longer exists, shift skipped")
+
+    def _publish_state(self):
+        """
+        Publishes a state snapshot: swapped in for lock-free readers, pushed to
+        /events subscribers right away, and queued for the publisher thread to
+        write to system/state. Caller holds _lock.
+        active_task/priority/mode describe the highest-priority playing task;
+        zones maps each zone to the id of the task playing there.
+        """
+        active = self._active_tasks()
+        primary = active[0] if active else None
+        emergency = next((task for task in active if task.priority == Priority.EMERGENCY), None)
+        state = {
+            'active_task': primary.to_dict() if primary else None,
+            'priority': int(primary.priority if primary else Priority.IDLE),
+            'mode': self._mode_of(primary),
+            'zones': {zone: (task.id if task else None) for zone, task in self.channels.items()},
+            'active_tasks': [task.to_dict() for task in active]
+        }
+        # Single reference swap: readers see the old or the new snapshot, never a mix
+        self._snapshot = ControllerSnapshot(self._snapshot.version + 1, state,
+                                            emergency.data.get('user') if emergency else None)
+        broadcaster.publish('state', dict(state, timestamp=self._clock().isoformat()))
+        publisher.publish_state(dict(state, timestamp=store.server_timestamp()))
 
     # --- SCHEDULER LOOP ---
     def _scheduler_loop(self):
+        """
+        Event-driven: sleeps until the earliest scheduled_time, or until woken
+        by a queue change / task stop. An idle system never wakes up.
+        """
+        with self._wakeup:
+            while self._running:
+                promoted, timeout, missing = self._tick()
+                if missing:
+                    self._hydrate(missing)
+                elif not promoted:
+                    self._wakeup.wait(timeout)
+
+    def _tick(self) -> Tuple[bool, Optional[float], List[Task]]:
+        """
+        One scheduler pass: starts due schedules on idle zones, earliest due
+        first (then highest priority), so partitions sharing a zone start in
+        time order. Returns (promoted anything, seconds until the next head
+        needs attention or None, heads within PAYLOAD_LOOKAHEAD still
+        lacking their payload). Caller holds _lock.
+        """
+        timeout = None # Busy or empty queues: wait for a notify
+        missing = []
+        due = []
+        now = self._clock()
+        now_ts = now.timestamp()
+
+        for partition, queue in self.queues.items():
+            # Busy partition: a stop in its zones wakes us
+            if not self._zones_idle(self._zones_in(partition)):
+                continue
+
+            head = queue.peek()
+            if head is None:
+                continue
+            if head.data is None:
+                if head.scheduled_ts <= now_ts + PAYLOAD_LOOKAHEAD or head.status == State.INTERRUPTED:
+                    missing.append(head)
+                    continue
+                # Wake when it enters the look-ahead window
+                wait = head.scheduled_ts - now_ts - PAYLOAD_LOOKAHEAD
+            elif head.status == State.INTERRUPTED or head.scheduled_ts <= now_ts:
+                due.append((head.scheduled_ts, -head.priority, len(due), partition, queue))
+                continue
+            else:
+                wait = head.scheduled_ts - now_ts
+            wait = max(0.0, wait)
+            timeout = wait if timeout is None else min(timeout, wait)
+
+        # A due head still loading its payload goes first: load, then re-tick
+        if any(head.status == State.INTERRUPTED or head.scheduled_ts <= now_ts for head in missing):
+            return False, timeout, missing
+
+        promoted = False
+        for _, _, _, partition, queue in sorted(due):
+            # An earlier head may just have taken a shared zone (its stop wakes us)
+            if not self._zones_idle(self._zones_in(partition)):
+                continue
+            # Pop the head (O(log n))
+            head = queue.pop_due(now)
+            if head is not None:
+                self._queue_version += 1
+                self._promote(head)
+                promoted = True
+        return promoted, timeout, missing
+
+    def _hydrate(self, tasks: List[Task]):
+        """
+        Reloads the payloads of queued schedules from the store. Caller holds
+        _lock; it is released for the reads, so arbitration never waits on I/O.
+        """
+        self._lock.release()
+        try:
+            payloads = {task.id: store.get_schedule(task.id) for task in tasks}
+        except Exception as e:
+            payloads = None
+            print(f"[Scheduler] Loading schedule payloads failed, retrying: {e}")
+        finally:
+            self._lock.acquire()
+
+        if payloads is None:
+            self._wakeup.wait(PAYLOAD_RETRY)
+            return
+        for task in tasks:
+            # Edited (re-queued as a new Task) or removed while we were reading
+            if self._find(task.id) is not task:
+                continue
+            payload = payloads.get(task.id)
+            if payload is None:
+                print(f"[Scheduler] Schedule {task.id} no longer exists, dropped")
+                self._dequeue(task.id)
+                self._publish_queue_change('removed', task.id)
+                continue
+            payload.pop('id', None)
+            task.data = payload
+
+    def _promote(self, next_task: Task):
+        """Starts a due schedule. Caller holds _lock."""
+        next_task.priority = Priority.SCHEDULE
+        print(f"[Scheduler] Promoting Schedule {next_task.id}")
+        
+        # Persist outcome in DB (async, outside the critical section):
+        # a recurring rule moves on to its next occurrence, a one-off completes
+        following = self._next_occurrence(next_task)
+        if following:
+            publisher.update_schedule(next_task.id, {field: following.data[field] for field in RULE_FIELDS})
+        else:
+            publisher.update_schedule(next_task.id, {'status': 'Completed'})
+
+        self._start_task(next_task)
+
+    # --- RECURRENCE ---
+    def _next_occurrence(self, task: Task) -> Optional[Task]:
+        """
+        The Task for the next firing of a recurring schedule, or None for
+        one-off schedules and rules past their optional 'until' date.
+        Occurrences already in the past are skipped, not replayed.
+
+        date/time hold the occurrence as it fires, delays included (the
+        shift writer rewrites them); the rule itself runs from its
+        anchor_date/anchor_time, so a delay never moves later occurrences.
+        Rules saved without an anchor are anchored at this firing.
+        """
+        data = task.data
+        try:
+            fired = datetime.strptime(f"{data['date']} {data['time']}", "%Y-%m-%d %H:%M")
+            anchor = datetime.strptime(f"{data.get('anchor_date') or data['date']} "
+                                       f"{data.get('anchor_time') or data['time']}", "%Y-%m-%d %H:%M")
+            nxt = next_occurrence(data.get('repeat'), max(fired, self._clock()), anchor)
+        except (KeyError, TypeError, ValueError):
+            return None
+        if nxt is None or (data.get('until') and nxt.strftime("%Y-%m-%d") > data['until']):
+            return None
+        return Task(
+            id=task.id, # One rule document, one queued occurrence
+            type=TaskType.SCHEDULE,
+            priority=Priority.SCHEDULE,
+            data=dict(data, date=nxt.strftime("%Y-%m-%d"), time=nxt.strftime("%H:%M"),
+                      anchor_date=anchor.strftime("%Y-%m-%d"), anchor_time=anchor.strftime("%H:%M")),
+            scheduled_time=nxt
+        )
+
+    def _queue_next_occurrence(self, task: Task):
+        """Queues the next firing once an occurrence finishes. Caller holds _lock."""
+        following = self._next_occurrence(task)
+        # An edit while the occurrence played has already queued the new rule
+        if following and not self._queued(following.id):
+            self._enqueue(following)
+            self._publish_queue_change('queued', following.id, following.scheduled_time)
+
+    # --- PREFETCH ---
+    def _prefetch_loop(self):
+        """
+        Announces the schedules starting within PREFETCH_WINDOW as a
+        'prefetch' event, whenever that list changes. Players preload the
+        audio, the audio route warms it in memory, and text is pre-rendered,
+        so a promoted schedule starts without a download.
+        """
+        announced = None
+        while self._running:
+            try:
+                upcoming = self._upcoming()
+                if upcoming != announced:
+                    broadcaster.publish('prefetch', {'window': PREFETCH_WINDOW, 'tasks': upcoming})
+                    announced = upcoming
+            except Exception as e:
+                print(f"[Prefetch] Announcing upcoming schedules failed: {e}")
+            self._prefetch_pending.wait(PREFETCH_INTERVAL)
+            self._prefetch_pending.clear()
+
+    def _upcoming(self) -> List[dict]:
+        """Prefetch hints for the schedules due within PREFETCH_WINDOW, soonest first."""
+        with self._lock:
+            now = self._clock().timestamp()
+            upcoming = sorted(((begin, task) for queue in self.queues.values()
+                               for task, begin, _ in queue.overlapping(now, now + PREFETCH_WINDOW)),
+                              key=lambda entry: entry[0])[:PREFETCH_MAX]
+            missing = [task.id for _, task in upcoming if task.data is None]
+
+        # Their payloads are needed soon anyway: load them now, off the lock
+        payloads = {task_id: store.get_schedule(task_id) for task_id in missing}
+
+        hints = []
+        with self._lock:
+            for begin, task in upcoming:
+                if self._find(task.id) is not task:
+                    continue # Edited or removed meanwhile
+                if task.data is None:
+                    payload = payloads.get(task.id)
+                    if payload is None:
+                        continue # Deleted: the scheduler drops it
+                    payload.pop('id', None)
+                    task.data = payload
+                hints.append(self._prefetch_hint(task, begin))
+        return hints
+
+    @classmethod
+    def _prefetch_hint(cls, task: Task, begin: float) -> dict:
+        data = task.data
+        hint = {
+            'id': task.id,
+            'scheduled_time': datetime.fromtimestamp(begin).isoformat(),
+            'zones': sorted(task.zones)
+        }
+        if data.get('audioHash'):
+            hint['audioHash'] = data['audioHash']
+        elif data.get('type', 'text') == 'text' and data.get('message'):
+            hint['text'] = data['message']
+            cls._prerender_speech(task)
+        return hint
+
+    def _shift_writer_loop(self):
+        """
+        Background writer for time shifts. Consecutive shifts coalesce into a
+        single pass; once any shift happened it also re-checks periodically so
+        schedules entering the horizon get their new time persisted.
+        """
         while self._running:
-            time.sleep(1) # Tiick every 1s
-            
             with self._lock:
-                if self.current_task:
-                    continue # Busy
-                
-                # System is IDLE. Check Queue.
-                now = datetime.now()
-                
-                # Filter for due items
-                # Note: We take the first one that is due
-                candidates = [t for t in self.queue if t.scheduled_time <= now]
-                
-                if candidates:
-                    next_task = candidates[0]
-                    self.queue.remove(next_task)
-                    
-                    next_task.priority = Priority.SCHEDULE
-                    print(f"[Scheduler] Promoting Schedule {next_task.id}")
-                    
-                    # Mark as Completed in DB
-                    try:
-                        db.collection('schedules').document(next_task.id).update({'status': 'Completed'})
-                    except Exception as e:
-                        print(f"[Scheduler] Failed to mark completed: {e}")
-
-                    self._start_task(next_task)
+                shifted = any(queue.offset for queue in self.queues.values())
+            timeout = SHIFT_SYNC_INTERVAL if shifted else None
+            self._shift_pending.wait(timeout)
+            self._shift_pending.clear()
+            try:
+                self._persist_shifted_schedules()
+            except Exception as e:
+                print(f"[Controller] Shift writer error: {e}")
 
-# Global Instance
-controller = PAController()
+    # --- STATE RECOVERY ---
+    def _bootstrap_loop(self):
+        """
+        Restores Pending schedules from the store after a restart, then pages
+        in the next look-ahead window shortly before the current one runs out.
+        """
+        start = self._clock().date()
+        while self._running:
+            end = max(start, self._clock().date()) + BOOTSTRAP_WINDOW
+            try:
+                # The first load also resumes rules left behind by downtime
+                self._load_window(start, end, stale_rules=not self.bootstrapped.is_set())
+            except Exception as e:
+                print(f"[Controller] Bootstrap load failed, retrying: {e}")
+                self._stopping.wait(BOOTSTRAP_RETRY)
+                continue
+            self.bootstrapped.set()
+            start = end
+
+            # Wake up one day before the loaded window ends
+            next_load = datetime.combine(end - timedelta(days=1), datetime.min.time())
+            self._stopping.wait(max(0.0, (next_load - self._clock()).total_seconds()))
+
+    def _load_window(self, start, end, stale_rules: bool = False):
+        """
+        Streams Pending schedules dated [start, end) and merges them under one
+        lock. With `stale_rules`, recurring rules dated before the window
+        (missed while no controller ran) are loaded too. A recurring rule
+        missed by more than BOOTSTRAP_GRACE resumes at its next occurrence.
+        """
+        began = time.perf_counter()
+        cutoff = self._clock() - BOOTSTRAP_GRACE
+        docs = store.iter_pending_schedules(start.isoformat(), end.isoformat())
+        if stale_rules:
+            stale = (data for data in store.iter_pending_rules() if str(data.get('date')) < start.isoformat())
+            docs = itertools.chain(docs, stale)
+        tasks = []
+        for data in docs:
+            try:
+                scheduled_time = datetime.fromisoformat(f"{data['date']}T{data['time']}")
+            except (KeyError, TypeError, ValueError):
+                continue # Malformed schedule; left untouched in the store
+            task = Task(
+                id=data.pop('id'),
+                type=TaskType.SCHEDULE,
+                priority=Priority.SCHEDULE,
+                data=data,
+                scheduled_time=scheduled_time
+            )
+            if scheduled_time < cutoff:
+                task = self._next_occurrence(task)
+                if task is None:
+                    continue # One-off (or finished rule) missed: not replayed
+                publisher.update_schedule(task.id, {field: task.data[field] for field in RULE_FIELDS})
+            self._compact(task) # Before the next document: a window can be large
+            tasks.append(task)
+
+        with self._lock:
+            playing = {task.id for task in self._active_tasks()}
+            loaded = 0
+            for task in tasks:
+                # In-memory entries win: they may carry time shifts not yet persisted
+                if not self._queued(task.id) and task.id not in playing:
+                    self._enqueue(task)
+                    loaded += 1
+            if loaded:
+                self._publish_queue_change('loaded', None)
+                self._wake_scheduler()
+
+        elapsed = (time.perf_counter() - began) * 1000
+        print(f"[Controller] Loaded {loaded} pending schedules for {start} - {end} ({elapsed:.0f} ms)")
+
+class ControllerNode:
+    """
+    The controller as seen by this worker (what routes call).
+
+    Workers elect one leader through a lease in the store. The leader runs
+    the PAController engine and serves it to the others over its control
+    server; followers forward every call there and relay the leader's
+    events to their own SSE clients. So `uvicorn --workers N` (or several
+    hosts sharing a store) arbitrates and fires each schedule exactly once.
+    """
+
+    def __init__(self):
+        self.engine: Optional[PAController] = None
+        self.election: Optional[LeaderElection] = None
+        if not LEADER_ELECTION:
+            self._on_elected()
+            return
+        self.client = ControlClient(self._leader_address)
+        self.relay = EventRelay(self._leader_address, self.client)
+
+    def start(self):
+        """
+        Joins the election and opens the control server. Called from the app
+        lifespan, so importing the controller (scripts, benches) opens no
+        port. No-op without leader election or once started.
+        """
+        if not LEADER_ELECTION or self.election is not None:
+            return
+        holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.server = ControlServer({
+            'request_playback': lambda task: self.engine.request_playback(Task.from_dict(task)),
+            'stop_task': lambda task_id, task_type: self.engine.stop_task(task_id, task_type),
+            'remove_from_queue': lambda schedule_id: self.engine.remove_from_queue(schedule_id),
+            'queue_schedules': lambda tasks: self.engine.queue_schedules([Task.from_dict(t) for t in tasks]),
+            'find_conflicts': lambda task: self.engine.find_conflicts(Task.from_dict(task)),
+            'scan_conflicts': lambda start, end, limit: self.engine.scan_conflicts(
+                datetime.fromisoformat(start), datetime.fromisoformat(end), limit),
+            'get_state': lambda: self.engine.get_state(),
+            'get_queue': lambda: [task.to_dict() for task in self.engine.get_queue()],
+            'get_active_emergency_user': lambda: self.engine.get_active_emergency_user(),
+            'publish': lambda event, data: broadcaster.publish(event, data),
+        }, lambda: self.engine is not None)
+        self.election = LeaderElection(LEADER_LEASE, holder, {'address': self.server.address},
+                                       self._on_elected, self._on_deposed)
+        self.relay.start() # Until elected, events go through the leader
+        self.election.start()
+
+    @property
+    def is_leader(self) -> bool:
+        return self.engine is not None
+
+    @property
+    def bootstrapped(self) -> threading.Event:
+        if self.engine is None:
+            raise ControllerUnavailable("Schedules are loaded by the controller leader")
+        return self.engine.bootstrapped
 
+    def _leader_address(self) -> Optional[str]:
+        """The live leader's control address; None if unknown, lapsed or ourselves."""
+        if self.election is None:
+            return None # Not started
+        lease = self.election.leader
+        if not lease or lease.get('holder') == self.election.holder or lease.get('expires_at', 0) <= time.time():
+            return None
+        return lease.get('address')
+
+    def _on_elected(self):
+        engine = PAController()
+        engine.start()
+        self.engine = engine
+        if LEADER_ELECTION:
+            self.relay.stop()
+
+    def _on_deposed(self):
+        engine, self.engine = self.engine, None
+        self.relay.start()
+        if engine:
+            engine.shutdown()
+
+    # --- SAME API AS PAController ---
+    def request_playback(self, new_task: Task) -> bool:
+        engine = self.engine
+        if engine:
+            return engine.request_playback(new_task)
+        return self.client.call('request_playback', task=new_task.to_dict())
+
+    def stop_task(self, task_id: str, task_type: str = None):
+        engine = self.engine
+        if engine:
+            return engine.stop_task(task_id, task_type)
+        self.client.call('stop_task', task_id=task_id, task_type=task_type)
+
+    def remove_from_queue(self, schedule_id: str):
+        engine = self.engine
+        if engine:
+            return engine.remove_from_queue(schedule_id)
+        self.client.call('remove_from_queue', schedule_id=schedule_id)
+
+    def queue_schedules(self, tasks: List[Task]) -> int:
+        engine = self.engine
+        if engine:
+            return engine.queue_schedules(tasks)
+        return self.client.call('queue_schedules', tasks=[task.to_dict() for task in tasks])
+
+    def find_conflicts(self, task: Task) -> dict:
+        engine = self.engine
+        if engine:
+            return engine.find_conflicts(task)
+        return self.client.call('find_conflicts', task=task.to_dict())
+
+    def scan_conflicts(self, start: datetime, end: datetime, limit: int = 500) -> List[dict]:
+        engine = self.engine
+        if engine:
+            return engine.scan_conflicts(start, end, limit)
+        return self.client.call('scan_conflicts', start=start.isoformat(), end=end.isoformat(), limit=limit)
+
+    def get_state(self) -> dict:
+        engine = self.engine
+        if engine:
+            return engine.get_state()
+        # Followers answer from the relayed stream when they can (no round trip)
+        state = self.relay.state
+        return dict(state) if state is not None else self.client.call('get_state')
+
+    def get_queue(self) -> List[Task]:
+        engine = self.engine
+        if engine:
+            return engine.get_queue()
+        return [Task.from_dict(task) for task in self.client.call('get_queue')]
+
+    def get_active_emergency_user(self) -> Optional[str]:
+        engine = self.engine
+        if engine:
+            return engine.get_active_emergency_user()
+        return self.client.call('get_active_emergency_user')
+
+
+# Global Instance
+controller = ControllerNode()
@@ -0,0 +1,135 @@
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Set
+from api.metrics import metrics
+
+BUFFER_SIZE = 64         # Per-client events held before the oldest is dropped
+HEARTBEAT_INTERVAL = 15  # Seconds between SSE keep-alive comments
+
+
+class Subscriber:
+    """One connected client: a bounded buffer drained by its SSE response."""
+
+    def __init__(self, buffer_size: int = BUFFER_SIZE):
+        self.buffer = deque(maxlen=buffer_size)
+        self.ready = asyncio.Event()
+        self.dropped = 0
+
+    def push(self, payload: str):
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1 # deque(maxlen) drops the oldest (backpressure)
+            metrics.inc("events.dropped")
+        self.buffer.append(payload)
+        self.ready.set()
+
+
+class Broadcaster:
+    """
+    In-process fan-out of controller events to SSE clients.
+
+    publish() may be called from any thread (e.g. under the controller lock):
+    it serializes the event once and schedules one fan-out callback per event
+    loop, so its cost does not grow with the number of subscribers.
+
+    With several workers, only the controller leader fans out: followers
+    install a forwarder (publish goes to the leader) and feed the leader's
+    relayed events back in through deliver().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loops: Dict[asyncio.AbstractEventLoop, Set[Subscriber]] = {}
+        self._listeners: List[Callable[[str, dict], None]] = []
+        self._forward: Optional[Callable[[str, dict], None]] = None
+        self._seq = itertools.count(1)
+        metrics.gauge("events.subscribers", lambda: sum(len(s) for s in self._loops.values()))
+
+    def subscribe(self) -> Subscriber:
+        """Registers a subscriber on the running event loop."""
+        sub = Subscriber()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._loops.setdefault(loop, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        with self._lock:
+            for loop, subs in list(self._loops.items()):
+                subs.discard(sub)
+                if not subs:
+                    del self._loops[loop]
+
+    def set_forwarder(self, forward: Optional[Callable[[str, dict], None]]):
+        """Routes publish() to `forward` instead of local delivery (None restores it)."""
+        self._forward = forward
+
+    def add_listener(self, listener: Callable[[str, dict], None]):
+        """Calls listener(event, data) for every delivered event (must not block)."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, dict], None]):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def publish(self, event: str, data: dict):
+        forward = self._forward
+        if forward is not None:
+            forward(event, data)
+            return
+        self.deliver(event, data)
+
+    def deliver(self, event: str, data: dict):
+        """Fans an event out to this process's subscribers and listeners."""
+        payload = self.format(event, data, next(self._seq))
+        with self._lock:
+            loops = list(self._loops.items())
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(event, data)
+        for loop, subs in loops:
+            try:
+                loop.call_soon_threadsafe(self._fanout, subs, payload)
+            except RuntimeError:
+                pass # Loop closed; its subscribers are gone
+        metrics.inc("events.published")
+
+    @staticmethod
+    def format(event: str, data: dict, event_id=None) -> str:
+        lines = f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        return f"id: {event_id}\n{lines}" if event_id is not None else lines
+
+    @staticmethod
+    def _fanout(subs: Set[Subscriber], payload: str):
+        # Runs on the subscribers' event loop thread
+        for sub in list(subs):
+            sub.push(payload)
+
+    async def stream(self, initial: Optional[str] = None):
+        """
+        Subscribes and yields SSE frames until the client disconnects.
+        `initial` (an already formatted frame) is sent first.
+        """
+        sub = self.subscribe()
+        if initial:
+            sub.push(initial)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(sub.ready.wait(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                sub.ready.clear()
+                while sub.buffer:
+                    yield sub.buffer.popleft()
+        finally:
+            self.unsubscribe(sub)
+
+
+# Global Instance
+broadcaster = Broadcaster()
@@ -0,0 +1,69 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from api.metrics import metrics
+
+# Sized for I/O-bound SDK calls (Firestore / Firebase Auth release the GIL)
+IO_WORKERS = int(os.getenv("PA_IO_WORKERS", "64"))
+
+
+class BlockingExecutor:
+    """
+    Dedicated thread pool for blocking SDK calls made from async routes.
+
+    Keeps slow storage/Auth round trips off the event loop and out of
+    FastAPI's shared 40-thread pool, and records queue wait, run time and
+    in-flight/queued counts in api.metrics.
+    """
+
+    def __init__(self, max_workers: int = IO_WORKERS):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pa-io")
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queued = 0
+        metrics.gauge("executor.active", lambda: self._active)
+        metrics.gauge("executor.queued", lambda: self._queued)
+        metrics.gauge("executor.max_workers", lambda: self.max_workers)
+
+    def _track(self, fn, submitted_at):
+        started_at = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        metrics.observe("executor.wait_seconds", started_at - submitted_at)
+        try:
+            return fn()
+        except Exception:
+            metrics.inc("executor.errors")
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+            metrics.observe("executor.run_seconds", time.perf_counter() - started_at)
+
+    async def run(self, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) in the pool and awaits the result."""
+        with self._lock:
+            self._queued += 1
+        call = functools.partial(fn, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._track, call, time.perf_counter())
+
+    def submit(self, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) in the pool from a plain thread (fire and forget)."""
+        with self._lock:
+            self._queued += 1
+        return self._pool.submit(self._track, functools.partial(fn, *args, **kwargs), time.perf_counter())
+
+
+# Global Instance
+executor = BlockingExecutor()
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Shorthand for executor.run (used by every async route)."""
+    return await executor.run(fn, *args, **kwargs)
@@ -0,0 +1,100 @@
+import threading
+import time
+from typing import Callable, Dict
+
+
+class Metrics:
+    """
+    Minimal in-process metrics registry (counters, gauges, summaries).
+    Exposed as JSON at GET /metrics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._summaries: Dict[str, dict] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def inc(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        """Records one sample (count / sum / max) for a latency-style metric."""
+        with self._lock:
+            s = self._summaries.get(name)
+            if s is None:
+                s = self._summaries[name] = {"count": 0, "sum": 0.0, "max": 0.0}
+            s["count"] += 1
+            s["sum"] += value
+            if value > s["max"]:
+                s["max"] = value
+
+    def gauge(self, name: str, fn: Callable[[], float]):
+        """Registers a gauge evaluated at snapshot time."""
+        with self._lock:
+            self._gauges[name] = fn
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            summaries = {
+                name: dict(s, avg=s["sum"] / s["count"] if s["count"] else 0.0)
+                for name, s in self._summaries.items()
+            }
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        return {
+            "counters": counters,
+            "gauges": {name: fn() for name, fn in gauges.items()},
+            "summaries": summaries,
+        }
+
+
+# Global Instance
+metrics = Metrics()
+
+
+class InstrumentedLock:
+    """
+    threading.Lock that reports to the metrics registry:
+      <name>.acquisitions / <name>.contended   counters
+      <name>.wait_seconds                      time spent blocked (contended only)
+      <name>.hold_seconds                      time held per acquisition
+    Usable anywhere a Lock is, including as the lock of a threading.Condition.
+    """
+
+    def __init__(self, name: str):
+        self._lock = threading.Lock()
+        self._name = name
+        self._acquired_at = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._lock.acquire(False):
+            metrics.inc(f"{self._name}.acquisitions")
+        else:
+            if not blocking:
+                return False
+            started = time.perf_counter()
+            if not self._lock.acquire(True, timeout):
+                return False
+            metrics.inc(f"{self._name}.acquisitions")
+            metrics.inc(f"{self._name}.contended")
+            metrics.observe(f"{self._name}.wait_seconds", time.perf_counter() - started)
+        self._acquired_at = time.perf_counter()
+        return True
+
+    def release(self):
+        held = time.perf_counter() - self._acquired_at
+        self._lock.release()
+        metrics.observe(f"{self._name}.hold_seconds", held)
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
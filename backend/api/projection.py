@@ -0,0 +1,15 @@
+from typing import List, Optional
+
+ALL_FIELDS = "*"
+
+
+def parse_fields(fields: Optional[str], default: List[str]) -> Optional[List[str]]:
+    """
+    Parses a `fields=a,b,c` query parameter into a projection.
+    Missing -> `default` (the list view); "*" -> None (whole documents).
+    """
+    if fields is None:
+        return list(default)
+    if fields.strip() == ALL_FIELDS:
+        return None
+    return [f.strip() for f in fields.split(",") if f.strip()]
@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from api.storage import store, NotFoundError
+
+MAX_PENDING_UPDATES = 1000 # Bounded: oldest pending schedule update is dropped beyond this
+RETRY_MIN = 0.5            # Seconds
+RETRY_MAX = 30.0
+
+
+class StatePublisher:
+    """
+    Writes controller state to the store from a dedicated thread, so the
+    controller never performs network I/O while holding its lock.
+
+    - system/state snapshots coalesce: only the latest one is written.
+    - Schedule field updates coalesce per schedule id (later fields win).
+    - Failed writes are retried with exponential backoff.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._state: Optional[dict] = None
+        self._schedules: "OrderedDict[str, dict]" = OrderedDict()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # --- PRODUCER SIDE (called from the controller, never blocks on I/O) ---
+    def publish_state(self, data: dict):
+        with self._cond:
+            self._state = data
+            self._cond.notify()
+
+    def update_schedule(self, schedule_id: str, fields: dict):
+        with self._cond:
+            pending = self._schedules.pop(schedule_id, {})
+            pending.update(fields)
+            self._schedules[schedule_id] = pending
+            if len(self._schedules) > MAX_PENDING_UPDATES:
+                dropped, _ = self._schedules.popitem(last=False)
+                print(f"[Publisher] Queue full, dropped update for {dropped}")
+            self._cond.notify()
+
+    # --- CONSUMER SIDE ---
+    def _run(self):
+        backoff = RETRY_MIN
+        while True:
+            with self._cond:
+                while self._state is None and not self._schedules:
+                    self._cond.wait()
+                state, self._state = self._state, None
+                updates, self._schedules = self._schedules, OrderedDict()
+
+            try:
+                if state is not None:
+                    self._write_state(state)
+                    state = None
+                if updates:
+                    self._write_schedules(list(updates.items()))
+                    updates = None
+                backoff = RETRY_MIN
+            except Exception as e:
+                print(f"[Publisher] Write failed, retrying in {backoff}s: {e}")
+                self._requeue(state, updates)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, RETRY_MAX)
+
+    def _requeue(self, state, updates):
+        """Puts unwritten work back, letting anything published since win."""
+        with self._cond:
+            if state is not None and self._state is None:
+                self._state = state
+            merged = OrderedDict(updates or ())
+            for schedule_id, fields in self._schedules.items():
+                merged.setdefault(schedule_id, {}).update(fields)
+            self._schedules = merged
+
+    def _write_state(self, data: dict):
+        store.set_system_state(data)
+
+    def _write_schedules(self, updates):
+        try:
+            store.update_schedules(updates)
+        except NotFoundError:
+            # A schedule was deleted meanwhile; retrying would never succeed
+            for schedule_id, fields in updates:
+                try:
+                    store.update_schedule(schedule_id, fields)
+                except NotFoundError:
+                    print(f"[Publisher] Schedule {schedule_id} no longer exists, skipped")
+
+
+# Global Instance
+publisher = StatePublisher()
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import FrozenSet, Optional
+
+# Supported `repeat` values:
+#   "once" (or "none")          - fires a single time (default)
+#   "daily"                     - every day at the schedule's time
+#   "weekdays"                  - Monday to Friday at the schedule's time
+#   "weekly"                    - same weekday and time every week
+#   "<min> <hour> <dom> <mon> <dow>" - cron-like, e.g. "0 8 * * 1-5"
+# Cron fields accept "*", numbers, ranges ("1-5"), lists ("0,30") and steps ("*/15").
+ONCE = "once"
+ONCE_ALIASES = (ONCE, "none")
+SIMPLE_RULES = ("daily", "weekdays", "weekly")
+
+CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+CRON_SEARCH_DAYS = 366 * 5 # Covers leap-day rules such as "0 9 29 2 *"
+
+
+class RecurrenceError(ValueError):
+    """Raised for a `repeat` value that is not a supported rule."""
+
+
+def _parse_field(spec: str, lo: int, hi: int) -> FrozenSet[int]:
+    values = set()
+    for part in spec.split(","):
+        body, _, step = part.partition("/")
+        if body == "*":
+            start, end = lo, hi
+        elif "-" in body:
+            start, end = (int(v) for v in body.split("-", 1))
+        else:
+            start = end = int(body)
+        stride = int(step) if step else 1
+        if start < lo or end > hi or start > end or stride < 1:
+            raise RecurrenceError(f"Cron field '{spec}' out of range {lo}-{hi}")
+        values.update(range(start, end + 1, stride))
+    return frozenset(values)
+
+
+@lru_cache(maxsize=256)
+def _parse_cron(rule: str) -> tuple:
+    fields = rule.split()
+    if len(fields) != 5:
+        raise RecurrenceError(f"Unsupported repeat rule: '{rule}'")
+    try:
+        minutes, hours, days, months, weekdays = (
+            _parse_field(spec, lo, hi) for spec, (lo, hi) in zip(fields, CRON_FIELDS)
+        )
+    except ValueError as e:
+        raise RecurrenceError(f"Invalid cron rule '{rule}': {e}") from e
+    # Cron weekdays count from Sunday (0 or 7); Python's from Monday (0)
+    weekdays = frozenset((d - 1) % 7 for d in weekdays)
+    # Cron semantics: if both day fields are restricted, either may match
+    day_any = fields[2] == "*" or fields[4] == "*"
+    return minutes, hours, days, months, weekdays, day_any
+
+
+def validate(repeat: Optional[str]):
+    """Raises RecurrenceError if `repeat` is not a supported rule."""
+    rule = (repeat or ONCE).strip().lower()
+    if rule not in ONCE_ALIASES and rule not in SIMPLE_RULES:
+        _parse_cron(rule)
+
+
+def is_recurring(repeat: Optional[str]) -> bool:
+    return (repeat or ONCE).strip().lower() not in ONCE_ALIASES
+
+
+def _next_cron(rule: str, after: datetime) -> Optional[datetime]:
+    minutes, hours, days, months, weekdays, day_any = _parse_cron(rule)
+    start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    for offset in range(CRON_SEARCH_DAYS):
+        day = start.date() + timedelta(days=offset)
+        if day.month not in months:
+            continue
+        dom_ok, dow_ok = day.day in days, day.weekday() in weekdays
+        if not (dom_ok and dow_ok if day_any else dom_ok or dow_ok):
+            continue
+        for hour in sorted(hours):
+            for minute in sorted(minutes):
+                candidate = datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute)
+                if candidate >= start:
+                    return candidate
+    return None
+
+
+def next_occurrence(repeat: Optional[str], after: datetime, anchor: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    The first occurrence of `repeat` strictly after `after` (the previous
+    occurrence, whose time of day daily/weekdays/weekly rules keep).
+    With `anchor` (the rule's first firing), occurrences keep the anchor's
+    time of day and weekday instead, so a delayed firing does not carry
+    over to the next one; a rule that has not started yet fires at `anchor`.
+    Returns None for one-off schedules.
+    """
+    rule = (repeat or ONCE).strip().lower()
+    if rule in ONCE_ALIASES:
+        return None
+    anchor = anchor or after
+    if anchor > after:
+        return anchor
+    if rule in SIMPLE_RULES:
+        nxt = datetime.combine(after.date(), anchor.time())
+        if rule == "weekly":
+            nxt += timedelta(days=(anchor.weekday() - nxt.weekday()) % 7)
+        step = timedelta(weeks=1) if rule == "weekly" else timedelta(days=1)
+        while nxt <= after or (rule == "weekdays" and nxt.weekday() >= 5):
+            nxt += step
+        return nxt
+    return _next_cron(rule, after)
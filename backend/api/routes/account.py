@@ -1,27 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from api.firebaseConfig import db, auth
-from api.routes.auth import verify_admin
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from firebase_admin import auth
+from api.storage import store
+from api.executor import run_blocking
+from api.audit import audit
+from api.routes.auth import verify_admin, invalidate_user_role
+from api.projection import parse_fields
 from pydantic import BaseModel
+from typing import Optional
 import datetime
 
 manage_account_router = APIRouter(prefix="/account", tags=["account"])
 
-from firebase_admin import firestore
+# Default list view: everything but the avatar (often a Base64 image)
+USER_LIST_FIELDS = ["uid", "name", "email", "role", "status", "createdAt", "lastLogin", "isOnline"]
 
 @manage_account_router.get("/")
-def get_users(admin_user: dict = Depends(verify_admin)):
+async def get_users(response: Response,
+                    fields: Optional[str] = None,
+                    limit: Optional[int] = Query(None, ge=1, le=1000),
+                    start_after: Optional[str] = None,
+                    admin_user: dict = Depends(verify_admin)):
     """
-    List all users from Firestore.
+    List users from Firestore, projected onto `fields` ("*" for whole documents).
+    With `limit`, pass the X-Next-Cursor header back as start_after.
     Protected: Admin only.
     """
     try:
-        users = []
-        # Query Firestore users collection
-        docs = db.collection("users").stream()
-        for doc in docs:
-            user_data = doc.to_dict()
-            user_data["uid"] = doc.id
-            users.append(user_data)
+        # Query users collection
+        users, next_cursor = await run_blocking(
+            store.page_users,
+            fields=parse_fields(fields, USER_LIST_FIELDS),
+            limit=limit,
+            start_after=start_after
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return users
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch users: {str(e)}")
@@ -33,14 +46,15 @@ class CreateUserRequest(BaseModel):
     role: str = "user"
 
 @manage_account_router.post("/create")
-def create_user(user: CreateUserRequest, admin_user: dict = Depends(verify_admin)):
+async def create_user(user: CreateUserRequest, admin_user: dict = Depends(verify_admin)):
     """
     Create a new user (Auth + Firestore).
     Protected: Admin only.
     """
     try:
         # 1. Create in Firebase Auth
-        auth_user = auth.create_user(
+        auth_user = await run_blocking(
+            auth.create_user,
             email=user.email,
             password=user.password,
             display_name=user.name
@@ -56,51 +70,49 @@ def create_user(user: CreateUserRequest, admin_user: dict = Depends(verify_admin
             "createdAt": datetime.datetime.now().isoformat(),
             "lastLogin": None
         }
-        db.collection("users").document(auth_user.uid).set(new_user_doc)
+        await run_blocking(store.set_user, auth_user.uid, new_user_doc)
+        invalidate_user_role(auth_user.uid)
         
         # Log
-        db.collection("logs").add({
-            "user": "Admin", # Admin action
-            "action": "User Created",
-            "type": "Account",
-            "details": f"Created user: {user.email} ({user.role})",
-            "timestamp": firestore.SERVER_TIMESTAMP
-        })
+        audit.log(
+            user="Admin", # Admin action
+            action="User Created",
+            type="Account",
+            details=f"Created user: {user.email} ({user.role})"
+        )
         
         return {"message": f"User {user.email} created successfully", "uid": auth_user.uid}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create user: {str(e)}")
 
 @manage_account_router.put("/approve/{uid}")
-def approve_user(uid: str, admin_user: dict = Depends(verify_admin)):
+async def approve_user(uid: str, admin_user: dict = Depends(verify_admin)):
     """
     Approve a user account by setting status to 'approved'.
     Protected: Admin only.
     """
     try:
-        user_ref = db.collection("users").document(uid)
-        user_doc = user_ref.get()
-        if not user_doc.exists:
+        user_data = await run_blocking(store.get_user, uid)
+        if user_data is None:
             raise HTTPException(status_code=404, detail="User not found")
         
         # Get user details for log
-        user_data = user_doc.to_dict()
         user_email = user_data.get('email', 'Unknown')
         
-        user_ref.update({
+        await run_blocking(store.update_user, uid, {
             "status": "approved",
             "isOnline": True, # Auto-online for immediate badge visibility
             "lastLogin": datetime.datetime.now().isoformat() # Set lastLogin to now
         })
+        invalidate_user_role(uid)
         
         # Log
-        db.collection("logs").add({
-            "user": "Admin",
-            "action": "User Approved",
-            "type": "Account",
-            "details": f"Approved user: {user_email}",
-            "timestamp": firestore.SERVER_TIMESTAMP
-        })
+        audit.log(
+            user="Admin",
+            action="User Approved",
+            type="Account",
+            details=f"Approved user: {user_email}"
+        )
         
         return {"message": f"User {uid} approved successfully"}
     except HTTPException:
@@ -109,29 +121,28 @@ def approve_user(uid: str, admin_user: dict = Depends(verify_admin)):
         raise HTTPException(status_code=500, detail=f"Failed to approve user: {str(e)}")
 
 @manage_account_router.post("/reset/{uid}")
-def reset_user(uid: str, admin_user: dict = Depends(verify_admin)):
+async def reset_user(uid: str, admin_user: dict = Depends(verify_admin)):
     """
     Reset a user account password to '12345678' and status to 'pending' (optional).
     Protected: Admin only.
     """
     try:
         # Get user details for log
-        user_doc = db.collection("users").document(uid).get()
+        user_data = await run_blocking(store.get_user, uid)
         user_email = "Unknown"
-        if user_doc.exists:
-             user_email = user_doc.to_dict().get('email', 'Unknown')
+        if user_data is not None:
+             user_email = user_data.get('email', 'Unknown')
 
         # 1. Reset Password in Firebase Auth
-        auth.update_user(uid, password="12345678")
+        await run_blocking(auth.update_user, uid, password="12345678")
         
         # Log
-        db.collection("logs").add({
-            "user": "Admin",
-            "action": "Password Reset",
-            "type": "Account",
-            "details": f"Reset password for: {user_email}",
-            "timestamp": firestore.SERVER_TIMESTAMP
-        })
+        audit.log(
+            user="Admin",
+            action="Password Reset",
+            type="Account",
+            details=f"Reset password for: {user_email}"
+        )
         
         return {"message": f"User {uid} password reset to 12345678 successfully"}
     except HTTPException:
@@ -140,36 +151,36 @@ def reset_user(uid: str, admin_user: dict = Depends(verify_admin)):
         raise HTTPException(status_code=500, detail=f"Failed to reset user: {str(e)}")
 
 @manage_account_router.delete("/{uid}")
-def delete_user(uid: str, admin_user: dict = Depends(verify_admin)):
+async def delete_user(uid: str, admin_user: dict = Depends(verify_admin)):
     """
     Delete a user from both Firebase Authentication and Firestore.
     Protected: Admin only.
     """
     try:
         # Get user details for log before deletion
-        user_doc = db.collection("users").document(uid).get()
+        user_data = await run_blocking(store.get_user, uid)
         user_email = "Unknown"
-        if user_doc.exists:
-             user_email = user_doc.to_dict().get('email', 'Unknown')
+        if user_data is not None:
+             user_email = user_data.get('email', 'Unknown')
 
         # 1. Delete from Firestore
-        db.collection("users").document(uid).delete()
+        await run_blocking(store.delete_user, uid)
+        invalidate_user_role(uid)
         
         # 2. Delete from Firebase Authentication
         try:
-            auth.delete_user(uid)
+            await run_blocking(auth.delete_user, uid)
         except auth.UserNotFoundError:
             # If user not in Auth but in Firestore, we proceed
             pass
         
         # Log
-        db.collection("logs").add({
-            "user": "Admin",
-            "action": "User Deleted",
-            "type": "Account",
-            "details": f"Deleted user: {user_email}",
-            "timestamp": firestore.SERVER_TIMESTAMP
-        })
+        audit.log(
+            user="Admin",
+            action="User Deleted",
+            type="Account",
+            details=f"Deleted user: {user_email}"
+        )
             
         return {"message": f"User {uid} deleted successfully"}
     except Exception as e:
@@ -182,7 +193,7 @@ class UpdateAdminProfileRequest(BaseModel):
     avatar: str | None = None
 
 @manage_account_router.put("/profile")
-def update_admin_profile(data: UpdateAdminProfileRequest, admin_user: dict = Depends(verify_admin)):
+async def update_admin_profile(data: UpdateAdminProfileRequest, admin_user: dict = Depends(verify_admin)):
     """
     Update Admin Profile (Name, Email, Password) directly via Admin SDK.
     Bypasses 'Recent Login' requirement of client SDKs.
@@ -198,7 +209,7 @@ def update_admin_profile(data: UpdateAdminProfileRequest, admin_user: dict = Dep
         if data.name: auth_updates['display_name'] = data.name
         
         if auth_updates:
-            auth.update_user(uid, **auth_updates)
+            await run_blocking(auth.update_user, uid, **auth_updates)
 
         # 2. Update Firestore
         firestore_updates = {}
@@ -207,16 +218,16 @@ def update_admin_profile(data: UpdateAdminProfileRequest, admin_user: dict = Dep
         if data.avatar: firestore_updates['avatar'] = data.avatar
         
         if firestore_updates:
-            db.collection("users").document(uid).update(firestore_updates)
+            await run_blocking(store.update_user, uid, firestore_updates)
+            invalidate_user_role(uid)
             
         # Log
-        db.collection("logs").add({
-            "user": "Admin",
-            "action": "Profile Updated",
-            "type": "System",
-            "details": f"System Administrator updated their profile/credentials.",
-            "timestamp": firestore.SERVER_TIMESTAMP
-        })
+        audit.log(
+            user="Admin",
+            action="Profile Updated",
+            type="System",
+            details=f"System Administrator updated their profile/credentials."
+        )
 
         return {"message": "Admin profile updated successfully"}
     except Exception as e:
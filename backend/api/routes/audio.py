@@ -0,0 +1,110 @@
+import os
+import re
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File
+from fastapi.responses import Response, StreamingResponse
+from api.blobstore import blobs
+from api.events import broadcaster
+from api.executor import executor, run_blocking
+from api.metrics import metrics
+
+audio_router = APIRouter(prefix="/audio", tags=["audio"])
+
+MAX_UPLOAD_BYTES = int(os.getenv("PA_MAX_AUDIO_MB", "50")) * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# Content-addressed: a hash always names the same bytes
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(header: str, size: int):
+    """(start, end) inclusive for a single-range header, or None if unsatisfiable."""
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+def _warm_upcoming(event: str, data: dict):
+    """Warms the recordings of schedules the controller announced as upcoming."""
+    if event != "prefetch":
+        return
+    for hint in data.get("tasks", []):
+        if hint.get("audioHash"):
+            # Listeners must not block (disk reads go to the I/O pool)
+            executor.submit(blobs.warm, hint["audioHash"])
+
+
+# Leader and followers alike receive 'prefetch' (followers via the relay)
+broadcaster.add_listener(_warm_upcoming)
+
+
+def _iter_file(blob_hash: str, start: int, end: int):
+    with open(blobs.path(blob_hash), "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+@audio_router.post("/")
+async def upload_audio(file: UploadFile = File(...)):
+    """Stores an audio recording and returns its content hash."""
+    data = await file.read()
+    if not data:
+        raise HTTPException(status_code=400, detail="Empty audio upload")
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Audio upload too large")
+    content_type = file.content_type or "application/octet-stream"
+    blob_hash = await run_blocking(blobs.put, data, content_type)
+    return {"hash": blob_hash, "size": len(data), "content_type": content_type}
+
+
+@audio_router.api_route("/{blob_hash}", methods=["GET", "HEAD"])
+async def stream_audio(blob_hash: str, request: Request):
+    """Streams a stored recording. Supports Range requests and ETag revalidation."""
+    if not blobs.is_hash(blob_hash):
+        raise HTTPException(status_code=404, detail="Audio not found")
+    cached = blobs.hot(blob_hash) # Warmed ahead of playback: no disk access
+    metrics.inc("audio.hot_hits" if cached else "audio.hot_misses")
+    info = (len(cached[0]), cached[1]) if cached else await run_blocking(blobs.stat, blob_hash)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    size, content_type = info
+
+    etag = f'"{blob_hash}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in if_none_match or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    status, start, end = 200, 0, size - 1
+    range_header = request.headers.get("range")
+    # If-Range with a different validator means "send the whole thing"
+    if range_header and request.headers.get("if-range", etag) == etag:
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None:
+            return Response(status_code=416, headers=dict(headers, **{"Content-Range": f"bytes */{size}"}))
+        status, (start, end) = 206, byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    headers["Content-Length"] = str(end - start + 1)
+    if request.method == "HEAD" or size == 0:
+        return Response(status_code=status, headers=headers, media_type=content_type)
+    if cached:
+        return Response(cached[0][start:end + 1], status_code=status, headers=headers, media_type=content_type)
+    return StreamingResponse(_iter_file(blob_hash, start, end), status_code=status,
+                             headers=headers, media_type=content_type)
@@ -1,9 +1,28 @@
+import hashlib
+import time
 from fastapi import APIRouter, Depends, HTTPException, status, Header
 from firebase_admin import auth
-from api.firebaseConfig import db
+from api.storage import store
+from api.executor import run_blocking
+from api.cache import TTLCache
+from api.metrics import metrics
 
 auth_router = APIRouter(prefix="/auth", tags=["auth"])
 
+# Verified ID tokens, keyed by SHA-256 of the token (never exceeds the token's exp)
+TOKEN_CACHE_TTL = 300
+_token_cache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL)
+
+# uid -> role. account.py invalidates it in its own worker, but other workers
+# (and users docs written directly by the frontend) only catch up on expiry,
+# so a privilege decision is never reused for more than a few seconds.
+ROLE_CACHE_TTL = 5
+_role_cache = TTLCache(maxsize=10000, ttl=ROLE_CACHE_TTL)
+
+def invalidate_user_role(uid: str):
+    """Drops the cached role for uid (call after creating/updating/deleting a user)."""
+    _role_cache.pop(uid)
+
 async def verify_token(authorization: str = Header(...)):
     """
     Verifies the Firebase ID token passed in the Authorization header.
@@ -16,10 +35,20 @@ async def verify_token(authorization: str = Header(...)):
         )
     
     token = authorization.split("Bearer ")[1]
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+
+    decoded_token = _token_cache.get(cache_key)
+    if decoded_token is not None:
+        metrics.inc("auth.token_cache.hits")
+        return decoded_token
+    metrics.inc("auth.token_cache.misses")
     
     try:
         # Allow 60 seconds of clock skew to prevent "Token used too early" errors
-        decoded_token = auth.verify_id_token(token, clock_skew_seconds=60)
+        decoded_token = await run_blocking(auth.verify_id_token, token, clock_skew_seconds=60)
+        remaining = decoded_token.get("exp", 0) - time.time()
+        if remaining > 0:
+            _token_cache.set(cache_key, decoded_token, ttl=remaining)
         return decoded_token
     except Exception as e:
         print(f"Error verifying token: {e}") # Debug logging
@@ -31,18 +60,21 @@ async def verify_token(authorization: str = Header(...)):
 async def verify_admin(decoded_token: dict = Depends(verify_token)):
     """
     Verifies if the user associated with the token has admin privileges.
-    Checks Firestore 'users' collection for the 'role' field.
+    Checks Firestore 'users' collection for the 'role' field (cached per uid).
     """
     uid = decoded_token.get("uid")
     if not uid:
         raise HTTPException(status_code=401, detail="Invalid token payload")
 
-    user_doc = db.collection("users").document(uid).get()
-    if not user_doc.exists:
-        raise HTTPException(status_code=403, detail="User not found")
+    role = _role_cache.get(uid)
+    if role is None:
+        user_data = await run_blocking(store.get_user, uid)
+        if user_data is None:
+            raise HTTPException(status_code=403, detail="User not found")
+        role = user_data.get("role", "")
+        _role_cache.set(uid, role)
 
-    user_data = user_doc.to_dict()
-    if user_data.get("role") != "admin":
+    if role != "admin":
         raise HTTPException(status_code=403, detail="Admins only")
     
     return decoded_token
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, HTTPException
-from api.firebaseConfig import db
+from fastapi import APIRouter, HTTPException, Query
+from api.storage import store, NotFoundError
+from api.executor import run_blocking
+from api.audit import audit
+from api.events import broadcaster
+from api.metrics import metrics
 from pydantic import BaseModel
+from typing import List
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import datetime
-from firebase_admin import firestore
+import functools
+import time
 from api.controller import controller, Task, TaskType, Priority
+from api.cluster import ControllerUnavailable
 
 emergency_route = APIRouter(prefix="/emergency", tags=["emergency"])
 
@@ -11,16 +20,50 @@ class EmergencyAction(BaseModel):
     user: str
     action: str # ACTIVATED / DEACTIVATED
 
+HISTORY_LIMIT = 50 # Entries returned with the status (history itself is unbounded)
+
+# Single worker: emergency history/status writes apply in request order
+_bookkeeper = ThreadPoolExecutor(max_workers=1, thread_name_prefix="emergency")
+# Followers forward toggles to the leader here, never queued behind reads on the shared I/O pool
+_controller_rpc = ThreadPoolExecutor(max_workers=2, thread_name_prefix="emergency-rpc")
+
+async def _controller_call(method: str, *args):
+    """
+    Runs a controller method for the toggle. The leader's engine is called
+    inline (in-memory, no I/O); a follower's RPC runs on _controller_rpc.
+    """
+    engine = controller.engine
+    if engine is not None:
+        return getattr(engine, method)(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_controller_rpc, functools.partial(getattr(controller, method), *args))
+
+def _history_entry(action: str, user: str) -> dict:
+    now = datetime.datetime.now()
+    return {
+        "action": action,
+        "time": now.strftime("%Y-%m-%d %I:%M %p"),
+        "user": user,
+        "timestamp": now.astimezone(datetime.timezone.utc)
+    }
+
 @emergency_route.get("/")
-def get_emergency_status():
+async def get_emergency_status():
     try:
-        doc = db.collection("emergency").document("status").get()
-        if doc.exists:
-            return doc.to_dict()
-        return {"active": False, "history": []}
+        data = await run_blocking(store.get_emergency_status) or {"active": False}
+        history = await run_blocking(store.query_emergency_history, limit=HISTORY_LIMIT)
+        return dict(data, history=history)
     except Exception as e:
          return {"active": False, "history": [], "error": str(e)}
 
+@emergency_route.get("/history")
+async def get_emergency_history(user: str = None, limit: int = Query(HISTORY_LIMIT, ge=1, le=500)):
+    """Newest-first emergency history, optionally for one user."""
+    try:
+        return await run_blocking(store.query_emergency_history, limit=limit, user=user)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch history: {str(e)}")
+
 def log_to_file(msg):
     try:
         with open("debug_log.txt", "a") as f:
@@ -28,111 +71,130 @@ def log_to_file(msg):
     except:
         pass
 
+def _record_activation(user: str, log_id: str):
+    """Appends the ACTIVATED history entry and marks the status doc active."""
+    entry = _history_entry("ACTIVATED", user)
+    event_id = store.add_emergency_event(entry)
+    store.set_emergency_status({
+        "active": True,
+        "user": user,
+        "time": entry["time"],
+        "current_log_id": log_id,
+        "current_event_id": event_id
+    })
+
+def _record_deactivation(user: str) -> List[dict]:
+    """Closes the session entry and the status doc. Returns the latest history."""
+    data = store.get_emergency_status() or {}
+    current_log_id = data.get("current_log_id")
+    current_event_id = data.get("current_event_id")
+
+    closed = False
+    if current_event_id:
+        # Consolidate the ACTIVATED entry into one session entry
+        end_time = datetime.datetime.now().strftime("%I:%M %p")
+        try:
+            store.update_emergency_event(current_event_id, {
+                "action": "Emergency Session",
+                "time": f"{data.get('time')} - {end_time}"
+            })
+            closed = True
+        except NotFoundError:
+            pass # History was cleared during the session
+    if not closed:
+        store.add_emergency_event(_history_entry("DEACTIVATED", user))
+
+    store.set_emergency_status({
+        "active": False,
+        "user": None,
+        "time": None,
+        "current_log_id": None,
+        "current_event_id": None
+    })
+
+    # Update the unified log
+    if current_log_id:
+        session_end = {
+            "action": "Emergency Session",
+            "details": f"Emergency Session Ended (Deactivated by {user})"
+        }
+        # Short sessions end before the audit log was even flushed
+        if not audit.amend(current_log_id, session_end):
+            try:
+                store.update_log(current_log_id, session_end)
+            except Exception:
+                pass
+
+    return store.query_emergency_history(limit=HISTORY_LIMIT)
+
+def _bookkeeping(fn, *args):
+    """Runs history/status persistence in submission order, off the request path."""
+    def run():
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        except Exception as e:
+            print(f"[Emergency] Bookkeeping failed ({fn.__name__}): {e}")
+            metrics.inc("emergency.bookkeeping_errors")
+            raise
+        finally:
+            metrics.observe("emergency.bookkeeping_seconds", time.perf_counter() - started)
+    return _bookkeeper.submit(run)
+
 @emergency_route.post("/toggle")
-def toggle_emergency(action: EmergencyAction):
+async def toggle_emergency(action: EmergencyAction):
+    received = time.perf_counter()
     try:
         should_activate = action.action == "ACTIVATED"
         
         # 1. Controller State Management (The Source of Truth)
         if should_activate:
+            # FAST PATH: preempt and push to connected endpoints before any I/O
             task = Task(
                 type=TaskType.EMERGENCY,
                 priority=Priority.EMERGENCY,
                 data={"user": action.user}
             )
-            success = controller.request_playback(task)
-        else:
-            # Check Permission: Only the activator can deactivate
-            active_user = controller.get_active_emergency_user()
-            
-            if active_user and active_user != action.user:
-                 raise HTTPException(status_code=403, detail=f"Only the user who activated the emergency ({active_user}) can stop it.")
-            
-            controller.stop_task(None, TaskType.EMERGENCY)
-
-        # 2. History & Logging (Preserved for Frontend compatibility)
-        ref = db.collection("emergency").document("status")
-        doc = ref.get()
-        data = doc.to_dict() if doc.exists else {"active": False, "history": []}
+            success = await _controller_call("request_playback", task)
+            if not success:
+                raise HTTPException(status_code=409, detail="Emergency refused by the controller")
+            broadcaster.publish("emergency", {"active": True, "user": action.user})
+            metrics.observe("emergency.activation_seconds", time.perf_counter() - received)
+
+            # 2. History & Logging (after the response; ordered with deactivation)
+            log_id = audit.log(
+                user=action.user,
+                action="ACTIVATED Emergency",
+                type="Emergency",
+                details="Emergency Signal Broadcasting..."
+            )
+            _bookkeeping(_record_activation, action.user, log_id)
+            return {"active": True}
+
+        # Check Permission: Only the activator can deactivate
+        active_user = await _controller_call("get_active_emergency_user")
         
-        if should_activate:
-            # ACTIVATED: Prepend new history entry
-            history_entry = {
-                "id": datetime.datetime.now().isoformat(),
-                "action": "ACTIVATED",
-                "time": datetime.datetime.now().strftime("%Y-%m-%d %I:%M %p"),
-                "user": action.user
-            }
-            history = [history_entry] + data.get("history", [])
-
-            # Log to Unified History
-            _, doc_ref = db.collection("logs").add({
-                "user": action.user,
-                "action": "ACTIVATED Emergency",
-                "type": "Emergency",
-                "details": "Emergency Signal Broadcasting...", 
-                "timestamp": firestore.SERVER_TIMESTAMP
-            })
-            
-            ref.set({
-                "active": True,
-                "history": history,
-                "current_log_id": doc_ref.id
-            })
-        else:
-             # DEACTIVATED Logic (Closing the session)
-             current_log_id = data.get("current_log_id")
-             current_history = data.get("history", [])
-             
-             if current_history and current_history[0].get('action') == 'ACTIVATED':
-                 end_time = datetime.datetime.now().strftime("%I:%M %p")
-                 current_history[0]['action'] = "Emergency Session"
-                 current_history[0]['time'] = f"{current_history[0]['time']} - {end_time}"
-                 history = current_history
-             else:
-                 history_entry = {
-                    "id": datetime.datetime.now().isoformat(),
-                    "action": "DEACTIVATED",
-                    "time": datetime.datetime.now().strftime("%Y-%m-%d %I:%M %p"),
-                    "user": action.user
-                }
-                 history = [history_entry] + current_history
-
-             ref.set({
-                "active": False,
-                "history": history,
-                "current_log_id": None
-             })
-             
-             # Update the unified log
-             if current_log_id:
-                 try:
-                     db.collection("logs").document(current_log_id).update({
-                         "action": "Emergency Session",
-                         "details": f"Emergency Session Ended (Deactivated by {action.user})"
-                     })
-                 except:
-                     pass
-
-        return {"active": should_activate, "history": history}
+        if active_user and active_user != action.user:
+             raise HTTPException(status_code=403, detail=f"Only the user who activated the emergency ({active_user}) can stop it.")
+        
+        await _controller_call("stop_task", None, TaskType.EMERGENCY)
+        broadcaster.publish("emergency", {"active": False, "user": action.user})
+
+        # 2. History & Logging (waits for any pending activation bookkeeping)
+        history = await asyncio.wrap_future(_bookkeeping(_record_deactivation, action.user))
+        return {"active": False, "history": history}
     except HTTPException:
         raise
+    except ControllerUnavailable as e:
+        # Nothing was broadcast or recorded: the endpoint can simply retry
+        raise HTTPException(status_code=503, detail=f"Failed to toggle emergency: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to toggle emergency: {str(e)}")
 
 @emergency_route.delete("/history")
-def clear_emergency_history(user: str = None):
+async def clear_emergency_history(user: str = None):
     try:
-        ref = db.collection("emergency").document("status")
-        doc = ref.get()
-        if doc.exists:
-            current_history = doc.to_dict().get("history", [])
-            if user:
-                new_history = [h for h in current_history if h.get("user") != user]
-                ref.update({"history": new_history})
-            else:
-                ref.update({"history": []})
-        
+        await run_blocking(store.clear_emergency_history, user)
         return {"message": "Emergency history cleared"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to clear history: {str(e)}")
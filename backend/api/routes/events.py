@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from api.events import broadcaster
+from api.controller import controller
+from api.cluster import ControllerUnavailable
+from api.executor import run_blocking
+
+events_router = APIRouter(prefix="/events", tags=["events"])
+
+@events_router.get("/")
+async def stream_events():
+    """
+    Server-Sent Events push channel fed directly by the PA Controller.
+    Events: 'state' (same shape as system/state) and 'queue' (schedule queue changes).
+    """
+    # Current state first, so a new client does not wait for the next transition
+    try:
+        initial = broadcaster.format("state", await run_blocking(controller.get_state))
+    except ControllerUnavailable:
+        # No leader yet: subscribe anyway (an EventSource does not retry a 503);
+        # clients start idle and the next state change fills them in
+        initial = None
+    return StreamingResponse(
+        broadcaster.stream(initial),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 from typing import Optional, List
+from datetime import datetime
 from pydantic import BaseModel
-from api.firebaseConfig import db, firestore_server_timestamp
+from api.storage import store
+from api.executor import run_blocking
+from api.audit import audit
 from api.controller import controller, Task, TaskType, Priority
+from api.cluster import ControllerUnavailable
 
 real_time_announcements_router = APIRouter(
     prefix="/realtime",
@@ -23,7 +27,7 @@ class BroadcastAction(BaseModel):
     timestamp: Optional[str] = None
 
 @real_time_announcements_router.post("/start")
-def start_broadcast(req: BroadcastRequest):
+async def start_broadcast(req: BroadcastRequest):
     """
     Request to start a Live Broadcast (Voice or Text) or Background Audio.
     Verified by PA Controller.
@@ -49,14 +53,17 @@ def start_broadcast(req: BroadcastRequest):
         }
     )
     
-    success = controller.request_playback(task)
+    try:
+        success = await run_blocking(controller.request_playback, task)
+    except ControllerUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     if not success:
         raise HTTPException(status_code=409, detail="System Busy or Higher Priority Active")
     
     return {"message": "Broadcast Started", "task_id": task.id}
 
 @real_time_announcements_router.post("/stop")
-def stop_broadcast(user: str, type: str = "voice", task_id: Optional[str] = None): 
+async def stop_broadcast(user: str, type: str = "voice", task_id: Optional[str] = None): 
     """
     Request to stop the current broadcast.
     Type can be 'voice', 'text', 'background'
@@ -67,41 +74,73 @@ def stop_broadcast(user: str, type: str = "voice", task_id: Optional[str] = None
     elif type == 'text':
         target_type = TaskType.TEXT
     
-    controller.stop_task(task_id, task_type=target_type)
+    try:
+        await run_blocking(controller.stop_task, task_id, task_type=target_type)
+    except ControllerUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     return {"message": "Broadcast Stopped"}
 
 class CompleteRequest(BaseModel):
     task_id: str
 
 @real_time_announcements_router.post("/complete")
-def complete_task(req: CompleteRequest):
+async def complete_task(req: CompleteRequest):
     """
     Signal that a task (e.g. Schedule playback) has finished.
     """
-    controller.stop_task(req.task_id)
+    try:
+        await run_blocking(controller.stop_task, req.task_id)
+    except ControllerUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     return {"message": "Task Completed"}
 
 @real_time_announcements_router.post("/log")
-def log_broadcast(action: BroadcastAction):
+async def log_broadcast(action: BroadcastAction):
     # Log history only
     try:
-        log_entry = action.dict()
-        log_entry["timestamp"] = firestore_server_timestamp()
-        update_time, doc_ref = db.collection("logs").add(log_entry)
-        return {"message": "Logged successfully", "id": doc_ref.id}
+        log_id = audit.log(
+            user=action.user,
+            action=action.action,
+            type=action.type,
+            details=action.details
+        )
+        return {"message": "Logged successfully", "id": log_id}
     except Exception as e:
         print(f"Logging failed: {e}")
         return {"message": "Logged (fallback)", "id": None}
 
 @real_time_announcements_router.get("/logs")
-def get_logs():
+async def get_logs(response: Response,
+                   limit: int = Query(50, ge=1, le=500),
+                   start_after: Optional[str] = None,
+                   type: Optional[str] = None,
+                   user: Optional[str] = None,
+                   action: Optional[str] = None,
+                   since: Optional[datetime] = None,
+                   until: Optional[datetime] = None):
+    """
+    One page of logs, newest first, filtered server-side.
+    Pass the X-Next-Cursor response header back as start_after for the next page.
+    """
     try:
-        from firebase_admin import firestore
-        docs = db.collection("logs").order_by("timestamp", direction=firestore.Query.DESCENDING).limit(50).stream()
+        if not start_after:
+            # Logs still in the write-behind buffer belong on the first page
+            await run_blocking(audit.flush)
+        page, next_cursor = await run_blocking(
+            store.query_logs,
+            limit=limit,
+            start_after=start_after,
+            type=type,
+            user=user,
+            action=action,
+            since=since,
+            until=until
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+
         logs = []
-        for doc in docs:
-            data = doc.to_dict()
-            data["id"] = doc.id
+        for data in page:
             if "timestamp" in data and data["timestamp"]:
                 ts = data["timestamp"]
                 if hasattr(ts, 'isoformat'):
@@ -119,22 +158,25 @@ class LogUpdate(BaseModel):
     details: str = None
 
 @real_time_announcements_router.put("/log/{log_id}")
-def update_log(log_id: str, update: LogUpdate):
+async def update_log(log_id: str, update: LogUpdate):
     try:
-        doc_ref = db.collection("logs").document(log_id)
-        if not doc_ref.get().exists:
-            raise HTTPException(status_code=404, detail="Log not found")
         fields_to_update = {k: v for k, v in update.dict().items() if v is not None}
+        # Still buffered in the audit sink (not written yet)
+        if audit.amend(log_id, fields_to_update):
+            return {"message": "Log updated successfully"}
+        if await run_blocking(store.get_log, log_id) is None:
+            raise HTTPException(status_code=404, detail="Log not found")
         if fields_to_update:
-            doc_ref.update(fields_to_update)
+            await run_blocking(store.update_log, log_id, fields_to_update)
         return {"message": "Log updated successfully"}
     except Exception as e:
          raise HTTPException(status_code=500, detail=str(e))
          
 @real_time_announcements_router.delete("/log/{log_id}")
-def delete_log(log_id: str):
+async def delete_log(log_id: str):
     try:
-        db.collection("logs").document(log_id).delete()
+        await run_blocking(audit.discard, log_id)
+        await run_blocking(store.delete_log, log_id)
         return {"message": "Log deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,12 +1,31 @@
-from fastapi import APIRouter, HTTPException
-from api.firebaseConfig import db, firestore_server_timestamp
+import csv
+import json
+import os
+import uuid
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from api.storage import store
+from api.executor import run_blocking
+from api.audit import audit
 from pydantic import BaseModel
-from typing import Optional
-from api.controller import controller, Task, TaskType, Priority
-from datetime import datetime
+from typing import List, Optional, Tuple
+from api.controller import controller, Task, TaskType, Priority, MAX_DURATION
+from api.cluster import ControllerUnavailable
+from api.recurrence import validate, is_recurring, RecurrenceError
+from api.blobstore import blobs
+from api.projection import parse_fields
+from datetime import datetime, timedelta
 
 scheduled_announcements_router = APIRouter(prefix="/scheduled", tags=["scheduled"])
 
+# Default list view: everything but inline audio (legacy Base64 payloads)
+SCHEDULE_LIST_FIELDS = ["message", "date", "time", "repeat", "until", "zones",
+                        "status", "type", "user", "audioHash", "duration"]
+REQUIRED_FIELDS = ["message", "date", "time", "repeat", "zones"]
+BULK_MAX_ROWS = int(os.getenv("PA_BULK_MAX_ROWS", "50000"))
+BULK_MAX_ERRORS = 100 # Row errors reported back per import
+CONFLICT_SCAN_WINDOW = timedelta(days=7) # Default range of GET /scheduled/conflicts
+CONFLICT_SCAN_MAX = timedelta(days=31)   # Longest range it accepts
+
 class ScheduleItem(BaseModel):
     message: str
     date: str
@@ -14,47 +33,258 @@ class ScheduleItem(BaseModel):
     repeat: str
     zones: str # comma separated
     type: str = 'text' # or 'voice'
-    audio: Optional[str] = None # Base64
+    audio: Optional[str] = None # Legacy Base64 data URL, moved to the blob store on write
+    audioHash: Optional[str] = None # Blob store reference (see POST /audio/)
+
+async def _externalize_audio(schedule: dict):
+    """Keeps audio out of the schedule document: only the blob hash is stored."""
+    audio = schedule.pop("audio", None)
+    if audio:
+        try:
+            schedule["audioHash"] = await run_blocking(blobs.put_data_url, audio)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid audio data")
+    if schedule.get("audioHash") and not await run_blocking(blobs.exists, schedule["audioHash"]):
+        raise HTTPException(status_code=400, detail="Unknown audioHash")
+
+def _anchor_rule(schedule: dict, current: Optional[dict] = None):
+    """
+    Pins a recurring rule to the date/time it is set to (anchor_date/
+    anchor_time). The controller rewrites date/time as occurrences fire or
+    are delayed; the anchor only moves when the rule itself is moved.
+    """
+    current = current or {}
+    rule = dict(current, **schedule)
+    if not is_recurring(rule.get("repeat")):
+        return
+    moved = (rule.get("date"), rule.get("time")) != (current.get("date"), current.get("time"))
+    if moved or not current.get("anchor_date"):
+        schedule["anchor_date"], schedule["anchor_time"] = rule.get("date"), rule.get("time")
+
+def _duration_error(schedule: dict) -> Optional[str]:
+    """Why a schedule's stated `duration` (seconds) is unusable, or None."""
+    if schedule.get("duration") in (None, ""):
+        return None
+    try:
+        duration = float(schedule["duration"])
+    except (TypeError, ValueError):
+        return "duration must be a number of seconds"
+    if not 0 <= duration <= MAX_DURATION:
+        return f"duration must be between 0 and {MAX_DURATION:g} seconds"
+    return None
+
+def _restore_schedule(schedule_id: str, previous: Optional[dict]):
+    """
+    Puts a schedule back as it was before a request the controller could
+    not apply (None: it did not exist), so the store the next leader
+    bootstraps from matches what the caller was told.
+    """
+    if previous is None:
+        store.delete_schedule(schedule_id)
+    else:
+        store.set_schedule(schedule_id, previous)
+
+async def _body_lines(request: Request):
+    """Yields the request body line by line as it arrives (chunked uploads included)."""
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8-sig")
+    if pending.strip():
+        yield pending.rstrip(b"\r").decode("utf-8-sig")
+
+def _check_row_count(count: int):
+    if count > BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Too many schedules (limit {BULK_MAX_ROWS})")
+
+async def _csv_rows(request: Request) -> list:
+    """CSV with a header row; empty cells are left out of the row."""
+    rows, header, record = [], None, ""
+    async for line in _body_lines(request):
+        record += line
+        if record.count('"') % 2:
+            record += "\n" # Inside a quoted field that spans lines
+            continue
+        if record.strip():
+            try:
+                values = next(csv.reader([record]))
+            except csv.Error:
+                raise HTTPException(status_code=400, detail=f"Invalid CSV near: {record[:80]}")
+            if header is None:
+                header = [name.strip() for name in values]
+            else:
+                rows.append({k: v.strip() for k, v in zip(header, values) if v.strip()})
+                _check_row_count(len(rows))
+        record = ""
+    if record:
+        raise HTTPException(status_code=400, detail="Invalid CSV: unterminated quoted field")
+    return rows
+
+async def _ndjson_rows(request: Request) -> list:
+    """One JSON object per line; unparseable lines become invalid rows."""
+    rows = []
+    async for line in _body_lines(request):
+        if line.strip():
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                rows.append(None)
+            _check_row_count(len(rows))
+    return rows
+
+async def _parse_rows(request: Request) -> list:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return await _csv_rows(request)
+    if content_type in ("application/x-ndjson", "application/jsonl"):
+        return await _ndjson_rows(request)
+    try:
+        rows = json.loads(await request.body() or b"[]")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if isinstance(rows, dict):
+        rows = rows.get("schedules")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of schedules")
+    _check_row_count(len(rows))
+    return rows
+
+async def _validate_rows(rows: list) -> Tuple[List[Tuple[dict, datetime]], List[dict]]:
+    """
+    Checks every row in one pass and collects all errors (row numbers are
+    1-based, CSV header excluded). A timetable repeats the same rules, dates
+    and audio, so each distinct value is checked only once.
+    """
+    rules, times = {}, {}
+    checked, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({"row": number, "error": "Not a schedule object"})
+            continue
+        missing = [f for f in REQUIRED_FIELDS if not row.get(f)]
+        if missing:
+            errors.append({"row": number, "error": f"Missing field: {', '.join(missing)}"})
+            continue
+        if row.get("audio"):
+            errors.append({"row": number, "error": "Inline audio is not imported; upload it to /audio/ and pass audioHash"})
+            continue
+        duration_error = _duration_error(row)
+        if duration_error:
+            errors.append({"row": number, "error": duration_error})
+            continue
+
+        repeat, when = str(row["repeat"]), (str(row["date"]), str(row["time"]))
+        if repeat not in rules:
+            try:
+                validate(repeat)
+                rules[repeat] = None
+            except RecurrenceError as e:
+                rules[repeat] = str(e)
+        if when not in times:
+            try:
+                times[when] = datetime.strptime(f"{when[0]} {when[1]}", "%Y-%m-%d %H:%M")
+            except ValueError:
+                times[when] = None
+
+        if rules[repeat]:
+            errors.append({"row": number, "error": rules[repeat]})
+        elif times[when] is None:
+            errors.append({"row": number, "error": "Invalid date/time format. Use YYYY-MM-DD and HH:MM"})
+        else:
+            checked.append((number, row, times[when]))
+
+    hashes = {row["audioHash"] for _, row, _ in checked if row.get("audioHash")}
+    unknown = await run_blocking(lambda: {h for h in hashes if not blobs.exists(h)}) if hashes else set()
+    valid = []
+    for number, row, scheduled_time in checked:
+        if row.get("audioHash") in unknown:
+            errors.append({"row": number, "error": "Unknown audioHash"})
+        else:
+            valid.append((row, scheduled_time))
+    errors.sort(key=lambda e: e["row"])
+    return valid, errors
 
 @scheduled_announcements_router.get("/")
-def get_schedules():
+async def get_schedules(response: Response,
+                        fields: Optional[str] = None,
+                        limit: Optional[int] = Query(None, ge=1, le=1000),
+                        start_after: Optional[str] = None):
+    """
+    Lists schedules projected onto `fields` (comma separated, "*" for whole
+    documents). With `limit`, pass the X-Next-Cursor response header back
+    as start_after for the next page.
+    """
     try:
-        docs = db.collection("schedules").stream()
-        schedules = []
-        for doc in docs:
-            data = doc.to_dict()
-            data["id"] = doc.id
-            schedules.append(data)
+        schedules, next_cursor = await run_blocking(
+            store.page_schedules,
+            fields=parse_fields(fields, SCHEDULE_LIST_FIELDS),
+            limit=limit,
+            start_after=start_after
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         # Sort by date/time (optional, can be done in frontend)
         return schedules
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch schedules: {str(e)}")
 
+@scheduled_announcements_router.get("/conflicts")
+async def get_conflicts(start: Optional[str] = None,
+                        end: Optional[str] = None,
+                        limit: int = Query(500, ge=1, le=5000)):
+    """
+    Pairs of queued schedules that overlap in a shared zone, for schedules
+    starting in [start, end) (ISO dates or date-times; default the next 7
+    days, at most 31). Queued means the controller's loaded window plus anything
+    created since; a recurring rule counts with its next occurrence.
+    """
+    try:
+        begin = datetime.fromisoformat(start) if start else datetime.now()
+        finish = datetime.fromisoformat(end) if end else begin + CONFLICT_SCAN_WINDOW
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid start/end. Use YYYY-MM-DD or YYYY-MM-DDTHH:MM")
+    if finish <= begin:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if finish - begin > CONFLICT_SCAN_MAX:
+        raise HTTPException(status_code=400, detail=f"Range too long (at most {CONFLICT_SCAN_MAX.days} days)")
+    try:
+        return await run_blocking(controller.scan_conflicts, begin, finish, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to scan conflicts: {str(e)}")
+
 @scheduled_announcements_router.post("/")
-def create_schedule(schedule: dict):
+async def create_schedule(schedule: dict):
     try:
         # 1. Validation
-        required = ["message", "date", "time", "repeat", "zones"]
-        for f in required:
+        for f in REQUIRED_FIELDS:
             if f not in schedule or not schedule[f]:
                  raise HTTPException(status_code=400, detail=f"Missing field: {f}")
+        try:
+            validate(schedule["repeat"])
+        except RecurrenceError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        duration_error = _duration_error(schedule)
+        if duration_error:
+            raise HTTPException(status_code=400, detail=duration_error)
 
-        # 2. Persistence (Firestore)
-        if "id" in schedule: del schedule["id"]
-        schedule['status'] = 'Pending' # Default
-        
-        _, doc_ref = db.collection("schedules").add(schedule)
-        doc_id = doc_ref.id
-        
-        # 3. Sync to Controller Queue
-        # Parse datetime for sorting
-        # 3. Queueing
+        # Parse datetime for sorting (before anything is stored)
         try:
             dt_str = f"{schedule['date']} {schedule['time']}"
             scheduled_time = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
         except ValueError:
              raise HTTPException(status_code=400, detail="Invalid date/time format. Use YYYY-MM-DD and HH:MM")
 
+        # 2. Persistence (Firestore)
+        if "id" in schedule: del schedule["id"]
+        schedule['status'] = 'Pending' # Default
+        _anchor_rule(schedule)
+        await _externalize_audio(schedule)
+        
+        doc_id = await run_blocking(store.add_schedule, schedule)
+        
+        # 3. Sync to Controller Queue
         task = Task(
             id=doc_id, # Use Firestore ID for consistency
             type=TaskType.SCHEDULE,
@@ -62,35 +292,113 @@ def create_schedule(schedule: dict):
             data=schedule,
             scheduled_time=scheduled_time
         )
-        controller.request_playback(task)
+        # Overlaps are reported, not refused (the controller would delay it)
+        try:
+            report = await run_blocking(controller.find_conflicts, task)
+            await run_blocking(controller.request_playback, task)
+        except ControllerUnavailable as e:
+            await run_blocking(_restore_schedule, doc_id, None)
+            raise HTTPException(status_code=503, detail=f"Schedule not created: {str(e)}")
 
         # 4. Log
-        db.collection("logs").add({
-            "user": schedule.get("user", "Admin"),
-            "action": "Schedule Created",
-            "type": "Schedule",
-            "details": f"Scheduled: {schedule.get('message')}",
-            "timestamp": firestore_server_timestamp()
-        })
-
-        return {"id": doc_id, "message": "Schedule created and queued"}
+        audit.log(
+            user=schedule.get("user", "Admin"),
+            action="Schedule Created",
+            type="Schedule",
+            details=f"Scheduled: {schedule.get('message')}"
+        )
+
+        response = {"id": doc_id, "message": "Schedule created and queued"}
+        if report["conflicts"]:
+            response.update(report)
+        return response
     except HTTPException as he:
         raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create schedule: {str(e)}")
 
+@scheduled_announcements_router.post("/bulk")
+async def import_schedules(request: Request, user: str = "Admin", partial: bool = False):
+    """
+    Creates many schedules in one request: a JSON array, or NDJSON / CSV
+    (header row) read as it streams in. Rows take the fields of POST
+    /scheduled/. Any invalid row rejects the whole import unless `partial`,
+    which imports the valid rows and reports the others.
+    """
+    try:
+        rows = await _parse_rows(request)
+        valid, errors = await _validate_rows(rows)
+        if errors and not partial:
+            raise HTTPException(status_code=400, detail={
+                "message": f"{len(errors)} of {len(rows)} schedules are invalid; nothing was imported",
+                "errors": errors[:BULK_MAX_ERRORS]
+            })
+
+        entries, tasks = [], []
+        for schedule, scheduled_time in valid:
+            schedule.pop("id", None)
+            schedule["status"] = "Pending"
+            schedule.setdefault("user", user)
+            _anchor_rule(schedule)
+            doc_id = uuid.uuid4().hex[:20]
+            entries.append((doc_id, schedule))
+            tasks.append(Task(
+                id=doc_id,
+                type=TaskType.SCHEDULE,
+                priority=Priority.SCHEDULE,
+                data=schedule,
+                scheduled_time=scheduled_time
+            ))
+
+        if entries:
+            # Batched writes, then one queue merge (one lock, one queue event)
+            await run_blocking(store.add_schedules, entries)
+            try:
+                await run_blocking(controller.queue_schedules, tasks)
+            except ControllerUnavailable as e:
+                await run_blocking(store.delete_schedules, [doc_id for doc_id, _ in entries])
+                raise HTTPException(status_code=503, detail=f"Nothing was imported: {str(e)}")
+            audit.log(
+                user=user,
+                action="Schedules Imported",
+                type="Schedule",
+                details=f"Imported {len(entries)} schedules" + (f" ({len(errors)} rows skipped)" if errors else ""),
+                count=len(entries)
+            )
+
+        return {
+            "created": len(entries),
+            "ids": [doc_id for doc_id, _ in entries],
+            "failed": len(errors),
+            "errors": errors[:BULK_MAX_ERRORS],
+            "message": f"Imported {len(entries)} schedules"
+        }
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import schedules: {str(e)}")
+
 @scheduled_announcements_router.put("/{id}")
-def update_schedule(id: str, schedule: dict):
+async def update_schedule(id: str, schedule: dict):
     try:
-        # 1. Persistence
-        db.collection("schedules").document(id).set(schedule, merge=True)
-        
-        # 2. Sync Controller (Remove old, Add new)
-        controller.remove_from_queue(id)
-        
-        # Re-add
+        if "repeat" in schedule:
+            try:
+                validate(schedule["repeat"])
+            except RecurrenceError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        duration_error = _duration_error(schedule)
+        if duration_error:
+            raise HTTPException(status_code=400, detail=duration_error)
+        await _externalize_audio(schedule)
+        if schedule.get("audioHash"):
+            schedule["audio"] = None # Clear legacy inline audio left by the merge
+        current = await run_blocking(store.get_schedule, id)
+        _anchor_rule(schedule, current)
+
+        # Re-queued as merged: the body may carry only the edited fields
+        merged = dict(current or {}, **schedule)
         try:
-            dt_str = f"{schedule.get('date')} {schedule.get('time')}"
+            dt_str = f"{merged.get('date')} {merged.get('time')}"
             scheduled_time = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
         except ValueError:
              raise HTTPException(status_code=400, detail="Invalid date/time format")
@@ -99,45 +407,66 @@ def update_schedule(id: str, schedule: dict):
             id=id,
             type=TaskType.SCHEDULE,
             priority=Priority.SCHEDULE,
-            data=schedule,
+            data=merged,
             scheduled_time=scheduled_time
         )
-        controller.request_playback(task)
+
+        # 1. Persistence
+        await run_blocking(store.set_schedule, id, schedule, merge=True)
+        
+        # 2. Sync Controller (Remove old, Add new)
+        try:
+            await run_blocking(controller.remove_from_queue, id)
+            report = await run_blocking(controller.find_conflicts, task)
+            await run_blocking(controller.request_playback, task)
+        except ControllerUnavailable as e:
+            await run_blocking(_restore_schedule, id, current)
+            raise HTTPException(status_code=503, detail=f"Schedule not updated: {str(e)}")
         
         # 3. Log
-        db.collection("logs").add({
-            "user": schedule.get("user", "Admin"),
-            "action": "Schedule Updated",
-            "type": "Schedule",
-            "details": f"Updated schedule ID: {id}",
-            "timestamp": firestore_server_timestamp()
-        })
-
-        return {"message": "Schedule updated and re-queued"}
+        audit.log(
+            user=schedule.get("user", "Admin"),
+            action="Schedule Updated",
+            type="Schedule",
+            details=f"Updated schedule ID: {id}"
+        )
+
+        response = {"message": "Schedule updated and re-queued"}
+        if report["conflicts"]:
+            response.update(report)
+        return response
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update schedule: {str(e)}")
 
 @scheduled_announcements_router.delete("/{id}")
-def delete_schedule(id: str, user: str = "Admin"):
+async def delete_schedule(id: str, user: str = "Admin"):
     try:
         # 1. Persistence
-        db.collection("schedules").document(id).delete()
+        current = await run_blocking(store.get_schedule, id)
+        await run_blocking(store.delete_schedule, id)
         
         # 2. Sync Controller
-        controller.remove_from_queue(id)
-        # Also stop if it's currently playing?
-        # controller.stop_task(id) # Optional, strictly speaking deleting a schedule usually stops it if it's playing.
-        controller.stop_task(id)
+        # Stop first if it's currently playing: a recurring rule re-arms its
+        # next occurrence on stop, which the removal below then cancels.
+        try:
+            await run_blocking(controller.stop_task, id)
+            await run_blocking(controller.remove_from_queue, id)
+        except ControllerUnavailable as e:
+            await run_blocking(_restore_schedule, id, current)
+            raise HTTPException(status_code=503, detail=f"Schedule not deleted: {str(e)}")
 
         # 3. Log
-        db.collection("logs").add({
-            "user": user,
-            "action": "Schedule Deleted",
-            "type": "Schedule",
-            "details": f"Deleted schedule ID: {id}",
-            "timestamp": firestore_server_timestamp()
-        })
+        audit.log(
+            user=user,
+            action="Schedule Deleted",
+            type="Schedule",
+            details=f"Deleted schedule ID: {id}"
+        )
 
         return {"message": "Schedule deleted and unqueued"}
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete schedule: {str(e)}")
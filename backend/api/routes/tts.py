@@ -0,0 +1,52 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Path, Query, Request
+from fastapi.responses import RedirectResponse
+from api.storage import store
+from api.executor import run_blocking
+from api.controller import controller
+from api.cluster import ControllerUnavailable
+from api.tts import speech, SpeechUnavailable
+
+tts_router = APIRouter(prefix="/tts", tags=["tts"])
+
+
+async def _announcement_text(task_id: str) -> Optional[str]:
+    """Text of a live announcement or a stored schedule, or None."""
+    try:
+        state = await run_blocking(controller.get_state)
+    except ControllerUnavailable:
+        state = {}
+    for task in state.get("active_tasks") or []:
+        if task.get("id") == task_id:
+            data = task.get("data") or {}
+            return data.get("message") or data.get("content")
+    schedule = await run_blocking(store.get_schedule, task_id)
+    if schedule:
+        return schedule.get("message") or schedule.get("content")
+    return None
+
+
+@tts_router.get("/{task_id}")
+async def get_speech(request: Request,
+                     task_id: str = Path(..., max_length=64),
+                     voice: Optional[str] = Query(None, max_length=40, pattern=r"^[A-Za-z][A-Za-z0-9_+-]*$"),
+                     rate: Optional[int] = Query(None, ge=80, le=450)):
+    """
+    Spoken audio for the text of a live announcement or stored schedule,
+    rendered once per (text, voice, rate) by the offline engine. Only text
+    the system announces is rendered, never arbitrary input. Redirects to
+    the cached recording under /audio/, which browsers then cache for good.
+    503 without an engine: clients fall back to the browser's speechSynthesis.
+    """
+    if not speech.available:
+        raise HTTPException(status_code=503, detail="Text-to-speech is not available")
+    text = await _announcement_text(task_id)
+    if not text:
+        raise HTTPException(status_code=404, detail="No text announcement with this id")
+    try:
+        blob_hash = await run_blocking(speech.speech_for, text, voice, rate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SpeechUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return RedirectResponse(request.url_for("stream_audio", blob_hash=blob_hash), status_code=307)
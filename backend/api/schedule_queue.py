@@ -0,0 +1,333 @@
+import heapq
+import itertools
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+# Heap entry layout: [rank, base_ts, seq, task, synced_offset, duration]
+# rank 0 = re-queued at HEAD (interrupted), rank 1 = normal schedule
+# base_ts + offset        = effective scheduled time (epoch seconds)
+# base_ts + synced_offset = time last written to Firestore
+# duration                = estimated play time (seconds, for overlap queries)
+# Floats rather than datetime/timedelta: half the size, and a 100k
+# calendar keeps one entry per schedule.
+_RANK_HEAD = 0
+_RANK_NORMAL = 1
+_KEY = 1
+_TASK = 3
+_SYNCED = 4
+_DURATION = 5
+_CHUNK = 512 # Timeline chunk size: inserts/removals move at most 2 * _CHUNK slots
+
+
+class _Timeline:
+    """
+    Heap entries sorted by base_ts, stored in bounded chunks (with the first
+    key of each chunk kept for bisection), so an insert or removal costs
+    O(log n) plus a short move within one chunk, at any queue size.
+
+    view() shares the chunks with a frozen copy; a shared chunk is copied
+    on its next change, so views cost O(n / _CHUNK) to take.
+    """
+
+    def __init__(self):
+        self._firsts: List[float] = []
+        self._keys: List[array] = []
+        self._chunks: List[List[list]] = []
+        self._owned: List[bool] = [] # Per chunk: False while a view may share it
+
+    def view(self) -> "_Timeline":
+        """Frozen copy of the timeline as of now (read-only: between())."""
+        view = _Timeline()
+        view._firsts, view._keys, view._chunks = list(self._firsts), list(self._keys), list(self._chunks)
+        self._owned = [False] * len(self._chunks)
+        return view
+
+    def _own(self, c: int):
+        """Copies chunk c before its first change since a view was taken."""
+        if not self._owned[c]:
+            self._keys[c] = array('d', self._keys[c])
+            self._chunks[c] = list(self._chunks[c])
+            self._owned[c] = True
+
+    def insert(self, entry):
+        key = entry[_KEY]
+        if not self._chunks:
+            self._firsts.append(key)
+            self._keys.append(array('d', [key]))
+            self._chunks.append([entry])
+            self._owned.append(True)
+            return
+        c = max(0, bisect_right(self._firsts, key) - 1)
+        self._own(c)
+        keys, chunk = self._keys[c], self._chunks[c]
+        i = bisect_right(keys, key)
+        keys.insert(i, key)
+        chunk.insert(i, entry)
+        self._firsts[c] = keys[0]
+        if len(chunk) > 2 * _CHUNK:
+            self._firsts.insert(c + 1, keys[_CHUNK])
+            self._keys.insert(c + 1, keys[_CHUNK:])
+            self._chunks.insert(c + 1, chunk[_CHUNK:])
+            self._owned.insert(c + 1, True)
+            del keys[_CHUNK:], chunk[_CHUNK:]
+
+    def remove(self, entry):
+        key = entry[_KEY]
+        # Equal keys may continue into the following chunks
+        c = max(0, bisect_left(self._firsts, key) - 1)
+        while True:
+            keys, chunk = self._keys[c], self._chunks[c]
+            i = bisect_left(keys, key)
+            while i < len(chunk) and chunk[i] is not entry:
+                i += 1
+            if i < len(chunk):
+                break
+            c += 1
+        self._own(c)
+        keys, chunk = self._keys[c], self._chunks[c]
+        del keys[i], chunk[i]
+        if chunk:
+            self._firsts[c] = keys[0]
+        else:
+            del self._firsts[c], self._keys[c], self._chunks[c], self._owned[c]
+
+    def between(self, lo: float, hi: float):
+        """Yields the entries with lo <= base_ts < hi, in order."""
+        c = max(0, bisect_right(self._firsts, lo) - 1)
+        i = bisect_left(self._keys[c], lo) if self._chunks else 0
+        for keys, chunk in zip(self._keys[c:], self._chunks[c:]):
+            for j in range(i, len(chunk)):
+                if keys[j] >= hi:
+                    return
+                yield chunk[j]
+            i = 0
+
+    def entries(self):
+        """Yields every entry, in base_ts order."""
+        for chunk in self._chunks:
+            yield from chunk
+
+
+def _overlapping(timeline: _Timeline, offset: float, longest: float,
+                 start: float, end: float) -> List[Tuple[object, float, float]]:
+    found = []
+    for entry in timeline.between(start - offset - longest, end - offset):
+        task = entry[_TASK]
+        if task is None:
+            continue # Cancelled after a view was taken
+        begin = entry[_KEY] + offset
+        if begin + entry[_DURATION] > start:
+            found.append((task, begin, begin + entry[_DURATION]))
+    return found
+
+
+class QueueView:
+    """
+    Read-only ScheduleQueue as of when it was taken (see ScheduleQueue.view).
+    Its timeline chunks are shared copy-on-write, so it is queried without
+    the queue owner's lock; entries cancelled since are skipped. Tasks are
+    the queue's own objects: read their immutable fields only.
+    """
+
+    __slots__ = ('_timeline', '_offset', '_longest')
+
+    def __init__(self, timeline: _Timeline, offset: float, longest: float):
+        self._timeline = timeline
+        self._offset = offset
+        self._longest = longest
+
+    def overlapping(self, start: float, end: float) -> List[Tuple[object, float, float]]:
+        """Same as ScheduleQueue.overlapping, as of the view."""
+        return _overlapping(self._timeline, self._offset, self._longest, start, end)
+
+    def tasks(self) -> List[Tuple[object, float]]:
+        """(task, scheduled_ts) of the live tasks in run order (O(n log n))."""
+        live = [(entry[:3], entry[_TASK]) for entry in self._timeline.entries()]
+        live.sort(key=lambda item: item[0])
+        return [(task, order[_KEY] + self._offset) for order, task in live if task is not None]
+
+
+class ScheduleQueue:
+    """
+    Priority queue for pending schedules.
+
+    A binary heap keyed on (scheduled_time, seq) with an id -> entry index.
+    Cancelled entries are marked dead and dropped lazily when they reach the
+    top of the heap, so insert, cancel and due-pop are all O(log n).
+
+    Interruption time-shifts are accumulated in a single offset that is
+    applied at compare time, so shifting the whole queue is O(1).
+
+    The same entries are also kept in a timeline sorted by start (base_ts),
+    so the schedules overlapping an interval are found by bisection.
+
+    Tasks need an `id` and a `scheduled_ts` (epoch seconds).
+    """
+
+    def __init__(self):
+        self._heap: List[list] = []
+        self._index: Dict[str, list] = {}
+        self._seq = itertools.count()
+        self._dead = 0
+        self._offset = 0.0 # Seconds
+        self._timeline = _Timeline()
+        self._durations: Dict[float, int] = {} # Queued entries per duration
+        self._longest = 0 # Longest queued duration: bounds the overlap search
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, task_id):
+        return task_id in self._index
+
+    def __iter__(self):
+        return iter(self.tasks())
+
+    @property
+    def offset(self) -> timedelta:
+        return timedelta(seconds=self._offset)
+
+    def push(self, task, duration: int = 0):
+        """Queue a task by its scheduled_time. Re-pushing an id replaces it."""
+        self.remove(task.id)
+        entry = [_RANK_NORMAL, task.scheduled_ts - self._offset, next(self._seq), task, self._offset, duration]
+        self._insert(entry)
+
+    def push_front(self, task, duration: int = 0):
+        """Queue a task ahead of everything else (interrupted schedule)."""
+        self.remove(task.id)
+        # Negative seq keeps the most recently interrupted task first (LIFO)
+        entry = [_RANK_HEAD, task.scheduled_ts - self._offset, -next(self._seq), task, self._offset, duration]
+        self._insert(entry)
+
+    def remove(self, task_id: str):
+        """Cancel a queued task. Returns the task, or None if not queued."""
+        entry = self._index.pop(task_id, None)
+        if entry is None:
+            return None
+        task = self._materialize(entry)
+        self._timeline.remove(entry)
+        self._forget(entry)
+        entry[_TASK] = None
+        self._dead += 1
+        self._maybe_compact()
+        return task
+
+    def get(self, task_id: str):
+        """The queued task with this id, or None."""
+        entry = self._index.get(task_id)
+        return self._materialize(entry) if entry is not None else None
+
+    def peek(self):
+        """Returns the next task to run without removing it."""
+        self._drop_dead_head()
+        return self._materialize(self._heap[0]) if self._heap else None
+
+    def pop_due(self, now: datetime):
+        """Pops the head task if it is due (or was interrupted), else None."""
+        self._drop_dead_head()
+        if not self._heap:
+            return None
+        head = self._heap[0]
+        if head[0] != _RANK_HEAD and head[_KEY] > now.timestamp() - self._offset:
+            return None
+        heapq.heappop(self._heap)
+        task = self._materialize(head)
+        del self._index[task.id]
+        self._timeline.remove(head)
+        self._forget(head)
+        return task
+
+    def shift(self, duration: timedelta):
+        """Delays every queued task by duration in O(1)."""
+        self._offset += duration.total_seconds()
+
+    def overlapping(self, start: float, end: float) -> List[Tuple[object, float, float]]:
+        """
+        (task, start, end) for the tasks whose [start, start + duration)
+        intersects [start, end), in start order (epoch seconds, shift
+        applied). O(log n) plus the entries that may reach into the interval.
+        """
+        return _overlapping(self._timeline, self._offset, self._longest, start, end)
+
+    def view(self) -> QueueView:
+        """Frozen view for queries off the lock (O(n / _CHUNK) to take)."""
+        return QueueView(self._timeline.view(), self._offset, self._longest)
+
+    def tasks(self) -> List:
+        """Returns the live tasks in run order (O(n log n), for listing only)."""
+        return [self._materialize(e) for e in sorted(self._index.values(), key=lambda e: e[:3])]
+
+    def stale_within(self, until: datetime) -> List[Tuple[str, datetime]]:
+        """
+        Returns (id, scheduled_time) for tasks due by `until` whose persisted
+        time predates the latest shift. Visits only the matching entries.
+        """
+        return [(e[_TASK].id, datetime.fromtimestamp(e[_KEY] + self._offset))
+                for e in self._walk(until) if e[_SYNCED] != self._offset]
+
+    def mark_synced(self, task_ids, offset: timedelta):
+        """Records that task_ids were persisted as of the given offset."""
+        offset = offset.total_seconds()
+        for task_id in task_ids:
+            entry = self._index.get(task_id)
+            if entry is not None:
+                entry[_SYNCED] = offset
+
+    # --- INTERNAL ---
+    def _insert(self, entry):
+        self._index[entry[_TASK].id] = entry
+        heapq.heappush(self._heap, entry)
+        self._timeline.insert(entry)
+        duration = entry[_DURATION]
+        self._durations[duration] = self._durations.get(duration, 0) + 1
+        self._longest = max(self._longest, duration)
+
+    def _forget(self, entry):
+        # The overlap bound shrinks back once its longest entries leave
+        duration = entry[_DURATION]
+        left = self._durations[duration] - 1
+        if left:
+            self._durations[duration] = left
+            return
+        del self._durations[duration]
+        if duration == self._longest:
+            self._longest = max(self._durations, default=0)
+
+    def _materialize(self, entry):
+        # Bring the task's own scheduled_time up to date with the offset
+        task = entry[_TASK]
+        task.scheduled_ts = entry[_KEY] + self._offset
+        return task
+
+    def _walk(self, until: datetime):
+        """Yields live entries due by `until`, pruning subtrees past it."""
+        heap = self._heap
+        limit = until.timestamp() - self._offset
+        stack = [0] if heap else []
+        while stack:
+            i = stack.pop()
+            entry = heap[i]
+            # Children of a normal entry are normal entries with larger keys
+            if entry[0] == _RANK_NORMAL and entry[_KEY] > limit:
+                continue
+            if entry[_TASK] is not None:
+                yield entry
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    stack.append(child)
+
+    def _drop_dead_head(self):
+        heap = self._heap
+        while heap and heap[0][_TASK] is None:
+            heapq.heappop(heap)
+            self._dead -= 1
+
+    def _maybe_compact(self):
+        # Rebuild once tombstones outnumber live entries (amortised O(1))
+        if self._dead > 64 and self._dead > len(self._index):
+            self._heap = [e for e in self._heap if e[_TASK] is not None]
+            heapq.heapify(self._heap)
+            self._dead = 0
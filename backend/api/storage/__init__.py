@@ -0,0 +1,20 @@
+import os
+from api.storage.base import Store, NotFoundError
+
+# 'firestore' (default) or 'sqlite'
+STORAGE_BACKEND = os.getenv("PA_STORAGE_BACKEND", "firestore").lower()
+
+
+def create_store(backend: str = STORAGE_BACKEND) -> Store:
+    """Builds the Store selected by PA_STORAGE_BACKEND."""
+    if backend == "sqlite":
+        from api.storage.sqlite import SqliteStore, DEFAULT_PATH
+        return SqliteStore(os.getenv("PA_SQLITE_PATH", DEFAULT_PATH))
+    if backend == "firestore":
+        from api.storage.firestore import FirestoreStore
+        return FirestoreStore()
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+# Global Instance
+store = create_store()
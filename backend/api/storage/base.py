@@ -0,0 +1,238 @@
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+# Collection names (shared by every backend)
+SCHEDULES = "schedules"
+LOGS = "logs"
+EMERGENCY = "emergency"
+EMERGENCY_HISTORY = "emergency/status/history" # Subcollection of the status doc
+SYSTEM = "system"
+USERS = "users"
+LEASES = "leases"
+
+
+class NotFoundError(Exception):
+    """Raised when updating a document that does not exist."""
+
+
+def lease_available(lease: Optional[dict], holder: str, now: float) -> bool:
+    """True if `holder` may take or renew `lease` at epoch time `now`."""
+    return not lease or lease.get("holder") == holder or lease.get("expires_at", 0) <= now
+
+
+class Store:
+    """
+    Storage repository used by the controller and every route.
+
+    Backends implement the document primitives (get/set/update/add/delete/
+    stream/update_many) plus the few ordered queries; the entity methods
+    below are shared so routes never touch a backend client directly.
+    """
+
+    # --- PRIMITIVES (implemented per backend) ---
+    def get(self, collection: str, doc_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def set(self, collection: str, doc_id: str, data: dict, merge: bool = False):
+        raise NotImplementedError
+
+    def update(self, collection: str, doc_id: str, fields: dict):
+        """Updates fields of an existing document. Raises NotFoundError."""
+        raise NotImplementedError
+
+    def add(self, collection: str, data: dict) -> str:
+        """Creates a document with a generated id and returns the id."""
+        raise NotImplementedError
+
+    def delete(self, collection: str, doc_id: str):
+        raise NotImplementedError
+
+    def stream(self, collection: str) -> Iterator[Tuple[str, dict]]:
+        """Yields (doc_id, data) for every document in the collection."""
+        raise NotImplementedError
+
+    def update_many(self, collection: str, updates: List[Tuple[str, dict]]):
+        """
+        Applies (doc_id, fields) updates in one batch.
+        Raises NotFoundError if any document is missing.
+        """
+        raise NotImplementedError
+
+    def delete_many(self, collection: str, doc_ids: List[str]):
+        """Deletes documents in batches (missing ids are ignored)."""
+        raise NotImplementedError
+
+    def set_many(self, collection: str, docs: List[Tuple[str, dict]]):
+        """Writes (doc_id, data) documents in one batch (create or overwrite)."""
+        raise NotImplementedError
+
+    def server_timestamp(self):
+        """Value stored as a write-time timestamp."""
+        raise NotImplementedError
+
+    def acquire_lease(self, name: str, holder: str, ttl: float, info: Optional[dict] = None) -> bool:
+        """
+        Atomically takes or renews the lease `name` for `holder` for `ttl`
+        seconds. Fails (False) while another holder's lease is unexpired.
+        `info` is stored alongside (e.g. the holder's address).
+        """
+        raise NotImplementedError
+
+    def release_lease(self, name: str, holder: str):
+        """Drops the lease if (and only if) `holder` still owns it."""
+        raise NotImplementedError
+
+    # --- QUERIES (implemented per backend) ---
+    def query_collection(self,
+                         collection: str,
+                         fields: Optional[List[str]] = None,
+                         limit: Optional[int] = None,
+                         start_after: Optional[str] = None) -> Tuple[List[Tuple[str, dict]], Optional[str]]:
+        """
+        One page of (doc_id, data) ordered by document id.
+        `fields` projects each document onto those top-level fields (missing
+        ones are omitted); None returns whole documents. start_after is the
+        last id of the previous page. Returns (docs, next_cursor); next_cursor
+        is None on the last page or when limit is None.
+        """
+        raise NotImplementedError
+
+    def query_logs(self,
+                   limit: int = 50,
+                   start_after: Optional[str] = None,
+                   type: Optional[str] = None,
+                   user: Optional[str] = None,
+                   action: Optional[str] = None,
+                   since: Optional[datetime] = None,
+                   until: Optional[datetime] = None) -> Tuple[List[dict], Optional[str]]:
+        """
+        One page of logs, newest first, each with its "id".
+        Equality filters on type/user/action and a timestamp range are applied
+        server-side. start_after is the id of the last log of the previous page.
+        Returns (logs, next_cursor); next_cursor is None on the last page.
+        """
+        raise NotImplementedError
+
+    def iter_pending_schedules(self, start_date: str, end_date: str) -> Iterator[dict]:
+        """
+        Streams schedules with status 'Pending' and start_date <= date < end_date
+        (YYYY-MM-DD strings), each with its "id".
+        """
+        raise NotImplementedError
+
+    def iter_pending_rules(self) -> Iterator[dict]:
+        """
+        Streams recurring rules (schedules with an anchor_date) with status
+        'Pending', whatever their date, each with its "id".
+        """
+        raise NotImplementedError
+
+    def query_emergency_history(self,
+                                limit: Optional[int] = None,
+                                user: Optional[str] = None,
+                                fields: Optional[List[str]] = None) -> List[dict]:
+        """
+        Emergency history entries, newest first, each with its "id".
+        Optionally filtered by user and projected onto `fields`.
+        """
+        raise NotImplementedError
+
+    # --- SCHEDULES ---
+    def list_schedules(self) -> List[dict]:
+        return [dict(data, id=doc_id) for doc_id, data in self.stream(SCHEDULES)]
+
+    def page_schedules(self, fields: Optional[List[str]] = None, limit: Optional[int] = None,
+                       start_after: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        docs, cursor = self.query_collection(SCHEDULES, fields, limit, start_after)
+        return [dict(data, id=doc_id) for doc_id, data in docs], cursor
+
+    def get_schedule(self, schedule_id: str) -> Optional[dict]:
+        return self.get(SCHEDULES, schedule_id)
+
+    def add_schedule(self, data: dict) -> str:
+        return self.add(SCHEDULES, data)
+
+    def add_schedules(self, entries: List[Tuple[str, dict]]):
+        """Writes (schedule_id, data) pairs with caller-generated ids in batches."""
+        self.set_many(SCHEDULES, entries)
+
+    def set_schedule(self, schedule_id: str, data: dict, merge: bool = False):
+        self.set(SCHEDULES, schedule_id, data, merge=merge)
+
+    def update_schedule(self, schedule_id: str, fields: dict):
+        self.update(SCHEDULES, schedule_id, fields)
+
+    def update_schedules(self, updates: List[Tuple[str, dict]]):
+        self.update_many(SCHEDULES, updates)
+
+    def delete_schedule(self, schedule_id: str):
+        self.delete(SCHEDULES, schedule_id)
+
+    def delete_schedules(self, schedule_ids: List[str]):
+        self.delete_many(SCHEDULES, schedule_ids)
+
+    # --- LOGS ---
+    def add_log(self, entry: dict) -> str:
+        return self.add(LOGS, entry)
+
+    def add_logs(self, entries: List[Tuple[str, dict]]):
+        """Writes (log_id, entry) pairs with caller-generated ids in one batch."""
+        self.set_many(LOGS, entries)
+
+    def get_log(self, log_id: str) -> Optional[dict]:
+        return self.get(LOGS, log_id)
+
+    def update_log(self, log_id: str, fields: dict):
+        self.update(LOGS, log_id, fields)
+
+    def delete_log(self, log_id: str):
+        self.delete(LOGS, log_id)
+
+    # --- EMERGENCY ---
+    def get_emergency_status(self) -> Optional[dict]:
+        return self.get(EMERGENCY, "status")
+
+    def set_emergency_status(self, data: dict):
+        self.set(EMERGENCY, "status", data)
+
+    def update_emergency_status(self, fields: dict):
+        self.update(EMERGENCY, "status", fields)
+
+    def add_emergency_event(self, entry: dict) -> str:
+        return self.add(EMERGENCY_HISTORY, entry)
+
+    def update_emergency_event(self, event_id: str, fields: dict):
+        self.update(EMERGENCY_HISTORY, event_id, fields)
+
+    def clear_emergency_history(self, user: Optional[str] = None):
+        ids = [e["id"] for e in self.query_emergency_history(user=user, fields=[])]
+        self.delete_many(EMERGENCY_HISTORY, ids)
+
+    # --- SYSTEM STATE ---
+    def set_system_state(self, data: dict):
+        self.set(SYSTEM, "state", data)
+
+    def get_lease(self, name: str) -> Optional[dict]:
+        """The current lease document (holder, expires_at, info), expired or not."""
+        return self.get(LEASES, name)
+
+    # --- USERS ---
+    def list_users(self) -> List[dict]:
+        return [dict(data, uid=doc_id) for doc_id, data in self.stream(USERS)]
+
+    def page_users(self, fields: Optional[List[str]] = None, limit: Optional[int] = None,
+                   start_after: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        docs, cursor = self.query_collection(USERS, fields, limit, start_after)
+        return [dict(data, uid=doc_id) for doc_id, data in docs], cursor
+
+    def get_user(self, uid: str) -> Optional[dict]:
+        return self.get(USERS, uid)
+
+    def set_user(self, uid: str, data: dict):
+        self.set(USERS, uid, data)
+
+    def update_user(self, uid: str, fields: dict):
+        self.update(USERS, uid, fields)
+
+    def delete_user(self, uid: str):
+        self.delete(USERS, uid)
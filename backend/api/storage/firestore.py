@@ -0,0 +1,181 @@
+import time
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from firebase_admin import firestore
+from google.api_core.exceptions import NotFound
+from google.cloud.firestore_v1.base_query import FieldFilter
+from google.cloud.firestore_v1.field_path import FieldPath
+from api.storage.base import Store, NotFoundError, lease_available, LEASES, LOGS, SCHEDULES, EMERGENCY_HISTORY
+
+BATCH_SIZE = 400 # Firestore limit is 500 writes per batch
+
+
+class FirestoreStore(Store):
+    """Store backed by Cloud Firestore (the production default)."""
+
+    def __init__(self):
+        # Imported here: firebaseConfig raises if serviceAccountKey.json is missing
+        from api.firebaseConfig import db
+        self._db = db
+
+    def get(self, collection: str, doc_id: str) -> Optional[dict]:
+        doc = self._db.collection(collection).document(doc_id).get()
+        return doc.to_dict() if doc.exists else None
+
+    def set(self, collection: str, doc_id: str, data: dict, merge: bool = False):
+        self._db.collection(collection).document(doc_id).set(data, merge=merge)
+
+    def update(self, collection: str, doc_id: str, fields: dict):
+        try:
+            self._db.collection(collection).document(doc_id).update(fields)
+        except NotFound as e:
+            raise NotFoundError(f"{collection}/{doc_id}") from e
+
+    def add(self, collection: str, data: dict) -> str:
+        _, doc_ref = self._db.collection(collection).add(data)
+        return doc_ref.id
+
+    def delete(self, collection: str, doc_id: str):
+        self._db.collection(collection).document(doc_id).delete()
+
+    def stream(self, collection: str) -> Iterator[Tuple[str, dict]]:
+        for doc in self._db.collection(collection).stream():
+            yield doc.id, doc.to_dict()
+
+    def update_many(self, collection: str, updates: List[Tuple[str, dict]]):
+        ref = self._db.collection(collection)
+        for i in range(0, len(updates), BATCH_SIZE):
+            batch = self._db.batch()
+            for doc_id, fields in updates[i:i + BATCH_SIZE]:
+                batch.update(ref.document(doc_id), fields)
+            try:
+                batch.commit()
+            except NotFound as e:
+                raise NotFoundError(str(e)) from e
+
+    def delete_many(self, collection: str, doc_ids: List[str]):
+        ref = self._db.collection(collection)
+        for i in range(0, len(doc_ids), BATCH_SIZE):
+            batch = self._db.batch()
+            for doc_id in doc_ids[i:i + BATCH_SIZE]:
+                batch.delete(ref.document(doc_id))
+            batch.commit()
+
+    def set_many(self, collection: str, docs: List[Tuple[str, dict]]):
+        ref = self._db.collection(collection)
+        for i in range(0, len(docs), BATCH_SIZE):
+            batch = self._db.batch()
+            for doc_id, data in docs[i:i + BATCH_SIZE]:
+                batch.set(ref.document(doc_id), data)
+            batch.commit()
+
+    def server_timestamp(self):
+        return firestore.SERVER_TIMESTAMP
+
+    def acquire_lease(self, name: str, holder: str, ttl: float, info: Optional[dict] = None) -> bool:
+        ref = self._db.collection(LEASES).document(name)
+
+        @firestore.transactional
+        def attempt(transaction):
+            doc = ref.get(transaction=transaction)
+            now = time.time()
+            if not lease_available(doc.to_dict() if doc.exists else None, holder, now):
+                return False
+            transaction.set(ref, dict(info or {}, holder=holder, expires_at=now + ttl))
+            return True
+
+        return attempt(self._db.transaction())
+
+    def release_lease(self, name: str, holder: str):
+        ref = self._db.collection(LEASES).document(name)
+
+        @firestore.transactional
+        def attempt(transaction):
+            doc = ref.get(transaction=transaction)
+            if doc.exists and doc.to_dict().get("holder") == holder:
+                transaction.delete(ref)
+
+        attempt(self._db.transaction())
+
+    def query_collection(self,
+                         collection: str,
+                         fields: Optional[List[str]] = None,
+                         limit: Optional[int] = None,
+                         start_after: Optional[str] = None) -> Tuple[List[Tuple[str, dict]], Optional[str]]:
+        query = self._db.collection(collection)
+        if fields is not None:
+            # Field mask: only the selected fields leave Firestore
+            query = query.select(fields)
+        query = query.order_by(FieldPath.document_id())
+        if start_after:
+            # A bare id is accepted as the document-id cursor (no extra read)
+            query = query.start_after({FieldPath.document_id(): start_after})
+        if limit is not None:
+            query = query.limit(limit)
+
+        docs = [(doc.id, doc.to_dict() or {}) for doc in query.stream()]
+        next_cursor = docs[-1][0] if limit is not None and len(docs) == limit else None
+        return docs, next_cursor
+
+    def query_logs(self,
+                   limit: int = 50,
+                   start_after: Optional[str] = None,
+                   type: Optional[str] = None,
+                   user: Optional[str] = None,
+                   action: Optional[str] = None,
+                   since: Optional[datetime] = None,
+                   until: Optional[datetime] = None) -> Tuple[List[dict], Optional[str]]:
+        # Backed by the composite indexes in firestore.indexes.json
+        ref = self._db.collection(LOGS)
+        query = ref
+        for field, value in (("type", type), ("user", user), ("action", action)):
+            if value is not None:
+                query = query.where(filter=FieldFilter(field, "==", value))
+        if since is not None:
+            query = query.where(filter=FieldFilter("timestamp", ">=", since))
+        if until is not None:
+            query = query.where(filter=FieldFilter("timestamp", "<", until))
+        query = query.order_by("timestamp", direction=firestore.Query.DESCENDING)
+
+        if start_after:
+            cursor = ref.document(start_after).get()
+            if cursor.exists:
+                query = query.start_after(cursor)
+
+        docs = list(query.limit(limit).stream())
+        logs = [dict(doc.to_dict(), id=doc.id) for doc in docs]
+        next_cursor = docs[-1].id if len(docs) == limit else None
+        return logs, next_cursor
+
+    def query_emergency_history(self,
+                                limit: Optional[int] = None,
+                                user: Optional[str] = None,
+                                fields: Optional[List[str]] = None) -> List[dict]:
+        # Backed by the (user, timestamp) composite index in firestore.indexes.json
+        query = self._db.collection(EMERGENCY_HISTORY)
+        if user is not None:
+            query = query.where(filter=FieldFilter("user", "==", user))
+        if fields is not None:
+            query = query.select(fields)
+        query = query.order_by("timestamp", direction=firestore.Query.DESCENDING)
+        if limit is not None:
+            query = query.limit(limit)
+        return [dict(doc.to_dict() or {}, id=doc.id) for doc in query.stream()]
+
+    def iter_pending_schedules(self, start_date: str, end_date: str) -> Iterator[dict]:
+        # Backed by the (status, date) composite index in firestore.indexes.json
+        query = self._db.collection(SCHEDULES) \
+            .where(filter=FieldFilter("status", "==", "Pending")) \
+            .where(filter=FieldFilter("date", ">=", start_date)) \
+            .where(filter=FieldFilter("date", "<", end_date))
+        for doc in query.stream():
+            yield dict(doc.to_dict(), id=doc.id)
+
+    def iter_pending_rules(self) -> Iterator[dict]:
+        # Backed by the (status, anchor_date) composite index in firestore.indexes.json;
+        # the range filter also skips documents without an anchor_date
+        query = self._db.collection(SCHEDULES) \
+            .where(filter=FieldFilter("status", "==", "Pending")) \
+            .where(filter=FieldFilter("anchor_date", ">", ""))
+        for doc in query.stream():
+            yield dict(doc.to_dict(), id=doc.id)
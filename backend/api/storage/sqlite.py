@@ -0,0 +1,268 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Tuple
+from api.storage.base import Store, NotFoundError, lease_available, LEASES, LOGS, SCHEDULES, EMERGENCY_HISTORY
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "pa.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT NOT NULL,
+    id         TEXT NOT NULL,
+    data       TEXT NOT NULL,
+    PRIMARY KEY (collection, id)
+);
+CREATE INDEX IF NOT EXISTS idx_documents_timestamp
+    ON documents (collection, json_extract(data, '$.timestamp'), id);
+CREATE INDEX IF NOT EXISTS idx_logs_type
+    ON documents (collection, json_extract(data, '$.type'), json_extract(data, '$.timestamp'));
+CREATE INDEX IF NOT EXISTS idx_logs_user
+    ON documents (collection, json_extract(data, '$.user'), json_extract(data, '$.timestamp'));
+CREATE INDEX IF NOT EXISTS idx_logs_action
+    ON documents (collection, json_extract(data, '$.action'), json_extract(data, '$.timestamp'));
+CREATE INDEX IF NOT EXISTS idx_schedules_pending
+    ON documents (collection, json_extract(data, '$.status'), json_extract(data, '$.date'));
+"""
+
+
+def _iso(value: datetime) -> str:
+    # Stored timestamps are UTC ISO-8601; naive inputs are taken as local time
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _encode(data: dict) -> str:
+    # Timestamps are stored as ISO-8601 strings (they sort chronologically)
+    return json.dumps(data, default=lambda o: o.isoformat() if hasattr(o, "isoformat") else str(o))
+
+
+class SqliteStore(Store):
+    """
+    Local Store backed by a single SQLite file in WAL mode.
+
+    Documents are kept as JSON per (collection, id), mirroring Firestore, so
+    the same entity methods work offline, in load tests and on sites with
+    no cloud dependency. Pass ":memory:" for a throwaway store.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get(self, collection: str, doc_id: str) -> Optional[dict]:
+        rows = self._query("SELECT data FROM documents WHERE collection = ? AND id = ?", (collection, doc_id))
+        return json.loads(rows[0][0]) if rows else None
+
+    def set(self, collection: str, doc_id: str, data: dict, merge: bool = False):
+        with self._lock:
+            if merge:
+                existing = self.get(collection, doc_id) or {}
+                existing.update(data)
+                data = existing
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (collection, id, data) VALUES (?, ?, ?)",
+                (collection, doc_id, _encode(data))
+            )
+
+    def update(self, collection: str, doc_id: str, fields: dict):
+        with self._lock:
+            existing = self.get(collection, doc_id)
+            if existing is None:
+                raise NotFoundError(f"{collection}/{doc_id}")
+            existing.update(fields)
+            self._conn.execute(
+                "UPDATE documents SET data = ? WHERE collection = ? AND id = ?",
+                (_encode(existing), collection, doc_id)
+            )
+
+    def add(self, collection: str, data: dict) -> str:
+        doc_id = uuid.uuid4().hex[:20]
+        self.set(collection, doc_id, data)
+        return doc_id
+
+    def delete(self, collection: str, doc_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM documents WHERE collection = ? AND id = ?", (collection, doc_id))
+
+    def stream(self, collection: str) -> Iterator[Tuple[str, dict]]:
+        for doc_id, data in self._query("SELECT id, data FROM documents WHERE collection = ?", (collection,)):
+            yield doc_id, json.loads(data)
+
+    def update_many(self, collection: str, updates: List[Tuple[str, dict]]):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for doc_id, fields in updates:
+                    self.update(collection, doc_id, fields)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def delete_many(self, collection: str, doc_ids: List[str]):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "DELETE FROM documents WHERE collection = ? AND id = ?",
+                    [(collection, doc_id) for doc_id in doc_ids]
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def set_many(self, collection: str, docs: List[Tuple[str, dict]]):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO documents (collection, id, data) VALUES (?, ?, ?)",
+                    [(collection, doc_id, _encode(data)) for doc_id, data in docs]
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def server_timestamp(self):
+        return datetime.now(timezone.utc)
+
+    def acquire_lease(self, name: str, holder: str, ttl: float, info: Optional[dict] = None) -> bool:
+        with self._lock:
+            # IMMEDIATE takes the database write lock up front, so competing
+            # processes sharing the file serialize on the read-check-write
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                if not lease_available(self.get(LEASES, name), holder, now):
+                    self._conn.execute("ROLLBACK")
+                    return False
+                self.set(LEASES, name, dict(info or {}, holder=holder, expires_at=now + ttl))
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return True
+
+    def release_lease(self, name: str, holder: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM documents WHERE collection = ? AND id = ? AND json_extract(data, '$.holder') = ?",
+                (LEASES, name, holder)
+            )
+
+    def query_collection(self,
+                         collection: str,
+                         fields: Optional[List[str]] = None,
+                         limit: Optional[int] = None,
+                         start_after: Optional[str] = None) -> Tuple[List[Tuple[str, dict]], Optional[str]]:
+        where, params = ["collection = ?"], [collection]
+        if start_after:
+            where.append("id > ?")
+            params.append(start_after)
+        sql = f"SELECT id, data FROM documents WHERE {' AND '.join(where)} ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        docs = []
+        for doc_id, data in self._query(sql, params):
+            data = json.loads(data)
+            if fields is not None:
+                data = {f: data[f] for f in fields if f in data}
+            docs.append((doc_id, data))
+        next_cursor = docs[-1][0] if limit is not None and len(docs) == limit else None
+        return docs, next_cursor
+
+    def query_logs(self,
+                   limit: int = 50,
+                   start_after: Optional[str] = None,
+                   type: Optional[str] = None,
+                   user: Optional[str] = None,
+                   action: Optional[str] = None,
+                   since: Optional[datetime] = None,
+                   until: Optional[datetime] = None) -> Tuple[List[dict], Optional[str]]:
+        ts = "json_extract(data, '$.timestamp')"
+        where, params = ["collection = ?"], [LOGS]
+        for field, value in (("type", type), ("user", user), ("action", action)):
+            if value is not None:
+                where.append(f"json_extract(data, '$.{field}') = ?")
+                params.append(value)
+        if since is not None:
+            where.append(f"{ts} >= ?")
+            params.append(_iso(since))
+        if until is not None:
+            where.append(f"{ts} < ?")
+            params.append(_iso(until))
+
+        # Keyset pagination on (timestamp, id) so pages never overlap
+        if start_after:
+            cursor = self.get(LOGS, start_after)
+            if cursor is not None:
+                where.append(f"({ts} < ? OR ({ts} = ? AND id < ?))")
+                params += [cursor.get("timestamp"), cursor.get("timestamp"), start_after]
+
+        rows = self._query(
+            f"SELECT id, data FROM documents WHERE {' AND '.join(where)} "
+            f"ORDER BY {ts} DESC, id DESC LIMIT ?",
+            params + [limit]
+        )
+        logs = [dict(json.loads(data), id=doc_id) for doc_id, data in rows]
+        next_cursor = rows[-1][0] if len(rows) == limit else None
+        return logs, next_cursor
+
+    def query_emergency_history(self,
+                                limit: Optional[int] = None,
+                                user: Optional[str] = None,
+                                fields: Optional[List[str]] = None) -> List[dict]:
+        where, params = ["collection = ?"], [EMERGENCY_HISTORY]
+        if user is not None:
+            where.append("json_extract(data, '$.user') = ?")
+            params.append(user)
+        sql = (f"SELECT id, data FROM documents WHERE {' AND '.join(where)} "
+               f"ORDER BY json_extract(data, '$.timestamp') DESC, id DESC")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        history = []
+        for doc_id, data in self._query(sql, params):
+            data = json.loads(data)
+            if fields is not None:
+                data = {f: data[f] for f in fields if f in data}
+            history.append(dict(data, id=doc_id))
+        return history
+
+    def iter_pending_schedules(self, start_date: str, end_date: str) -> Iterator[dict]:
+        rows = self._query(
+            "SELECT id, data FROM documents WHERE collection = ? "
+            "AND json_extract(data, '$.status') = 'Pending' "
+            "AND json_extract(data, '$.date') >= ? AND json_extract(data, '$.date') < ?",
+            (SCHEDULES, start_date, end_date)
+        )
+        for doc_id, data in rows:
+            yield dict(json.loads(data), id=doc_id)
+
+    def iter_pending_rules(self) -> Iterator[dict]:
+        rows = self._query(
+            "SELECT id, data FROM documents WHERE collection = ? "
+            "AND json_extract(data, '$.status') = 'Pending' "
+            "AND json_extract(data, '$.anchor_date') IS NOT NULL",
+            (SCHEDULES,)
+        )
+        for doc_id, data in rows:
+            yield dict(json.loads(data), id=doc_id)
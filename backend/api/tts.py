@@ -0,0 +1,258 @@
+import hashlib
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from api.blobstore import blobs, DEFAULT_ROOT
+from api.metrics import metrics
+
+# Offline engine: the espeak-ng (or espeak) command line. Without one, text
+# announcements fall back to the browser's speechSynthesis.
+TTS_COMMAND = os.getenv("PA_TTS_COMMAND") or shutil.which("espeak-ng") or shutil.which("espeak")
+TTS_VOICE = os.getenv("PA_TTS_VOICE", "en")
+TTS_RATE = int(os.getenv("PA_TTS_RATE", "160"))  # Words per minute (~0.9x the browser default)
+TTS_TIMEOUT = float(os.getenv("PA_TTS_TIMEOUT", "30"))
+MAX_TEXT_CHARS = int(os.getenv("PA_TTS_MAX_CHARS", "2000"))
+INDEX_DIR = os.getenv("PA_TTS_DIR", os.path.join(os.path.dirname(DEFAULT_ROOT), "tts"))
+MEMORY_ENTRIES = 4096  # In-memory LRU of key -> blob hash
+MAX_ENTRIES = int(os.getenv("PA_TTS_MAX_ENTRIES", "2000"))  # Renders kept on disk (LRU, audio included)
+PRERENDER_BACKLOG = 10000
+
+
+class SpeechUnavailable(RuntimeError):
+    """No offline TTS engine is installed (or it failed to render)."""
+
+
+class EspeakEngine:
+    """Renders WAV audio by running the espeak-ng / espeak command line."""
+
+    content_type = "audio/wav"
+
+    def __init__(self, command: Optional[str] = TTS_COMMAND):
+        self.command = command
+
+    @property
+    def available(self) -> bool:
+        return bool(self.command)
+
+    def render(self, text: str, voice: str, rate: int) -> bytes:
+        if not self.command:
+            raise SpeechUnavailable("No TTS engine installed (espeak-ng or espeak)")
+        # Text on stdin: never parsed as options, no argv length limit
+        try:
+            result = subprocess.run(
+                [self.command, "-v", voice, "-s", str(rate), "--stdin", "--stdout"],
+                input=text.encode("utf-8"), capture_output=True, timeout=TTS_TIMEOUT
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise SpeechUnavailable(f"TTS engine failed: {e}") from e
+        if result.returncode != 0 or not result.stdout:
+            raise SpeechUnavailable(f"TTS engine failed: {result.stderr.decode(errors='replace').strip()}")
+        return result.stdout
+
+
+class SpeechCache:
+    """
+    Rendered speech keyed by (text, voice, rate).
+
+    The audio itself goes to the blob store (deduplicated, and served with
+    Range/ETag support by GET /audio/{hash}). A small on-disk index maps
+    each key to its blob so renders survive restarts and are shared by the
+    workers of a host; an in-memory LRU fronts the index. Index files are
+    touched on use, and past `max_entries` the least recently used renders
+    are evicted together with their blobs.
+    """
+
+    def __init__(self, index_dir: str = INDEX_DIR, maxsize: int = MEMORY_ENTRIES,
+                 max_entries: int = MAX_ENTRIES):
+        self.index_dir = index_dir
+        self.maxsize = maxsize
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(index_dir, exist_ok=True)
+
+    def __contains__(self, key: str) -> bool:
+        """Whether `key` is in the memory LRU (no disk access)."""
+        return key in self._memory
+
+    @staticmethod
+    def key(text: str, voice: str, rate: int) -> str:
+        return hashlib.sha256(f"{voice}\0{rate}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Blob hash of a cached render, or None."""
+        path = os.path.join(self.index_dir, key)
+        with self._lock:
+            blob_hash = self._memory.get(key)
+            if blob_hash is not None:
+                self._memory.move_to_end(key)
+        if blob_hash is None:
+            try:
+                with open(path) as f:
+                    blob_hash = f.read().strip()
+            except OSError:
+                return None
+        if not blobs.exists(blob_hash):
+            # Evicted (possibly by another worker) or blob store wiped: render again
+            with self._lock:
+                self._memory.pop(key, None)
+            return None
+        try:
+            os.utime(path) # Recency shared with the other workers
+        except OSError:
+            pass
+        self._remember(key, blob_hash)
+        return blob_hash
+
+    def put(self, key: str, blob_hash: str):
+        fd, tmp = tempfile.mkstemp(dir=self.index_dir)
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(blob_hash)
+            os.replace(tmp, os.path.join(self.index_dir, key))
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._remember(key, blob_hash)
+        self._evict()
+
+    def _evict(self):
+        """Removes the least recently used renders beyond max_entries, blobs included."""
+        entries = []
+        with os.scandir(self.index_dir) as it:
+            for entry in it:
+                if len(entry.name) != 64: # Skip in-flight temp files
+                    continue
+                try:
+                    entries.append((entry.stat().st_mtime, entry.name))
+                except OSError:
+                    pass
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, key in entries[:len(entries) - self.max_entries]:
+            path = os.path.join(self.index_dir, key)
+            try:
+                with open(path) as f:
+                    blob_hash = f.read().strip()
+                os.remove(path)
+            except OSError:
+                continue # Already evicted by another worker
+            with self._lock:
+                self._memory.pop(key, None)
+            if blobs.is_hash(blob_hash):
+                blobs.delete(blob_hash)
+            metrics.inc("tts.evictions")
+
+    def _remember(self, key: str, blob_hash: str):
+        with self._lock:
+            self._memory[key] = blob_hash
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+
+class TextToSpeech:
+    """
+    Server-side speech for text announcements: each distinct (text, voice,
+    rate) is synthesized once and then served from the cache to every
+    endpoint. Schedules are pre-rendered by a background thread when the
+    controller queues them, so playback normally finds the audio ready.
+    """
+
+    def __init__(self, engine: EspeakEngine, cache: SpeechCache):
+        self.engine = engine
+        self.cache = cache
+        self._rendering = {}  # key -> Event, so concurrent requests share one synthesis
+        self._lock = threading.Lock()
+        self._backlog = queue.Queue(maxsize=PRERENDER_BACKLOG)
+        self._queued = set()
+        threading.Thread(target=self._prerender_loop, daemon=True).start()
+
+    @property
+    def available(self) -> bool:
+        return self.engine.available
+
+    def _params(self, text: str, voice: Optional[str], rate: Optional[int]) -> Tuple[str, str, int]:
+        text = " ".join((text or "").split())
+        if not text:
+            raise ValueError("Nothing to speak")
+        if len(text) > MAX_TEXT_CHARS:
+            raise ValueError(f"Text too long (limit {MAX_TEXT_CHARS} characters)")
+        return text, voice or TTS_VOICE, int(rate or TTS_RATE)
+
+    def speech_for(self, text: str, voice: Optional[str] = None, rate: Optional[int] = None) -> str:
+        """
+        Blob hash of the spoken text, synthesizing it on a cache miss.
+        Raises ValueError for unusable text, SpeechUnavailable without an engine.
+        """
+        text, voice, rate = self._params(text, voice, rate)
+        key = self.cache.key(text, voice, rate)
+        while True:
+            blob_hash = self.cache.get(key)
+            if blob_hash:
+                metrics.inc("tts.hits")
+                return blob_hash
+            with self._lock:
+                pending = self._rendering.get(key)
+                if pending is None:
+                    self._rendering[key] = threading.Event()
+                    break
+            pending.wait(TTS_TIMEOUT) # Someone else is rendering it
+            if key not in self._rendering and self.cache.get(key) is None:
+                raise SpeechUnavailable("TTS render failed")
+
+        metrics.inc("tts.misses")
+        try:
+            began = time.perf_counter()
+            audio = self.engine.render(text, voice, rate)
+            blob_hash = blobs.put(audio, self.engine.content_type)
+            self.cache.put(key, blob_hash)
+            metrics.observe("tts.render_seconds", time.perf_counter() - began)
+            return blob_hash
+        finally:
+            with self._lock:
+                self._rendering.pop(key).set()
+
+    def prerender(self, text: str, voice: Optional[str] = None, rate: Optional[int] = None):
+        """Queues text for background synthesis. Never blocks (called under the controller lock)."""
+        if not self.available:
+            return
+        try:
+            params = self._params(text, voice, rate)
+        except ValueError:
+            return
+        key = self.cache.key(*params)
+        if key in self.cache:
+            return
+        with self._lock:
+            if key in self._queued or key in self._rendering:
+                return
+            try:
+                self._backlog.put_nowait(params)
+            except queue.Full:
+                metrics.inc("tts.prerender_dropped") # Rendered on demand instead
+                return
+            self._queued.add(key)
+
+    def _prerender_loop(self):
+        while True:
+            params = self._backlog.get()
+            try:
+                self.speech_for(*params)
+            except Exception as e:
+                print(f"[TTS] Pre-render failed: {e}")
+            finally:
+                with self._lock:
+                    self._queued.discard(self.cache.key(*params))
+
+
+# Global Instance
+speech = TextToSpeech(EspeakEngine(), SpeechCache())
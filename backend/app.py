@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.routes.auth import auth_router
@@ -6,8 +7,19 @@ from api.routes.scheduled import scheduled_announcements_router
 
 from api.routes.account import manage_account_router
 from api.routes.emergency import emergency_route
+from api.routes.events import events_router
+from api.routes.audio import audio_router
+from api.routes.tts import tts_router
+from api.metrics import metrics
+from api.controller import controller
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Only a serving app joins the controller election (and opens the control port)
+    controller.start()
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,16 +27,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
 
+@app.get("/metrics")
+def read_metrics():
+    return metrics.snapshot()
+
 
 app.include_router(auth_router)
 app.include_router(real_time_announcements_router)
 app.include_router(scheduled_announcements_router)
 app.include_router(manage_account_router)
 app.include_router(emergency_route)
-# app.include_router(audio_router) # Commented out as it was not in the original import list or might be optional
+app.include_router(events_router)
+app.include_router(audio_router)
+app.include_router(tts_router)
@@ -0,0 +1,57 @@
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Run offline against a pre-populated SQLite store
+os.environ.setdefault("PA_STORAGE_BACKEND", "sqlite")
+os.environ.setdefault("PA_SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "bootstrap.sqlite3"))
+os.environ.setdefault("PA_LEADER_ELECTION", "0")
+
+from api.storage.sqlite import SqliteStore
+
+SCHEDULES = 50000
+DAYS = 365 # Schedules are spread over a year; the window loads only the first days
+STATUSES = ["Pending"] * 8 + ["Completed", "Cancelled"]
+
+
+def populate(path: str):
+    seed = SqliteStore(path)
+    now = datetime.now()
+    seed._conn.execute("BEGIN")
+    for i in range(SCHEDULES):
+        when = now + timedelta(minutes=random.randint(1, DAYS * 24 * 60))
+        seed.set("schedules", f"sched-{i}", {
+            "message": f"Announcement {i}",
+            "date": when.strftime("%Y-%m-%d"),
+            "time": when.strftime("%H:%M"),
+            "repeat": "none",
+            "zones": "All Zones",
+            "status": random.choice(STATUSES),
+        })
+    seed._conn.execute("COMMIT")
+
+
+def main():
+    path = os.environ["PA_SQLITE_PATH"]
+    print(f"Populating {SCHEDULES} schedules...")
+    populate(path)
+
+    began = time.perf_counter()
+    from api.controller import controller, BOOTSTRAP_WINDOW
+    imported = time.perf_counter()
+    if not controller.bootstrapped.wait(timeout=30):
+        print("FAIL: first window was not loaded within 30s")
+        return
+    loaded = time.perf_counter()
+
+    print(f"Look-ahead window: {BOOTSTRAP_WINDOW.days} days")
+    print(f"Controller import:  {(imported - began) * 1000:.0f} ms")
+    print(f"First window ready: {(loaded - began) * 1000:.0f} ms")
+    print(f"Queued tasks:       {len(controller.get_queue())}")
+    print("PASS" if loaded - began < 1.0 else "FAIL: bootstrap took over a second")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import asyncio
+import contextlib
+import io
+import math
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Run offline against the SQLite store, one engine in this process
+os.environ.setdefault("PA_STORAGE_BACKEND", "sqlite")
+os.environ.setdefault("PA_SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "bench.sqlite3"))
+os.environ.setdefault("PA_LEADER_ELECTION", "0")
+
+import httpx
+
+from app import app
+from api.controller import controller
+from api.storage import store
+
+TIMETABLE_SIZE = 10000
+SEQUENTIAL_SAMPLE = 200  # One-by-one POSTs timed, then extrapolated to the timetable
+STORE_LATENCY = 0.02     # Simulated Firestore round trip (seconds)
+FIRESTORE_BATCH = 400    # Writes per batch commit (see storage/firestore.py)
+MAX_IMPORT_SECONDS = 10
+
+
+def inject_store_latency():
+    """One round trip per document add, one per committed batch."""
+    add, set_many = store.add, store.set_many
+
+    def slow_add(*args, **kwargs):
+        time.sleep(STORE_LATENCY)
+        return add(*args, **kwargs)
+
+    def slow_set_many(collection, docs):
+        time.sleep(STORE_LATENCY * math.ceil(len(docs) / FIRESTORE_BATCH))
+        return set_many(collection, docs)
+
+    store.add, store.set_many = slow_add, slow_set_many
+
+
+def timetable(count: int):
+    start = datetime.now() + timedelta(days=1)
+    for i in range(count):
+        when = start + timedelta(minutes=5 * i)
+        yield {
+            "message": f"Period {i % 8} bell",
+            "date": when.strftime("%Y-%m-%d"),
+            "time": when.strftime("%H:%M"),
+            "repeat": "weekdays" if i % 2 else "once",
+            "zones": "Main Hall,Library" if i % 3 else "All Zones",
+            "user": "bench@school.edu",
+        }
+
+
+def as_csv(rows) -> bytes:
+    lines = ["message,date,time,repeat,zones,user"]
+    for row in rows:
+        lines.append(f'{row["message"]},{row["date"]},{row["time"]},{row["repeat"]},"{row["zones"]}",{row["user"]}')
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def run():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        for row in timetable(SEQUENTIAL_SAMPLE):
+            (await client.post("/scheduled/", json=row)).raise_for_status()
+        sequential = (time.perf_counter() - start) / SEQUENTIAL_SAMPLE * TIMETABLE_SIZE
+
+        body = as_csv(timetable(TIMETABLE_SIZE))
+
+        async def chunks():
+            for i in range(0, len(body), 64 * 1024):
+                yield body[i:i + 64 * 1024]
+
+        start = time.perf_counter()
+        res = await client.post("/scheduled/bulk", content=chunks(), headers={"Content-Type": "text/csv"})
+        bulk = time.perf_counter() - start
+        res.raise_for_status()
+        return sequential, bulk, res.json()
+
+
+def bench_bulk_import():
+    print(f"Importing a {TIMETABLE_SIZE} entry timetable ({STORE_LATENCY * 1000:.0f} ms store latency)")
+    inject_store_latency()
+    with contextlib.redirect_stdout(io.StringIO()):
+        queued_before = len(controller.get_queue())
+        sequential, bulk, result = asyncio.run(run())
+        queued = len(controller.get_queue()) - queued_before
+
+    print(f"\n   POST /scheduled/ one by one:  {sequential:8.1f} s (extrapolated from {SEQUENTIAL_SAMPLE})")
+    print(f"   POST /scheduled/bulk (CSV):   {bulk:8.1f} s")
+    print(f"   Speedup:                      {sequential / bulk:8.0f}x")
+
+    if result["created"] != TIMETABLE_SIZE or queued != TIMETABLE_SIZE + SEQUENTIAL_SAMPLE:
+        print(f"   -> [FAIL] Created {result['created']}, queued {queued}")
+        return False
+    if bulk > MAX_IMPORT_SECONDS:
+        print(f"   -> [FAIL] Import took longer than {MAX_IMPORT_SECONDS} s")
+        return False
+    print(f"   -> [PASS] {TIMETABLE_SIZE} schedules stored and queued within {MAX_IMPORT_SECONDS} s")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if bench_bulk_import() else 1)
@@ -0,0 +1,207 @@
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Throwaway in-memory store, one engine in this process, no lease/control server
+os.environ.setdefault("PA_STORAGE_BACKEND", "sqlite")
+os.environ.setdefault("PA_SQLITE_PATH", ":memory:")
+os.environ.setdefault("PA_LEADER_ELECTION", "0")
+
+from api.controller import PAController, Task, TaskType, Priority
+from api.storage import store
+from api.storage.base import SCHEDULES
+
+QUEUE_SIZES = [10, 1000, 100000]
+RUNS = 2000
+ZONE_SETS = [["Main Hall"], ["Library"], ["Admin Office", "Classrooms"], []]
+
+# Regression thresholds (microseconds), about 5x the baseline on a dev VM:
+# they catch algorithmic regressions (e.g. an O(n) tick or shift), not noise.
+# The same limit applies at every queue size, so the per-size rows also
+# check that these operations do not grow with the queue.
+THRESHOLDS = {
+    "playback_us": 1000,    # request_playback + stop_task pair, idle zone
+    "preempt_p99_us": 1000, # emergency preempting a live broadcast
+    "tick_idle_us": 100,    # scheduler pass with nothing due
+    "tick_due_us": 500,     # scheduler pass promoting one schedule
+    "shift_us": 500,        # stop_task applying an interruption shift
+    "conflicts_us": 500,    # find_conflicts for a new schedule (overlap + next free slot)
+}
+
+
+class SimClock:
+    """Manually advanced clock injected into the engine (no sleeps)."""
+
+    def __init__(self):
+        self.now = datetime(2030, 1, 7, 8, 0)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += timedelta(seconds=seconds)
+
+
+def fresh_engine(queued: int = 0):
+    """An engine that is never start()ed: no threads, the bench drives it."""
+    clock = SimClock()
+    engine = PAController(clock=clock)
+    docs = []
+    for i in range(queued):
+        due = clock.now + timedelta(minutes=1 + i % 10000)
+        data = {"message": "Bench", "zones": ZONE_SETS[i % len(ZONE_SETS)], "repeat": "once",
+                "date": due.strftime("%Y-%m-%d"), "time": due.strftime("%H:%M")}
+        docs.append((f"bench-{i}", data))
+        engine.request_playback(Task(
+            id=f"bench-{i}",
+            type=TaskType.SCHEDULE,
+            priority=Priority.SCHEDULE,
+            data=dict(data),
+            scheduled_time=due
+        ))
+    # Queued payloads are reloaded from the store just before they start
+    store.set_many(SCHEDULES, docs)
+    return engine, clock
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1e6
+
+
+def voice(zones):
+    return Task(type=TaskType.VOICE, priority=Priority.REALTIME, data={"user": "Bench", "zones": zones})
+
+
+def bench_playback():
+    engine, _ = fresh_engine()
+
+    def pair():
+        task = voice(["Library"])
+        assert engine.request_playback(task)
+        engine.stop_task(task.id)
+
+    return statistics.median(timed(pair) for _ in range(RUNS))
+
+
+def bench_preemption():
+    engine, _ = fresh_engine(1000)
+    latencies = []
+    for _ in range(RUNS // 4):
+        engine.request_playback(voice(["Main Hall"]))
+        emergency = Task(type=TaskType.EMERGENCY, priority=Priority.EMERGENCY, data={"user": "Bench"})
+        latencies.append(timed(lambda: engine.request_playback(emergency)))
+        engine.stop_task(None, TaskType.EMERGENCY)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def bench_ticks(size: int):
+    engine, clock = fresh_engine(size)
+
+    def tick():
+        with engine._lock:
+            return engine._tick()
+
+    def stop_all():
+        for task in engine.snapshot.state['active_tasks']:
+            engine.stop_task(task['id'])
+
+    def settle():
+        """Plays out what is due and loads head payloads; returns the next wait."""
+        while True:
+            promoted, wait, missing = tick()
+            if missing:
+                with engine._lock:
+                    engine._hydrate(missing)
+            elif promoted:
+                stop_all()
+            else:
+                return wait
+
+    idle = statistics.median(timed(tick) for _ in range(RUNS))
+
+    due = []
+    for _ in range(min(RUNS // 2, 2 * size)):
+        # Jump to the earliest head's next deadline (payload load, then start)
+        wait = settle()
+        if wait is None:
+            break
+        clock.advance(wait)
+        start = time.perf_counter()
+        promoted, _, _ = tick()
+        if promoted:
+            due.append((time.perf_counter() - start) * 1e6)
+            stop_all()
+    return idle, statistics.median(due)
+
+
+def bench_shift(size: int):
+    engine, clock = fresh_engine(size)
+    samples = []
+    for _ in range(RUNS // 4):
+        task = voice([]) # All zones: pauses every partition
+        engine.request_playback(task)
+        clock.advance(30)
+        samples.append(timed(lambda: engine.stop_task(task.id)))
+    offset = max(queue.offset for queue in engine.queues.values())
+    assert offset == timedelta(seconds=30 * (RUNS // 4)), "Shift not applied to every partition"
+    return statistics.median(samples)
+
+
+def bench_conflicts(size: int):
+    engine, clock = fresh_engine(size)
+    samples = []
+    for i in range(RUNS // 4):
+        due = clock.now + timedelta(minutes=1 + i % 10000, seconds=30)
+        data = {"message": "Bench conflict", "zones": ZONE_SETS[i % len(ZONE_SETS)]}
+        task = Task(type=TaskType.SCHEDULE, priority=Priority.SCHEDULE, data=data, scheduled_time=due)
+        samples.append(timed(lambda: engine.find_conflicts(task)))
+    return statistics.median(samples)
+
+
+def check(name: str, value: float, failures: list):
+    limit = THRESHOLDS[name]
+    if value > limit:
+        failures.append(f"{name} = {value:.1f} us (limit {limit} us)")
+
+
+def bench_controller():
+    print("PAController benchmark (simulated clock, in-memory store; microseconds)")
+    failures = []
+    # Silence controller logging so it does not dominate the measurement output
+    with contextlib.redirect_stdout(io.StringIO()):
+        playback = bench_playback()
+        preempt_p50, preempt_p99 = bench_preemption()
+        rows = [(size, *bench_ticks(size), bench_shift(size), bench_conflicts(size)) for size in QUEUE_SIZES]
+
+    print(f"\n   request_playback + stop:   {playback:8.1f}")
+    print(f"   emergency preemption p50:  {preempt_p50:8.1f}")
+    print(f"   emergency preemption p99:  {preempt_p99:8.1f}")
+    check("playback_us", playback, failures)
+    check("preempt_p99_us", preempt_p99, failures)
+
+    print(f"\n   {'queued':>8} {'idle tick':>10} {'due tick':>10} {'shift':>10} {'conflicts':>10}")
+    for size, idle, due, shift, conflicts in rows:
+        print(f"   {size:>8} {idle:>10.1f} {due:>10.1f} {shift:>10.1f} {conflicts:>10.1f}")
+        check("tick_idle_us", idle, failures)
+        check("tick_due_us", due, failures)
+        check("shift_us", shift, failures)
+        check("conflicts_us", conflicts, failures)
+
+    if failures:
+        print("\n   -> [FAIL] Performance regression:")
+        for failure in failures:
+            print(f"      {failure}")
+        return False
+    print("\n   -> [PASS] All measurements within thresholds")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if bench_controller() else 1)
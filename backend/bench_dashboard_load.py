@@ -0,0 +1,96 @@
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+# Run offline against the SQLite store
+os.environ.setdefault("PA_STORAGE_BACKEND", "sqlite")
+os.environ.setdefault("PA_SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "bench.sqlite3"))
+os.environ.setdefault("PA_LEADER_ELECTION", "0")
+
+import httpx
+from fastapi import FastAPI
+
+from app import app
+from api.storage import store
+
+CLIENTS = 500
+REQUESTS_PER_CLIENT = 6
+STORE_LATENCY = 0.05 # Simulated Firestore round trip (seconds)
+ENDPOINTS = ["/scheduled/", "/realtime/logs", "/emergency/"]
+
+
+# Every store read behind ENDPOINTS, in either variant
+DASHBOARD_READS = ("list_schedules", "page_schedules", "query_logs",
+                   "get_emergency_status", "query_emergency_history")
+
+
+def inject_store_latency():
+    """Makes every dashboard read cost a network round trip, like Firestore."""
+    for name in DASHBOARD_READS:
+        original = getattr(store, name)
+
+        def slow(*args, _original=original, **kwargs):
+            time.sleep(STORE_LATENCY)
+            return _original(*args, **kwargs)
+
+        setattr(store, name, slow)
+
+
+def build_legacy_app():
+    """The previous sync-def handlers, served from FastAPI's default threadpool."""
+    legacy = FastAPI()
+
+    @legacy.get("/scheduled/")
+    def get_schedules():
+        return store.list_schedules()
+
+    @legacy.get("/realtime/logs")
+    def get_logs():
+        logs, _ = store.query_logs(limit=50)
+        return logs
+
+    @legacy.get("/emergency/")
+    def get_emergency_status():
+        data = store.get_emergency_status() or {"active": False}
+        return dict(data, history=store.query_emergency_history(limit=50))
+
+    return legacy
+
+
+async def dashboard_client(client, latencies):
+    for i in range(REQUESTS_PER_CLIENT):
+        start = time.perf_counter()
+        res = await client.get(ENDPOINTS[i % len(ENDPOINTS)])
+        res.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_load(target):
+    latencies = []
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(dashboard_client(client, latencies) for _ in range(CLIENTS)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(latencies) / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def bench_dashboard_load():
+    print(f"Load test: {CLIENTS} concurrent dashboard clients, {STORE_LATENCY * 1000:.0f} ms store latency")
+    inject_store_latency()
+
+    results = {
+        "sync routes (default threadpool)": asyncio.run(run_load(build_legacy_app())),
+        "async routes (pa-io executor)": asyncio.run(run_load(app)),
+    }
+
+    print(f"\n   {'variant':<34} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, (rps, p50, p99) in results.items():
+        print(f"   {name:<34} {rps:>8.0f} {p50 * 1000:>8.0f} {p99 * 1000:>8.0f}")
+
+
+if __name__ == "__main__":
+    bench_dashboard_load()
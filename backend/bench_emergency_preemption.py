@@ -0,0 +1,68 @@
+import contextlib
+import io
+import os
+import statistics
+import time
+
+# Throwaway in-memory store, one engine in this process, no lease/control server
+os.environ.setdefault("PA_STORAGE_BACKEND", "sqlite")
+os.environ.setdefault("PA_SQLITE_PATH", ":memory:")
+os.environ.setdefault("PA_LEADER_ELECTION", "0")
+
+from api.controller import controller, Task, TaskType, Priority
+from api.publisher import publisher
+
+RUNS = 200
+FIRESTORE_DELAY = 0.5 # Injected latency per Firestore write (seconds)
+
+
+def inject_firestore_delay():
+    """Wraps the publisher's Firestore writes with an artificial delay."""
+    write_state, write_schedules = publisher._write_state, publisher._write_schedules
+
+    def slow_write_state(data):
+        time.sleep(FIRESTORE_DELAY)
+        write_state(data)
+
+    def slow_write_schedules(chunk):
+        time.sleep(FIRESTORE_DELAY)
+        write_schedules(chunk)
+
+    publisher._write_state = slow_write_state
+    publisher._write_schedules = slow_write_schedules
+
+
+def bench_emergency_preemption():
+    print(f"Benchmarking Emergency Preemption ({FIRESTORE_DELAY * 1000:.0f} ms Firestore delay injected)...")
+    inject_firestore_delay()
+
+    latencies = []
+    # Silence controller logging so it does not dominate the measurement output
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(RUNS):
+            voice = Task(type=TaskType.VOICE, priority=Priority.REALTIME, data={"user": "BenchUser"})
+            controller.request_playback(voice)
+
+            emergency = Task(type=TaskType.EMERGENCY, priority=Priority.EMERGENCY, data={"user": "BenchAdmin"})
+            start = time.perf_counter()
+            granted = controller.request_playback(emergency)
+            latencies.append((time.perf_counter() - start) * 1e6)
+
+            assert granted, "Emergency must always preempt"
+            controller.stop_task(None, TaskType.EMERGENCY)
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"\n   Runs: {RUNS}")
+    print(f"   p50: {statistics.median(latencies):.1f} us")
+    print(f"   p99: {p99:.1f} us")
+    print(f"   max: {latencies[-1]:.1f} us")
+
+    if latencies[-1] < FIRESTORE_DELAY * 1e6:
+        print("   -> [PASS] Preemption never waited on a Firestore write")
+    else:
+        print("   -> [FAIL] Preemption blocked on Firestore I/O")
+
+
+if __name__ == "__main__":
+    bench_emergency_preemption()
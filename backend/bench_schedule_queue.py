@@ -0,0 +1,82 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from api.schedule_queue import ScheduleQueue
+
+SIZES = [10, 100, 1_000, 10_000, 100_000]
+ROUNDS = 2_000
+
+
+class FakeTask:
+    __slots__ = ("id", "scheduled_ts")
+
+    def __init__(self, id, scheduled_time):
+        self.id = id
+        self.scheduled_ts = scheduled_time.timestamp()
+
+
+def build(n, now):
+    q = ScheduleQueue()
+    tasks = []
+    for i in range(n):
+        # Spread a term-long calendar over the next 120 days
+        t = FakeTask(f"sch-{i}", now + timedelta(seconds=random.randint(60, 120 * 86400)))
+        q.push(t)
+        tasks.append(t)
+    return q, tasks
+
+
+def per_op_us(fn, rounds=ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def bench_size(n):
+    now = datetime.now()
+    q, tasks = build(n, now)
+
+    # 1. Idle tick: nothing due yet
+    tick = per_op_us(lambda: q.pop_due(now))
+
+    # 2. Insert + cancel (a /scheduled/ POST followed by a DELETE)
+    counter = iter(range(10**9))
+    def insert_cancel():
+        t = FakeTask(f"new-{next(counter)}", now + timedelta(seconds=random.randint(60, 86400)))
+        q.push(t)
+        q.remove(t.id)
+    churn = per_op_us(insert_cancel)
+
+    # 3. Due-pop: a due task inserted and promoted
+    def due_pop():
+        t = FakeTask(f"due-{next(counter)}", now - timedelta(seconds=1))
+        q.push(t)
+        assert q.pop_due(now) is t
+    pop = per_op_us(due_pop)
+
+    # 4. Interrupted schedule re-queued at head
+    def requeue_head():
+        t = tasks[random.randrange(n)]
+        q.push_front(t)
+        assert q.pop_due(now) is t
+        q.push(t)
+    head = per_op_us(requeue_head)
+
+    # 5. Interruption time-shift of the whole queue
+    shift = per_op_us(lambda: q.shift(timedelta(seconds=1)))
+
+    return tick, churn, pop, head, shift
+
+
+def run():
+    print("ScheduleQueue benchmark (microseconds per operation)")
+    print(f"{'queued':>10} {'idle tick':>12} {'insert+cancel':>15} {'due-pop':>10} {'requeue head':>14} {'shift':>8}")
+    for n in SIZES:
+        tick, churn, pop, head, shift = bench_size(n)
+        print(f"{n:>10} {tick:>12.2f} {churn:>15.2f} {pop:>10.2f} {head:>14.2f} {shift:>8.2f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,20 +1,25 @@
 from api.controller import controller, TaskType
-from api.firebaseConfig import db
-import firebase_admin
-from firebase_admin import firestore
+from api.storage import store
+
+# Join the cluster so the stop reaches the running controller leader
+controller.start()
 
 # 1. Force Controller Stop
 controller.stop_task(None, TaskType.EMERGENCY)
 print("Controller Emergency Stopped.")
 
 # 2. Force Firestore Reset
-db.collection("system").document("state").set({
+store.set_system_state({
     "mode": "IDLE",
     "priority": 0,
     "active_task": None
 })
-db.collection("emergency").document("status").set({
+store.set_emergency_status({
     "active": False,
-    "history": []
+    "user": None,
+    "time": None,
+    "current_log_id": None,
+    "current_event_id": None
 })
+store.clear_emergency_history()
 print("Firestore State Reset.")
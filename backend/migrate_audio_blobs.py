@@ -0,0 +1,19 @@
+from api.blobstore import blobs
+from api.storage import store
+
+# Moves legacy inline Base64 audio out of schedule documents into the blob store
+moved = 0
+for schedule in store.list_schedules():
+    audio = schedule.get("audio")
+    if not audio:
+        continue
+    try:
+        blob_hash = blobs.put_data_url(audio)
+    except ValueError as e:
+        print(f"Skipped {schedule['id']}: {e}")
+        continue
+    store.update_schedule(schedule["id"], {"audioHash": blob_hash, "audio": None})
+    moved += 1
+    print(f"Moved audio of {schedule['id']} -> {blob_hash}")
+
+print(f"Migrated {moved} schedules.")
@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+from api.storage import store
+
+# Moves the legacy emergency/status `history` array into the history subcollection
+status = store.get_emergency_status() or {}
+history = status.get("history") or []
+
+# The array is newest first; legacy entry ids are ISO timestamps
+for entry in reversed(history):
+    try:
+        timestamp = datetime.fromisoformat(entry.get("id", "")).astimezone(timezone.utc)
+    except ValueError:
+        timestamp = datetime.now(timezone.utc)
+    store.add_emergency_event({
+        "action": entry.get("action"),
+        "time": entry.get("time"),
+        "user": entry.get("user"),
+        "timestamp": timestamp
+    })
+
+store.set_emergency_status({
+    "active": bool(status.get("active")),
+    "user": None,
+    "time": None,
+    "current_log_id": status.get("current_log_id"),
+    "current_event_id": None
+})
+print(f"Migrated {len(history)} emergency history entries.")
@@ -0,0 +1,14 @@
+from api.recurrence import is_recurring
+from api.storage import store
+
+# Gives recurring rules saved before anchors existed an anchor_date/anchor_time,
+# so the controller finds them (and resumes them) after downtime
+updates = [
+    (schedule["id"], {"anchor_date": schedule["date"], "anchor_time": schedule["time"]})
+    for schedule in store.list_schedules()
+    if schedule.get("status") == "Pending" and is_recurring(schedule.get("repeat"))
+    and not schedule.get("anchor_date") and schedule.get("date") and schedule.get("time")
+]
+
+store.update_schedules(updates)
+print(f"Anchored {len(updates)} recurring schedules.")
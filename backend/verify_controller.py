@@ -32,7 +32,7 @@ def test_controller_logic():
     time.sleep(1.1) 
     
     print("\n2. Interrupting with Realtime (Blocking for 3 seconds)...")
-    rt_data = {"user": "Interrupter", "zones": ["Z1"], "type": "voice"}
+    rt_data = {"user": "Interrupter", "zones": ["Zone Test"], "type": "voice"}
     requests.post(f"{BASE_URL}/realtime/start", json=rt_data)
     
     # 4. Wait to simulate duration
@@ -69,10 +69,10 @@ def test_logs():
         # We need the ID to delete it. Fetched logs are needed.
         # So we fetch, find our dummy, and delete it.
         time.sleep(1)
-        logs_res = requests.get(f"{BASE_URL}/realtime/logs")
+        logs_res = requests.get(f"{BASE_URL}/realtime/logs", params={"action": "Dummy Log", "limit": 1})
         if logs_res.status_code == 200:
             all_logs = logs_res.json()
-            # Find closest Dummy Log
+            # Find closest Dummy Log (filtered server-side)
             target = next((l for l in all_logs if l.get('action') == 'Dummy Log'), None)
             if target:
                 del_res = requests.delete(f"{BASE_URL}/realtime/log/{target['id']}?user=TestAudit")
@@ -103,7 +103,7 @@ def test_logs():
                  time.sleep(1)
                  
                  # Verify NO "Log Deleted" type log appeared recently
-                 logs_res = requests.get(f"{BASE_URL}/realtime/logs")
+                 logs_res = requests.get(f"{BASE_URL}/realtime/logs", params={"limit": 5})
                  all_logs = logs_res.json()
                  
                  # Check top logs (most recent)
@@ -0,0 +1,60 @@
+from datetime import datetime
+from api.recurrence import next_occurrence, validate, RecurrenceError
+
+# Friday 2026-10-16 08:00
+FIRED = datetime(2026, 10, 16, 8, 0)
+
+CASES = [
+    ("once", None),
+    ("daily", datetime(2026, 10, 17, 8, 0)),
+    ("weekdays", datetime(2026, 10, 19, 8, 0)),
+    ("weekly", datetime(2026, 10, 23, 8, 0)),
+    ("0 8 * * 1-5", datetime(2026, 10, 19, 8, 0)),
+    ("*/15 9-10 * * *", datetime(2026, 10, 16, 9, 0)),
+    ("30 7 1 * 0", datetime(2026, 10, 18, 7, 30)), # 1st of month OR Sunday
+    ("0 9 29 2 *", datetime(2028, 2, 29, 9, 0)),
+]
+
+# The same occurrence, delayed 5 minutes by an emergency: later occurrences
+# follow the rule's anchor (first firing Monday 2026-10-12 08:00), not the delay
+DELAYED = datetime(2026, 10, 16, 8, 5)
+ANCHOR = datetime(2026, 10, 12, 8, 0)
+
+ANCHORED_CASES = [
+    ("daily", datetime(2026, 10, 17, 8, 0)),
+    ("weekdays", datetime(2026, 10, 19, 8, 0)),
+    ("weekly", datetime(2026, 10, 19, 8, 0)),
+    ("0 8 * * 1-5", datetime(2026, 10, 19, 8, 0)),
+]
+
+
+def test_rules():
+    print("Testing Recurrence Rules...")
+    for rule, expected in CASES:
+        got = next_occurrence(rule, FIRED)
+        status = "PASS" if got == expected else "FAIL"
+        print(f"   -> [{status}] {rule!r}: {got} (expected {expected})")
+
+
+def test_anchored():
+    print("\nTesting Delayed Occurrences (anchored rules)...")
+    for rule, expected in ANCHORED_CASES:
+        got = next_occurrence(rule, DELAYED, ANCHOR)
+        status = "PASS" if got == expected else "FAIL"
+        print(f"   -> [{status}] {rule!r}: {got} (expected {expected})")
+
+
+def test_invalid():
+    print("\nTesting Invalid Rules...")
+    for rule in ["hourly", "61 * * * *", "* * *", "0 8 * * mon"]:
+        try:
+            validate(rule)
+            print(f"   -> [FAIL] Accepted {rule!r}")
+        except RecurrenceError as e:
+            print(f"   -> [PASS] Rejected {rule!r}: {e}")
+
+
+if __name__ == "__main__":
+    test_rules()
+    test_anchored()
+    test_invalid()
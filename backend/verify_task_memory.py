@@ -0,0 +1,74 @@
+import contextlib
+import io
+import os
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Throwaway in-memory store, one engine in this process, no lease/control server
+os.environ.setdefault("PA_STORAGE_BACKEND", "sqlite")
+os.environ.setdefault("PA_SQLITE_PATH", ":memory:")
+os.environ.setdefault("PA_LEADER_ELECTION", "0")
+
+from api.controller import PAController, Task, TaskType, Priority
+
+CALENDAR_SIZE = 100_000
+MAX_BYTES_PER_SCHEDULE = 500
+
+
+def schedule_doc(i: int, when: datetime) -> dict:
+    """A typical schedule document (audio lives in the blob store, by hash)."""
+    return {
+        "message": f"Period {i % 8} bell - please proceed to your next class",
+        "date": when.strftime("%Y-%m-%d"),
+        "time": when.strftime("%H:%M"),
+        "zones": ["Main Hall", "Library"] if i % 3 else "All Zones",
+        "repeat": "once",
+        "type": "text",
+        "user": "admin@school.edu",
+        "status": "Pending",
+        "audioHash": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+    }
+
+
+def measure(keep_payloads: bool) -> float:
+    """Bytes held per queued schedule for a CALENDAR_SIZE calendar."""
+    engine = PAController()
+    start = datetime.now() + timedelta(days=1)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    docs = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(CALENDAR_SIZE):
+            when = start + timedelta(minutes=i)
+            doc = schedule_doc(i, when)
+            if keep_payloads:
+                docs.append(doc) # What the queue used to pin per entry
+            engine.request_playback(Task(
+                id=f"{i:020d}", # Firestore-style 20 character id
+                type=TaskType.SCHEDULE,
+                priority=Priority.SCHEDULE,
+                data=doc,
+                scheduled_time=when
+            ))
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / CALENDAR_SIZE
+
+
+def test_task_memory():
+    print(f"Measuring controller memory for a {CALENDAR_SIZE:,} schedule calendar...")
+    compact = measure(keep_payloads=False)
+    resident = measure(keep_payloads=True)
+
+    print(f"\n   Payloads resident:  {resident:7.0f} bytes/schedule ({resident * CALENDAR_SIZE / 1e6:.1f} MB)")
+    print(f"   Queued (compact):   {compact:7.0f} bytes/schedule ({compact * CALENDAR_SIZE / 1e6:.1f} MB)")
+    print(f"   Reduction:          {resident / compact:7.1f}x")
+
+    if compact <= MAX_BYTES_PER_SCHEDULE:
+        print(f"   -> [PASS] Queue stays within {MAX_BYTES_PER_SCHEDULE} bytes per schedule")
+    else:
+        print(f"   -> [FAIL] Queue uses more than {MAX_BYTES_PER_SCHEDULE} bytes per schedule")
+
+
+if __name__ == "__main__":
+    test_task_memory()
@@ -45,7 +45,7 @@ def test_validation():
         "repeat": "once",
         "zones": "Admin Office",
         "type": "voice",
-        "audio": "data:audio/webm;base64,UklGRi..." # Fake base64 snippet
+        "audio": "data:audio/wav;base64,UklGRiQAAABXQVZF" # Short WAV header
     }
     res = requests.post(f"{BASE_URL}/scheduled/", json=data)
     if res.status_code == 200:
@@ -56,10 +56,15 @@ def test_validation():
         fetch_res = requests.get(f"{BASE_URL}/scheduled/")
         schedules = fetch_res.json()
         saved = next((s for s in schedules if s['id'] == sch_id), None)
-        if saved and saved.get('audio'):
-             print(f"   -> [PASS] Audio field persisted (Length: {len(saved['audio'])})")
+        # Audio lives in the blob store; the schedule keeps its hash
+        if saved and saved.get('audioHash'):
+             audio_res = requests.get(f"{BASE_URL}/audio/{saved['audioHash']}")
+             if audio_res.status_code == 200:
+                 print(f"   -> [PASS] Audio persisted (Hash: {saved['audioHash'][:12]}..., {len(audio_res.content)} bytes)")
+             else:
+                 print(f"   -> [FAIL] Audio blob not served: {audio_res.status_code}")
         else:
-             print(f"   -> [FAIL] Audio field missing in retrieval")
+             print(f"   -> [FAIL] Audio hash missing in retrieval")
 
         # Cleanup
         requests.delete(f"{BASE_URL}/scheduled/{sch_id}")
@@ -6,7 +6,9 @@ import { useApp } from '../context/AppContext';
 const Header = ({ toggleSidebar, user }) => {
   const navigate = useNavigate();
   const { currentUser, logout } = useAuth();
-  const { notifications, markAllAsRead, clearAllNotifications, resetState } = useApp();
+  const { notifications, markAllAsRead, clearAllNotifications, resetState, zones, systemState, endpointZone, setEndpointZone } = useApp();
+  // Zones this endpoint can sit in: the known ones plus any the controller has added
+  const zoneOptions = [...new Set([...Object.keys(zones), ...Object.keys(systemState?.zones || {})])];
   
   const [showProfileMenu, setShowProfileMenu] = useState(false);
   const [showNotifications, setShowNotifications] = useState(false);
@@ -114,6 +116,20 @@ const Header = ({ toggleSidebar, user }) => {
       </div>
 
       <div className="flex items-center space-x-2 md:space-x-4">
+        {/* Endpoint Zone: which zone's announcements this device plays */}
+        <div className="flex items-center text-white" title="Zone this device plays">
+          <i className="material-icons text-blue-100 mr-1">speaker</i>
+          <select
+            value={endpointZone}
+            onChange={(e) => setEndpointZone(e.target.value)}
+            className="bg-white/10 hover:bg-white/20 text-white text-sm rounded-lg px-2 py-1 border border-white/30 focus:outline-none cursor-pointer"
+          >
+            {zoneOptions.map(zone => (
+              <option key={zone} value={zone} className="text-gray-800">{zone}</option>
+            ))}
+          </select>
+        </div>
+
         {/* Notifications */}
         <div className="relative" ref={notifRef}>
           <button 
@@ -1,5 +1,6 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { useApp } from '../../context/AppContext';
+import api from '../../api/axios';
 import { useAuth } from '../../context/AuthContext';
 import Modal from '../common/Modal';
 
@@ -179,7 +180,7 @@ const Schedule = () => {
           repeat: schedule.repeat || 'once',
           zones: zonesMap
       });
-      setAudioBlob(schedule.audio || null);
+      setAudioBlob(schedule.audioHash || schedule.audio || null);
       setShowModal(true);
   };
 
@@ -225,31 +226,24 @@ const Schedule = () => {
       }
 
       const processSubmission = async () => {
+          // Audio lives in the blob store; the schedule only keeps its hash
+          let audioHash = null;
           let audioString = null;
-          if (audioBlob) {
-              // Convert Blob to Base64
-              const reader = new FileReader();
-              const base64Promise = new Promise((resolve, reject) => {
-                  reader.onloadend = () => {
-                      const result = reader.result;
-                      // Check size (~800KB limit for Firestore safety)
-                      if (result.length > 800000) {
-                          reject(new Error("Audio recording is too long (Limit: ~60 seconds)."));
-                      } else {
-                          resolve(result);
-                      }
-                  };
-                  reader.onerror = reject;
-                  reader.readAsDataURL(audioBlob); 
-              });
-
+          if (audioBlob instanceof Blob) {
               try {
-                  audioString = await base64Promise;
+                  const upload = new FormData();
+                  upload.append('file', audioBlob, 'recording.webm');
+                  const res = await api.post('/audio/', upload);
+                  audioHash = res.data.hash;
               } catch (err) {
-                  setInfoMessage(err.message);
+                  setInfoMessage("Failed to upload audio: " + (err.response?.data?.detail || err.message));
                   setShowInfoModal(true);
                   return;
               }
+          } else if (typeof audioBlob === 'string') {
+              // Editing: keep the existing recording (legacy Base64 is migrated server-side)
+              if (audioBlob.startsWith('data:')) audioString = audioBlob;
+              else audioHash = audioBlob;
           }
 
           const scheduleData = {
@@ -260,7 +254,8 @@ const Schedule = () => {
               zones: activeZones.join(', '),
               status: 'Pending',
               type: audioBlob ? 'voice' : 'text',
-              audio: audioString // Send Base64 string
+              audioHash,
+              ...(audioString ? { audio: audioString } : {})
           };
 
           if (editId) {
@@ -465,7 +460,7 @@ const Schedule = () => {
                             <span className="text-sm font-medium">Audio Recorded Successfully</span>
                         </div>
                         <div className="flex items-center space-x-2">
-                             <audio ref={audioPreviewRef} src={audioBlob instanceof Blob ? URL.createObjectURL(audioBlob) : ''} controls className="h-8 w-32" />
+                             <audio ref={audioPreviewRef} src={audioBlob instanceof Blob ? URL.createObjectURL(audioBlob) : audioBlob.startsWith('data:') ? audioBlob : `${api.defaults.baseURL}/audio/${audioBlob}`} controls className="h-8 w-32" />
                              <button type="button" onClick={resetRecording} className="text-red-500 hover:bg-red-50 p-1 rounded-full"><i className="material-icons text-sm">delete</i></button>
                         </div>
                     </div>
@@ -504,6 +499,7 @@ const Schedule = () => {
                 >
                     <option value="once">Once</option>
                     <option value="daily">Daily</option>
+                    <option value="weekdays">Weekdays</option>
                     <option value="weekly">Weekly</option>
                 </select>
             </div>
@@ -42,19 +42,27 @@ export const AppProvider = ({ children }) => {
   // Track specific System State Details (Mode, Active Task User, etc)
   const [systemState, setSystemState] = useState({});
 
+  // Zone this endpoint's speakers are in ('All Zones' monitors every zone)
+  const [endpointZone, setEndpointZoneState] = useState(() => localStorage.getItem('pa_endpoint_zone') || 'All Zones');
+  const endpointZoneRef = useRef(endpointZone);
+  const setEndpointZone = (zone) => {
+      localStorage.setItem('pa_endpoint_zone', zone);
+      endpointZoneRef.current = zone;
+      setEndpointZoneState(zone);
+  };
+
   // Initial Fetch & Listeners
   useEffect(() => {
     // 1. Emergency System Listener
     const emergencyRef = doc(db, "emergency", "status");
     const unsubEmergency = onSnapshot(emergencyRef, (docSnap) => {
-        if (docSnap.exists()) {
-            const data = docSnap.data();
-            setEmergencyActive(data.active);
-            setEmergencyHistory(data.history || []);
-        } else {
-            setEmergencyActive(false);
-            setEmergencyHistory([]);
-        }
+        setEmergencyActive(docSnap.exists() ? !!docSnap.data().active : false);
+    });
+
+    // History lives in a subcollection; only the latest entries are watched
+    const historyQuery = query(collection(db, "emergency", "status", "history"), orderBy("timestamp", "desc"), limit(50));
+    const unsubHistory = onSnapshot(historyQuery, (snapshot) => {
+        setEmergencyHistory(snapshot.docs.map(d => ({ id: d.id, ...d.data() })));
     });
 
 
@@ -100,6 +108,7 @@ export const AppProvider = ({ children }) => {
 
     return () => {
         unsubEmergency();
+        unsubHistory();
         // unsubSystem(); // We didn't fully implement it in this block
         unsubSchedules();
         unsubLogs();
@@ -110,6 +119,7 @@ export const AppProvider = ({ children }) => {
   const emergencyAudioRef = useRef(null);
   const sirenIntervalRef = useRef(null);
   const lastBroadcastTaskId = useRef(null);
+  const broadcastZonesRef = useRef([]); // Zones our live broadcast holds
   const broadcastStartingRef = useRef(false); // Grace period flag
 
   const playEmergencySiren = () => {
@@ -179,30 +189,61 @@ export const AppProvider = ({ children }) => {
       return () => stopEmergencySiren();
   }, [emergencyActive]);
   
-  // Track currently playing task to prevent re-triggering
-  const currentTaskIdRef = useRef(null);
-  const systemAudioRef = useRef(null); // For file playback
-
-  const stopSystemPlayback = () => {
-      // 1. Stop Audio Object
-      if (systemAudioRef.current) {
-          systemAudioRef.current.pause();
-          systemAudioRef.current = null;
+  // Tasks playing on this endpoint (one per zone at most): Task ID -> { audio, speaking }
+  const playingRef = useRef(new Map());
+  const prefetchedRef = useRef(new Map()); // Task ID -> { src, audio } preloaded ahead of playback
+
+  // Rendered by the backend from the task's own text (stored schedule or live announcement)
+  const speechUrl = (taskId) => `${api.defaults.baseURL}/tts/${encodeURIComponent(taskId)}`;
+
+  // Preloaded element for an upcoming task if it has this source, else a fresh one
+  const audioFor = (taskId, src) => {
+      const entry = prefetchedRef.current.get(taskId);
+      prefetchedRef.current.delete(taskId);
+      return entry && entry.src === src ? entry.audio : new Audio(src);
+  };
+
+  // Controller announces schedules due soon: buffer and decode their audio now
+  const prefetchUpcoming = (tasks) => {
+      const next = new Map();
+      for (const hint of tasks) {
+          const src = hint.audioHash
+              ? `${api.defaults.baseURL}/audio/${hint.audioHash}`
+              : hint.text ? speechUrl(hint.id) : null;
+          if (!src) continue;
+          const entry = prefetchedRef.current.get(hint.id);
+          if (entry && entry.src === src) {
+              next.set(hint.id, entry);
+          } else {
+              const audio = new Audio();
+              audio.preload = 'auto';
+              audio.src = src;
+              next.set(hint.id, { src, audio });
+          }
       }
-      // 2. Stop TTS
-      if ('speechSynthesis' in window) {
+      prefetchedRef.current = next; // Hints no longer announced are released
+  };
+
+  // Stops one task (it ended here or lost its zone), or everything
+  const stopSystemPlayback = (taskId) => {
+      const ids = taskId ? [taskId] : [...playingRef.current.keys()];
+      for (const id of ids) {
+          const entry = playingRef.current.get(id);
+          if (!entry) continue;
+          playingRef.current.delete(id);
+          // 1. Stop Audio Object
+          if (entry.audio) entry.audio.pause();
+          // 2. Stop TTS (the browser voice is shared by every task)
+          if (entry.speaking && 'speechSynthesis' in window) window.speechSynthesis.cancel();
+      }
+      if (!taskId && 'speechSynthesis' in window) {
           window.speechSynthesis.cancel();
       }
-      currentTaskIdRef.current = null;
   };
 
   const playSystemTask = async (task) => {
       if (!task || !task.data) return;
-      if (currentTaskIdRef.current === task.id) return; // Already playing this task
-
-      // Stop previous if any
-      stopSystemPlayback();
-      currentTaskIdRef.current = task.id;
+      if (playingRef.current.has(task.id)) return; // Already playing this task
 
       // Resolve Type (Root takes precedence, fallback to data check)
       const type = task.type || task.data?.type || 'text';
@@ -210,45 +251,56 @@ export const AppProvider = ({ children }) => {
       // Ignore Background tasks (Content is just metadata/title, handled by local player)
       if (type === 'BACKGROUND' || type === 'background') return;
 
+      const entry = { audio: null, speaking: false };
+      playingRef.current.set(task.id, entry);
       console.log("Starting System Task:", task);
 
+      const onTaskEnd = () => {
+          if (playingRef.current.get(task.id) !== entry) return; // Stopped meanwhile
+          // Notify Backend to Clear State (frees the task's zones)
+          api.post('/realtime/complete', { task_id: task.id })
+             .catch(err => console.error("Failed to complete task:", err));
+          // Clear local state
+          stopSystemPlayback(task.id);
+      };
+
       try {
           
-          if (type === 'voice' && task.data.audio) {
-              // Play Base64 Audio
-              const audioSrc = task.data.audio.startsWith('data:') 
-                  ? task.data.audio 
-                  : `data:audio/webm;base64,${task.data.audio}`;
-              
-              const audio = new Audio(audioSrc);
-              systemAudioRef.current = audio;
+          if (type === 'voice' && (task.data.audioHash || task.data.audio)) {
+              // Stream from the blob store (legacy schedules carry Base64 inline)
+              const audioSrc = task.data.audioHash
+                  ? `${api.defaults.baseURL}/audio/${task.data.audioHash}`
+                  : task.data.audio.startsWith('data:')
+                      ? task.data.audio
+                      : `data:audio/webm;base64,${task.data.audio}`;
               
-              audio.onended = () => {
-                  console.log("Task Audio Ended");
-                  // Notify Backend to Clear State
-                  api.post('/realtime/complete', { task_id: task.id })
-                     .catch(err => console.error("Failed to complete task:", err));
-                  
-                  // Clear local state
-                  stopSystemPlayback();
-              };
+              const audio = audioFor(task.id, audioSrc);
+              entry.audio = audio;
+              audio.onended = onTaskEnd;
               
               await audio.play();
               
           } else if (task.data.message || task.data.content) {
-              // Text to Speech
-              if ('speechSynthesis' in window) {
-                  const utterance = new SpeechSynthesisUtterance(task.data.message || task.data.content);
-                  utterance.rate = 0.9;
-                  
-                  utterance.onend = () => {
-                      console.log("TTS Ended");
-                      api.post('/realtime/complete', { task_id: task.id })
-                         .catch(err => console.error("Failed to complete task:", err));
-                      stopSystemPlayback();
-                  };
-                  
-                  window.speechSynthesis.speak(utterance);
+              const text = task.data.message || task.data.content;
+
+              // Text to Speech: rendered (and cached) by the backend, so every
+              // endpoint plays the same audio; the browser voice is the fallback
+              const audio = audioFor(task.id, speechUrl(task.id));
+              entry.audio = audio;
+              audio.onended = onTaskEnd;
+              try {
+                  await audio.play();
+              } catch (err) {
+                  if (playingRef.current.get(task.id) !== entry) return; // Stopped meanwhile
+                  console.warn("Server speech unavailable, using browser TTS:", err);
+                  entry.audio = null;
+                  if ('speechSynthesis' in window) {
+                      const utterance = new SpeechSynthesisUtterance(text);
+                      utterance.rate = 0.9;
+                      utterance.onend = onTaskEnd;
+                      entry.speaking = true;
+                      window.speechSynthesis.speak(utterance);
+                  }
               }
           }
       } catch (err) {
@@ -256,58 +308,75 @@ export const AppProvider = ({ children }) => {
       }
   };
 
+  // Active tasks audible here: the one holding this endpoint's zone, or
+  // every zone's task on an 'All Zones' endpoint
+  const tasksForEndpoint = (state) => {
+      const tasks = state.active_tasks || (state.active_task ? [state.active_task] : []);
+      const zone = endpointZoneRef.current;
+      if (zone === 'All Zones') return tasks;
+      return tasks.filter(t => state.zones?.[zone] === t.id);
+  };
+
   // Global System State Listener (The Executor)
+  // Pushed by the backend controller over Server-Sent Events (/events)
   useEffect(() => {
-      const systemRef = doc(db, "system", "state");
-      const unsubSystem = onSnapshot(systemRef, (docSnap) => {
-          if (docSnap.exists()) {
-              const data = docSnap.data();
-              setSystemState(data);
-              
-              // 1. EMERGENCY OVERRIDE
-              if (data.mode === 'EMERGENCY') {
-                  // Strictly stop all local activity (Mic, Music, System)
-                  stopAllAudio();
-                  return; 
-              }
-
-              // 2. Active Task Playback
-              if (data.active_task) {
-                  // If new task is High Priority (Voice/Text), stop any low-priority Music.
-                  if (data.active_task.type !== 'BACKGROUND' && data.active_task.priority !== 10) {
-                      window.dispatchEvent(new Event('stop-all-audio'));
-                  }
-
-                  // CHECK PREEMPTION: If we are broadcasting but the Active Task ID doesn't match ours, we lost the lock.
-                  if (mediaStreamRef.current && lastBroadcastTaskId.current && data.active_task.id !== lastBroadcastTaskId.current) {
-                       console.warn("Broadcast preempted.");
-                       stopBroadcast(); 
-                       alert("Your broadcast was interrupted by another user or higher priority event.");
-                  }
+      const source = new EventSource(`${api.defaults.baseURL}/events/`);
+      // Emergency toggles are pushed before their history is persisted
+      source.addEventListener('prefetch', (event) => {
+          prefetchUpcoming(JSON.parse(event.data).tasks || []);
+      });
+      source.addEventListener('emergency', (event) => {
+          setEmergencyActive(JSON.parse(event.data).active);
+      });
+      source.addEventListener('state', (event) => {
+          const data = JSON.parse(event.data);
+          setSystemState(data);
+          // Zones run independently: playback and preemption are decided per zone
+          const mine = tasksForEndpoint(data);
+          const activeIds = new Set((data.active_tasks || []).map(t => t.id));
+          
+          // 1. EMERGENCY OVERRIDE
+          if (mine.some(t => t.type === 'emergency')) {
+              // Strictly stop all local activity (Mic, Music, System)
+              stopAllAudio();
+              return; 
+          }
 
-                  playSystemTask(data.active_task);
+          // 2. Our Live Broadcast
+          // Gone from the active tasks: preempted in one of its zones, or ended by the system.
+          // Check grace period to avoid race condition (state sent before our start).
+          if (mediaStreamRef.current && lastBroadcastTaskId.current && !broadcastStartingRef.current
+              && !activeIds.has(lastBroadcastTaskId.current)) {
+              const ourZones = broadcastZonesRef.current.includes('All Zones')
+                  ? Object.keys(data.zones || {})
+                  : broadcastZonesRef.current;
+              stopBroadcast();
+              if (ourZones.some(zone => data.zones?.[zone])) {
+                  console.warn("Broadcast preempted.");
+                  alert("Your broadcast was interrupted by another user or higher priority event.");
               } else {
-                  // No active task
-                  
-                  // If we thought we were broadcasting, but system says NO task, we must have been killed/timed out.
-                  // Check grace period to avoid race condition.
-                  if (mediaStreamRef.current && !broadcastStartingRef.current) {
-                       console.warn("Broadcast ended by system.");
-                       stopBroadcast();
-                  }
-
-                  // Stop System if playing
-                  if (currentTaskIdRef.current) {
-                      stopSystemPlayback();
-                  }
+                  console.warn("Broadcast ended by system.");
               }
           }
+
+          // 3. Active Task Playback (this endpoint's zone)
+          // If a task here is High Priority (Voice/Text/Schedule), stop any low-priority Music.
+          if (mine.some(t => t.type !== 'BACKGROUND' && t.priority !== 10)) {
+              window.dispatchEvent(new Event('stop-all-audio'));
+          }
+
+          // Stop what no longer plays in this zone, start what is new
+          const mineIds = new Set(mine.map(t => t.id));
+          for (const taskId of [...playingRef.current.keys()]) {
+              if (!mineIds.has(taskId)) stopSystemPlayback(taskId);
+          }
+          mine.forEach(playSystemTask);
       });
       return () => {
-          unsubSystem();
+          source.close();
           stopSystemPlayback();
       };
-  }, [emergencyActive]); // Depend on emergency to re-eval if needed, or just keep it simple. 
+  }, [emergencyActive, endpointZone]); // Reconnecting re-sends the current state for a new zone
 
   // Removed manual fetchSchedules as it is now real-time
 
@@ -375,7 +444,8 @@ export const AppProvider = ({ children }) => {
       try {
           const res = await api.post('/emergency/toggle', { user, action });
           setEmergencyActive(res.data.active);
-          setEmergencyHistory(res.data.history);
+          // Activation responds before history is written (it arrives via the listener)
+          if (res.data.history) setEmergencyHistory(res.data.history);
       } catch (e) {
           console.error("Emergency toggle failed", e);
       }
@@ -479,6 +549,7 @@ export const AppProvider = ({ children }) => {
 
           // Store Task ID and Set Grace Period
           lastBroadcastTaskId.current = res.data.task_id;
+          broadcastZonesRef.current = zoneList;
           broadcastStartingRef.current = true;
           setTimeout(() => { broadcastStartingRef.current = false; }, 5000);
 
@@ -530,6 +601,7 @@ export const AppProvider = ({ children }) => {
       }
       
       lastBroadcastTaskId.current = null;
+      broadcastZonesRef.current = [];
 
       if (mediaStreamRef.current) {
           mediaStreamRef.current.getTracks().forEach(track => track.stop());
@@ -614,7 +686,9 @@ export const AppProvider = ({ children }) => {
       stopBroadcast,
       broadcastStream,
       activeTask: systemState?.active_task,
+      activeTasks: systemState?.active_tasks || [], // One per busy zone
       systemState, // Export Full State for Locking Logic
+      endpointZone, setEndpointZone, // Zone this endpoint plays
       zones, setZones,
       
       stopAllAudio, // New